@@ -0,0 +1,118 @@
+import atexit
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from .aggregation import ANALYTICS_TIME_ZONE
+from .models import ActivityEvent
+import logging
+logger = logging.getLogger(__name__)
+
+# Events waiting in a process before new ones are dropped, and when the flusher writes them.
+ACTIVITY_BUFFER_SIZE = getattr(settings, 'ACTIVITY_BUFFER_SIZE', 20000)
+ACTIVITY_FLUSH_SIZE = getattr(settings, 'ACTIVITY_FLUSH_SIZE', 500)
+ACTIVITY_FLUSH_INTERVAL = getattr(settings, 'ACTIVITY_FLUSH_INTERVAL', 5)  # seconds
+ACTIVITY_RETENTION_DAYS = getattr(settings, 'ACTIVITY_RETENTION_DAYS', 180)
+
+
+class ActivityBuffer:
+    """Bounded in-process queue of activity events, drained into ActivityEvent by a daemon thread.
+
+    record() only appends a tuple to a deque, which is atomic without a lock, so capturing an
+    event costs about a microsecond and never touches the database. When the buffer is full,
+    because the database is slow or down, new events are counted in `dropped` and discarded
+    instead of holding up requests. The flusher thread starts on first use, wakes when
+    `flush_size` events are waiting or every `interval` seconds, and writes what it finds with
+    bulk_create.
+    """
+
+    def __init__(self, capacity=ACTIVITY_BUFFER_SIZE, flush_size=ACTIVITY_FLUSH_SIZE, interval=ACTIVITY_FLUSH_INTERVAL):
+        self.capacity = capacity
+        self.flush_size = flush_size
+        self.interval = interval
+        self.dropped = 0
+        self.written = 0
+        self._events = deque()
+        self._wake = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._pid = None
+        self._reported_drops = 0
+
+    def record(self, kind, user_id, challenge_id=None, detail=''):
+        if len(self._events) >= self.capacity:
+            self.dropped += 1
+            return
+        self._events.append((kind, user_id, challenge_id, detail, time.time()))
+        if self._pid != os.getpid():
+            self._start()
+        if len(self._events) >= self.flush_size:
+            self._wake.set()
+
+    def _start(self):
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # Also restarts the flusher in a forked worker, which inherits the buffer but not the thread.
+            threading.Thread(target=self._run, name='activity-flusher', daemon=True).start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write every waiting event; returns how many were written."""
+        with self._flush_lock:
+            batch = []
+            while True:
+                try:
+                    batch.append(self._events.popleft())
+                except IndexError:
+                    break
+            if self.dropped != self._reported_drops:
+                logger.warning(f"Activity buffer full: dropped {self.dropped - self._reported_drops} events")
+                self._reported_drops = self.dropped
+            if not batch:
+                return 0
+            rows = []
+            for kind, user_id, challenge_id, detail, at in batch:
+                occurred_at = datetime.fromtimestamp(at, tz=dt_timezone.utc)
+                rows.append(ActivityEvent(
+                    kind=kind, user_id=user_id, challenge_id=challenge_id, detail=detail[:50],
+                    day=occurred_at.astimezone(ANALYTICS_TIME_ZONE).date(), occurred_at=occurred_at
+                ))
+            try:
+                close_old_connections()
+                ActivityEvent.objects.bulk_create(rows, batch_size=1000)
+            except Exception as e:
+                logger.error(f"Failed to write {len(rows)} activity events: {str(e)}")
+                self.dropped += len(rows)
+                self._reported_drops = self.dropped
+                return 0
+            self.written += len(rows)
+            return len(rows)
+
+
+activity_buffer = ActivityBuffer()
+atexit.register(activity_buffer.flush)
+
+
+def record(kind, user_id, challenge_id=None, detail=''):
+    """Log that `user_id` did `kind` (one of ActivityEvent.KIND_CHOICES), optionally on a challenge."""
+    activity_buffer.record(kind, user_id, challenge_id, detail)
+
+
+def prune(now=None):
+    """Drop events older than ACTIVITY_RETENTION_DAYS, one local day per DELETE; returns the rows deleted."""
+    cutoff = (now or timezone.now()).astimezone(ANALYTICS_TIME_ZONE).date() - timedelta(days=ACTIVITY_RETENTION_DAYS)
+    deleted = 0
+    for day in ActivityEvent.objects.filter(day__lt=cutoff).order_by('day').values_list('day', flat=True).distinct():
+        deleted += ActivityEvent.objects.filter(day=day).delete()[0]
+    return deleted
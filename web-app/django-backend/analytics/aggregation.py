@@ -0,0 +1,218 @@
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+from django.conf import settings
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+from challenges.models import Challenge
+from submissions.models import Submission, SubmissionReview
+from .models import MetricRollup, RollupWatermark
+
+ANALYTICS_TIME_ZONE = ZoneInfo(getattr(settings, 'ANALYTICS_TIME_ZONE', 'Africa/Nairobi'))
+ANALYTICS_MAX_RANGE_DAYS = getattr(settings, 'ANALYTICS_MAX_RANGE_DAYS', 366 * 5)
+
+GRANULARITIES = {
+    'day': (TruncDay, 'daily'),
+    'week': (TruncWeek, 'weekly'),
+    'month': (TruncMonth, 'monthly'),
+}
+
+
+class AnalyticsQueryError(ValueError):
+    pass
+
+
+def _parse_date(value, name):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise AnalyticsQueryError(f"{name} must be a date in YYYY-MM-DD format")
+
+
+def parse_range(params):
+    """Read `granularity`, `start` and `end` (inclusive local dates) from query params.
+
+    Defaults to the current month, daily, which is what the dashboards showed before the
+    range became configurable. Returns (granularity, start date, end date).
+    """
+    granularity = params.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        raise AnalyticsQueryError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+    today = timezone.now().astimezone(ANALYTICS_TIME_ZONE).date()
+    start = _parse_date(params['start'], 'start') if params.get('start') else today.replace(day=1)
+    if params.get('end'):
+        end = _parse_date(params['end'], 'end')
+    else:
+        end = (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    if end < start:
+        raise AnalyticsQueryError("end must not be before start")
+    if (end - start).days > ANALYTICS_MAX_RANGE_DAYS:
+        raise AnalyticsQueryError(f"Date range cannot exceed {ANALYTICS_MAX_RANGE_DAYS} days")
+    return granularity, start, end
+
+
+def local_bounds(start, end):
+    """Aware datetimes for [start 00:00, day after end 00:00) in the analytics time zone."""
+    return (
+        datetime.combine(start, time.min, tzinfo=ANALYTICS_TIME_ZONE),
+        datetime.combine(end + timedelta(days=1), time.min, tzinfo=ANALYTICS_TIME_ZONE),
+    )
+
+
+def bucket_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def buckets(granularity, start, end):
+    """Every bucket start date touching [start, end], so charts get explicit zeros."""
+    current = bucket_start(start, granularity)
+    result = []
+    while current <= end:
+        result.append(current)
+        if granularity == 'day':
+            current += timedelta(days=1)
+        elif granularity == 'week':
+            current += timedelta(days=7)
+        else:
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return result
+
+
+def time_series(queryset, date_field, granularity, start, end, **aggregates):
+    """Group `queryset` into local-time buckets of `date_field` with the given aggregates.
+
+    One GROUP BY query; buckets with no rows are filled with zeros. Returns a list of
+    {"date": "YYYY-MM-DD", <aggregate>: value, ...} in bucket order.
+    """
+    trunc = GRANULARITIES[granularity][0]
+    lower, upper = local_bounds(start, end)
+    rows = queryset.filter(**{f'{date_field}__gte': lower, f'{date_field}__lt': upper}).annotate(
+        time_bucket=trunc(date_field, tzinfo=ANALYTICS_TIME_ZONE)
+    ).order_by().values('time_bucket').annotate(**aggregates)
+    found = {}
+    for row in rows:
+        bucket = row.pop('time_bucket')
+        if isinstance(bucket, datetime):
+            bucket = bucket.astimezone(ANALYTICS_TIME_ZONE).date()
+        found[bucket] = row
+    empty = {name: 0 for name in aggregates}
+    return [
+        {"date": bucket.strftime('%Y-%m-%d'), **{k: (v or 0) for k, v in found.get(bucket, empty).items()}}
+        for bucket in buckets(granularity, start, end)
+    ]
+
+
+def by_category(queryset, category_path, **aggregates):
+    """Group `queryset` by category name through the `category_path` join, in one query.
+
+    A row counts once for every category it belongs to.
+    """
+    rows = queryset.filter(**{f'{category_path}__isnull': False}).annotate(
+        category=F(f'{category_path}__name')
+    ).order_by().values('category').annotate(**aggregates).order_by('category')
+    return [{k: (v if v is not None else 0) for k, v in row.items()} for row in rows]
+
+
+def _watermark(name):
+    return RollupWatermark.objects.filter(name=name).values_list('position', flat=True).first()
+
+
+def _add_series(*series):
+    """Sum equally-bucketed time_series results field by field."""
+    merged = [dict(row) for row in series[0]]
+    for other in series[1:]:
+        for row, extra in zip(merged, other):
+            for key, value in extra.items():
+                if key != 'date':
+                    row[key] = row.get(key, 0) + value
+    return merged
+
+
+def company_activity(company, granularity, start, end):
+    """Submissions, reviews and review score totals per bucket for `company`.
+
+    Buckets before the rollup watermark are read from MetricRollup (a few rows per challenge
+    per day or month); only the stretch the rollup job has not reached yet touches the raw
+    tables. Ranges reaching back into month-compacted rollups at a finer granularity, and
+    trees where rollup_metrics has never run, are read from the raw tables instead.
+    """
+    lower, _ = local_bounds(start, end)
+    rolled = _watermark(RollupWatermark.ROLLUP)
+    monthly_until = _watermark(RollupWatermark.DAILY_COMPACTION)
+    if rolled is None or (granularity != 'month' and monthly_until and lower < monthly_until):
+        rolled = lower  # empty rollup part, whole range from the raw tables
+    return _add_series(
+        time_series(
+            MetricRollup.objects.filter(company=company, bucket__lt=rolled), 'bucket', granularity, start, end,
+            submissions=Sum('submission_count'), reviews=Sum('review_count'), score=Sum('score_sum')
+        ),
+        time_series(
+            Submission.objects.filter(challenge__company=company, submitted_at__gte=rolled), 'submitted_at',
+            granularity, start, end, submissions=Count('id')
+        ),
+        time_series(
+            SubmissionReview.objects.filter(submission__challenge__company=company, reviewed_at__gte=rolled), 'reviewed_at',
+            granularity, start, end, reviews=Count('id'), score=Sum('score')
+        ),
+    )
+
+
+def company_submissions_by_category(company):
+    """All-time submission counts per category, from the rollups plus the raw rows past the watermark."""
+    submissions = Submission.objects.filter(challenge__company=company)
+    rolled = _watermark(RollupWatermark.ROLLUP)
+    if rolled is None:
+        return by_category(submissions, 'challenge__categories', count=Count('id'))
+    counts = {}
+    for rows in (
+        by_category(MetricRollup.objects.filter(company=company, bucket__lt=rolled), 'challenge__categories', count=Sum('submission_count')),
+        by_category(submissions.filter(submitted_at__gte=rolled), 'challenge__categories', count=Count('id')),
+    ):
+        for row in rows:
+            counts[row['category']] = counts.get(row['category'], 0) + row['count']
+    return [{"category": category, "count": count} for category, count in sorted(counts.items()) if count]
+
+
+def student_performance(user, granularity, start, end):
+    submissions = Submission.objects.filter(user=user)
+    return {
+        "aggregation_type": GRANULARITIES[granularity][1],
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "scores": [
+            {"date": row["date"], "score": row["score"]}
+            for row in time_series(
+                submissions.filter(final_score__isnull=False), 'last_reviewed_at', granularity, start, end,
+                score=Sum('final_score')
+            )
+        ],
+        "submissions_by_category": by_category(
+            submissions, 'challenge__categories', count=Count('id'), total_score=Sum('final_score')
+        ),
+    }
+
+
+def company_performance(company, granularity, start, end):
+    activity = company_activity(company, granularity, start, end)
+    return {
+        "aggregation_type": GRANULARITIES[granularity][1],
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "challenge_trends": time_series(
+            Challenge.objects.filter(company=company), 'created_at', granularity, start, end, count=Count('id')
+        ),
+        "submission_trends": [{"date": row["date"], "count": row["submissions"]} for row in activity],
+        "review_trends": [
+            {
+                "date": row["date"],
+                "count": row["reviews"],
+                "average_score": round(row["score"] / row["reviews"], 2) if row["reviews"] else 0,
+            }
+            for row in activity
+        ],
+        "submissions_by_category": company_submissions_by_category(company),
+    }
@@ -0,0 +1,124 @@
+from collections import defaultdict
+from django.db import connections, transaction
+from django.db.models import Count, F, Q, Sum
+from challenges.models import Challenge, ChallengeCategory
+from submissions.models import Submission
+from badges.models import UserBadge
+from .maintenance import ANALYTICS_PASS_MARK, merge_category_sketches
+from .models import CategoryAnalytics, ChallengeAnalytics, UserAnalytics
+from .sketches import TDigest
+
+CHALLENGE_FIELDS = ['completions', 'score_sum', 'pass_count', 'average_score', 'pass_rate', 'score_sketch']
+USER_FIELDS = ['submissions_made', 'total_score', 'scored_count', 'average_score', 'badges_earned']
+
+
+def init_worker():
+    """Process-pool initializer: spawned workers (Windows, macOS) start without Django set up."""
+    import django
+    django.setup()
+
+
+def rebuild_challenges(challenge_ids):
+    """Recompute ChallengeAnalytics for `challenge_ids` from scratch: one grouped query, one scan for the digests."""
+    totals = {
+        row['challenge_id']: row
+        for row in Submission.objects.filter(challenge_id__in=challenge_ids, final_score__isnull=False)
+        .order_by().values('challenge_id').annotate(
+            completions=Count('id'),
+            score_sum=Sum('final_score'),
+            pass_count=Count('id', filter=Q(final_score__gte=F('challenge__max_score') * ANALYTICS_PASS_MARK))
+        )
+    }
+    digests = defaultdict(TDigest)
+    for challenge_id, score, max_score in Submission.objects.filter(
+        challenge_id__in=challenge_ids, final_score__isnull=False, challenge__max_score__gt=0
+    ).values_list('challenge_id', 'final_score', 'challenge__max_score').iterator():
+        digests[challenge_id].add(100 * score / max_score)
+    rows = []
+    for challenge_id in challenge_ids:
+        row = totals.get(challenge_id, {})
+        completions = row.get('completions', 0)
+        score_sum = row.get('score_sum') or 0.0
+        pass_count = row.get('pass_count', 0)
+        rows.append(ChallengeAnalytics(
+            challenge_id=challenge_id,
+            completions=completions,
+            score_sum=score_sum,
+            pass_count=pass_count,
+            average_score=score_sum / completions if completions else 0.0,
+            pass_rate=pass_count / completions if completions else 0.0,
+            score_sketch=digests[challenge_id].to_dict() if challenge_id in digests else {}
+        ))
+    ChallengeAnalytics.objects.bulk_create(
+        rows, update_conflicts=True, unique_fields=['challenge'], update_fields=CHALLENGE_FIELDS
+    )
+    return len(rows)
+
+
+def rebuild_users(user_ids):
+    """Recompute UserAnalytics for `user_ids` from scratch with two grouped queries."""
+    submissions = {
+        row['user_id']: row
+        for row in Submission.objects.filter(user_id__in=user_ids).order_by().values('user_id').annotate(
+            made=Count('id'),
+            scored=Count('id', filter=Q(final_score__isnull=False)),
+            total=Sum('final_score')
+        )
+    }
+    badges = dict(
+        UserBadge.objects.filter(user_id__in=user_ids).order_by().values('user_id').annotate(n=Count('id')).values_list('user_id', 'n')
+    )
+    rows = []
+    for user_id in user_ids:
+        row = submissions.get(user_id, {})
+        scored = row.get('scored', 0)
+        total = row.get('total') or 0.0
+        rows.append(UserAnalytics(
+            user_id=user_id,
+            submissions_made=row.get('made', 0),
+            total_score=total,
+            scored_count=scored,
+            average_score=total / scored if scored else 0.0,
+            badges_earned=badges.get(user_id, 0)
+        ))
+    UserAnalytics.objects.bulk_create(
+        rows, update_conflicts=True, unique_fields=['user'], update_fields=USER_FIELDS
+    )
+    return len(rows)
+
+
+def rebuild_categories():
+    """Re-merge every category digest from its challenges' digests; run after the challenge shards."""
+    category_ids = list(ChallengeCategory.objects.values_list('id', flat=True))
+    with transaction.atomic():
+        CategoryAnalytics.objects.bulk_create([CategoryAnalytics(category_id=i) for i in category_ids], ignore_conflicts=True)
+        categories = list(CategoryAnalytics.objects.select_for_update().order_by('category_id'))
+        digests = merge_category_sketches(category_ids)
+        for category in categories:
+            digest = digests.get(category.category_id) or TDigest()
+            category.score_sketch = digest.to_dict() if digest.count else {}
+            category.completions = digest.count
+        CategoryAnalytics.objects.bulk_update(categories, ['score_sketch', 'completions'], batch_size=500)
+    return len(categories)
+
+
+def rebuild_shard(kind, ids):
+    """Entry point run in a pool worker; closes the worker's connection when the shard is done."""
+    try:
+        return kind, (rebuild_challenges if kind == 'challenges' else rebuild_users)(ids)
+    finally:
+        connections.close_all()
+
+
+def shards(kind, shard_size):
+    """Split every challenge id, or every user id with submissions, badges or an analytics row, into shards."""
+    if kind == 'challenges':
+        ids = list(Challenge.objects.order_by('id').values_list('id', flat=True))
+    else:
+        ids = sorted(
+            set(Submission.objects.order_by().values_list('user_id', flat=True).distinct())
+            | set(UserBadge.objects.order_by().values_list('user_id', flat=True).distinct())
+            | set(UserAnalytics.objects.values_list('user_id', flat=True))
+        )
+    for i in range(0, len(ids), shard_size):
+        yield kind, ids[i:i + shard_size]
@@ -0,0 +1,215 @@
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, Exists, Max, Min, OuterRef, Subquery
+from django.utils import timezone
+from challenges.models import Challenge
+from submissions.models import ChallengeAttempt, Submission
+from .models import ChallengeBenchmark, PlatformBenchmark
+
+BENCHMARK_CACHE_TIMEOUT = getattr(settings, 'BENCHMARK_CACHE_TIMEOUT', 60 * 60 * 24)
+BENCHMARK_CHUNK_SIZE = 5000
+
+# metric -> True when a lower value is the better result
+METRICS = {
+    'completion_rate': False,  # share of timed-attempt starters who submitted; timed challenges only
+    'average_score': False,  # mean final score as a percentage of max_score
+    'time_to_submit_minutes': True,  # median time from attempt start to submission
+    'review_turnaround_hours': True,  # median time from submission to first review
+}
+PERCENTILES = [25, 50, 75, 90]
+
+
+def _epoch(values):
+    return np.array([value.timestamp() if value else np.nan for value in values], dtype=float)
+
+
+def _group_median(index, values, n):
+    """Median of `values` per group id in `index` (NaNs ignored); NaN for empty groups.
+
+    One sort by (group, value) lines every group up in order, so each median is read at
+    the group's middle offset(s) without a loop over groups.
+    """
+    valid = ~np.isnan(values)
+    index, values = index[valid], values[valid]
+    values = values[np.lexsort((values, index))]
+    counts = np.bincount(index, minlength=n)
+    starts = np.cumsum(counts) - counts
+    medians = np.full(n, np.nan)
+    present = counts > 0
+    lower = starts[present] + (counts[present] - 1) // 2
+    upper = starts[present] + counts[present] // 2
+    medians[present] = (values[lower] + values[upper]) / 2
+    return medians
+
+
+def _per_challenge(queryset, aggregate, position, empty):
+    """One GROUP BY challenge_id over `queryset`, as an array aligned with the challenge rows."""
+    values = np.full(len(position), empty, dtype=float)
+    for challenge_id, value in queryset.order_by().values('challenge_id').annotate(value=aggregate).values_list('challenge_id', 'value'):
+        if value is not None:
+            values[position[challenge_id]] = value
+    return values
+
+
+def snapshot_metrics():
+    """Compute every metric for all published challenges, vectorized.
+
+    Counts and averages are grouped per challenge in SQL. The two medians need every
+    submission's timings: those are streamed in chunks into arrays sized up front, so
+    memory holds three numbers per submission rather than a row of datetimes.
+    completion_rate and time_to_submit_minutes only exist for timed challenges, the only
+    ones that record attempt starts, and are NaN for the rest. Returns (challenge rows, {metric: array aligned with the rows}).
+    """
+    challenges = list(Challenge.objects.filter(is_published=True).order_by('id').values_list(
+        'id', 'challenge_type', 'difficulty', 'max_score', 'duration_minutes'
+    ))
+    n = len(challenges)
+    position = {row[0]: i for i, row in enumerate(challenges)}
+    max_scores = np.array([row[3] or np.nan for row in challenges], dtype=float)
+    timed = np.array([bool(row[4]) for row in challenges], dtype=bool)
+
+    submissions = Submission.objects.filter(challenge__is_published=True)
+    started = ChallengeAttempt.objects.filter(user_id=OuterRef('user_id'), challenge_id=OuterRef('challenge_id'))
+    attempts = _per_challenge(ChallengeAttempt.objects.filter(challenge__is_published=True), Count('id'), position, 0)
+    completed = _per_challenge(submissions.filter(Exists(started)), Count('id'), position, 0)
+    metrics = {}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        metrics['average_score'] = _per_challenge(submissions, Avg('final_score'), position, np.nan) / max_scores * 100
+        metrics['completion_rate'] = np.where(timed & (attempts > 0), np.minimum(completed / attempts, 1.0), np.nan)
+
+    total = submissions.count()
+    index = np.zeros(total, dtype=np.int64)
+    to_submit = np.full(total, np.nan)
+    turnaround = np.full(total, np.nan)
+    rows = submissions.annotate(
+        first_review=Min('reviews__reviewed_at'),
+        started_at=Subquery(started.values('started_at')[:1])
+    ).values_list('challenge_id', 'submitted_at', 'first_review', 'started_at')
+    filled = 0
+    chunk = []
+    for row in rows.iterator(chunk_size=BENCHMARK_CHUNK_SIZE):
+        if filled + len(chunk) == total:
+            break  # submitted after the count; the next snapshot picks it up
+        chunk.append(row)
+        if len(chunk) == BENCHMARK_CHUNK_SIZE:
+            filled = _fill(chunk, position, filled, index, to_submit, turnaround)
+            chunk = []
+    filled = _fill(chunk, position, filled, index, to_submit, turnaround)
+    metrics['time_to_submit_minutes'] = _group_median(index[:filled], to_submit[:filled], n)
+    metrics['review_turnaround_hours'] = _group_median(index[:filled], turnaround[:filled], n)
+    return challenges, metrics
+
+
+def _fill(chunk, position, at, index, to_submit, turnaround):
+    end = at + len(chunk)
+    if chunk:
+        submitted = _epoch(row[1] for row in chunk)
+        index[at:end] = [position[row[0]] for row in chunk]
+        to_submit[at:end] = (submitted - _epoch(row[3] for row in chunk)) / 60
+        turnaround[at:end] = (_epoch(row[2] for row in chunk) - submitted) / 3600
+    return end
+
+
+def _percentile_ranks(values, peers):
+    """Percent of `peers` below each value, counting ties as half (the midpoint rank)."""
+    ordered = np.sort(peers)
+    below = np.searchsorted(ordered, values, side='left')
+    at_or_below = np.searchsorted(ordered, values, side='right')
+    return (below + at_or_below) / 2 / len(ordered) * 100
+
+
+def snapshot():
+    """Recompute PlatformBenchmark per (type, difficulty) and every ChallengeBenchmark. Returns the group count."""
+    computed_at = timezone.now()
+    challenges, metrics = snapshot_metrics()
+    groups = {}
+    for i, (_, challenge_type, difficulty, _, _) in enumerate(challenges):
+        groups.setdefault((challenge_type, difficulty), []).append(i)
+
+    platform = []
+    benchmarks = [{} for _ in challenges]
+    for (challenge_type, difficulty), members in groups.items():
+        members = np.array(members)
+        distributions = {}
+        for metric, lower_is_better in METRICS.items():
+            values = metrics[metric][members]
+            valid = ~np.isnan(values)
+            if not valid.any():
+                continue
+            peers = values[valid]
+            distributions[metric] = {
+                "count": int(valid.sum()),
+                **{f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, np.percentile(peers, PERCENTILES))}
+            }
+            ranks = _percentile_ranks(peers, peers)
+            if lower_is_better:
+                ranks = 100 - ranks
+            for member, value, rank in zip(members[valid], peers, ranks):
+                benchmarks[member][metric] = {"value": round(float(value), 2), "percentile": round(float(rank), 1)}
+        platform.append(PlatformBenchmark(
+            challenge_type=challenge_type, difficulty=difficulty, challenge_count=len(members),
+            distributions=distributions, computed_at=computed_at
+        ))
+
+    with transaction.atomic():
+        PlatformBenchmark.objects.all().delete()
+        PlatformBenchmark.objects.bulk_create(platform)
+        ChallengeBenchmark.objects.bulk_create(
+            [ChallengeBenchmark(challenge_id=row[0], metrics=benchmarks[i], computed_at=computed_at) for i, row in enumerate(challenges)],
+            batch_size=1000, update_conflicts=True, unique_fields=['challenge'], update_fields=['metrics', 'computed_at']
+        )
+        ChallengeBenchmark.objects.exclude(challenge_id__in=[row[0] for row in challenges]).delete()
+    return len(platform)
+
+
+def build_company_report(company):
+    """Each of the company's challenges against the platform distribution for its type and difficulty.
+
+    `percentile` reads "better than X% of comparable challenges": for time metrics, where
+    lower is better, the rank is flipped. Untimed challenges have no completion_rate or
+    time_to_submit_minutes; both are left out of their metrics and listed under `not_applicable`.
+    """
+    platform = {
+        (row.challenge_type, row.difficulty): row for row in PlatformBenchmark.objects.all()
+    }
+    rows = ChallengeBenchmark.objects.filter(challenge__company=company).select_related('challenge').order_by('challenge_id')
+    report = []
+    computed_at = None
+    for row in rows:
+        challenge = row.challenge
+        peers = platform.get((challenge.challenge_type, challenge.difficulty))
+        computed_at = row.computed_at
+        not_applicable = {} if challenge.duration_minutes else {
+            'completion_rate': "Only timed challenges record attempt starts",
+            'time_to_submit_minutes': "Only timed challenges record attempt starts"
+        }
+        report.append({
+            "challenge_id": challenge.id,
+            "title": challenge.title,
+            "challenge_type": challenge.challenge_type,
+            "difficulty": challenge.difficulty,
+            "peer_challenges": peers.challenge_count if peers else 0,
+            "metrics": {
+                metric: {
+                    **row.metrics.get(metric, {"value": None, "percentile": None}),
+                    "lower_is_better": lower_is_better,
+                    "platform": peers.distributions.get(metric) if peers else None,
+                }
+                for metric, lower_is_better in METRICS.items() if metric not in not_applicable
+            },
+            "not_applicable": not_applicable,
+        })
+    return {"company_id": company.id, "computed_at": computed_at, "challenges": report}
+
+
+def get_company_report(company):
+    # Keyed by snapshot time, so a new nightly run is picked up by every process without clearing caches.
+    computed_at = PlatformBenchmark.objects.aggregate(latest=Max('computed_at'))['latest']
+    key = f"company-benchmarks:{company.id}:{computed_at.timestamp() if computed_at else 0}"
+    report = cache.get(key)
+    if report is None:
+        report = build_company_report(company)
+        cache.set(key, report, BENCHMARK_CACHE_TIMEOUT)
+    return report
@@ -0,0 +1,147 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from challenges.models import Challenge
+from challenges.serializers import FeaturedChallengeSerializer
+from submissions.models import Submission
+from submissions.serializers import StudentSubmissionSerializer
+from .models import UserAnalytics
+from .aggregation import parse_range, student_performance
+from .ratings import recommended_challenges
+import logging
+logger = logging.getLogger(__name__)
+
+DASHBOARD_WORKERS = getattr(settings, 'DASHBOARD_WORKERS', 5)
+DASHBOARD_SECTIONS = 5  # sections in build_student_dashboard
+
+# Shared by all requests: enough threads for DASHBOARD_WORKERS dashboards at once. Past that,
+# sections run inline on the request thread rather than queueing behind other requests.
+# Pool threads keep their DB connections between sections, subject to CONN_MAX_AGE.
+_pool_size = DASHBOARD_WORKERS * DASHBOARD_SECTIONS
+_executor = ThreadPoolExecutor(max_workers=_pool_size, thread_name_prefix='dashboard')
+_free_threads = threading.BoundedSemaphore(_pool_size)
+
+
+def get_profile(user):
+    return user.student_profile if user.role == 'student' else user.graduate_profile
+
+
+def student_summary(user):
+    row = UserAnalytics.objects.filter(user=user).values('total_score', 'submissions_made', 'badges_earned').first() or {}
+    return {
+        "total_score": row.get('total_score', 0),
+        "total_submissions": row.get('submissions_made', 0),
+        "badges_earned": row.get('badges_earned', 0)
+    }
+
+
+def recent_submissions(user):
+    submissions = Submission.objects.filter(user=user).select_related('challenge').prefetch_related(
+        'challenge__categories', 'challenge__tasks', 'challenge__attachments', 'challenge__rubrics',
+        'challenge__groups', 'challenge__prerequisites', 'challenge__feedback', 'files', 'reviews'
+    ).order_by('-submitted_at')[:2]
+    return StudentSubmissionSerializer(submissions, many=True).data
+
+
+def featured_challenges():
+    challenges = Challenge.objects.filter(
+        is_published=True,
+        is_featured=True,
+        visibility='public',
+        end_date__gte=timezone.now()
+    ).prefetch_related('categories')[:5]
+    return FeaturedChallengeSerializer(challenges, many=True).data
+
+
+def student_recommendations(profile):
+    recommendations = []
+    # Check for incomplete profile skills
+    if not profile.skills:
+        recommendations.append({"action": "Update your skills", "link": "/my_account"})
+
+    # Find challenges with nearest deadlines
+    now = timezone.now()
+    challenges = list(Challenge.objects.filter(
+        is_published=True,
+        visibility='public',
+        end_date__gt=now
+    ).order_by('end_date')[:2])  # Get up to 2 challenges with earliest end_date
+
+    if challenges:
+        earliest_end_date = challenges[0].end_date
+        # Include challenges with the same earliest end_date (up to 2)
+        for challenge in challenges:
+            if challenge.end_date == earliest_end_date:
+                days_left = (challenge.end_date - now).days
+                recommendations.append({
+                    "action": f"Complete '{challenge.title}' (Due in {days_left} day{'s' if days_left != 1 else ''})",
+                    "link": f"/challenges/{challenge.id}"
+                })
+
+    # Challenges pitched at the student's skill ratings
+    linked = {item["link"] for item in recommendations}
+    for match in recommended_challenges(profile.user, limit=2):
+        link = f"/challenges/{match['challenge_id']}"
+        if link not in linked:
+            recommendations.append({
+                "action": f"Try '{match['title']}' (a good match for your {match['category']} rating)",
+                "link": link
+            })
+
+    # Always include job exploration
+    recommendations.append({"action": "Explore job opportunities", "link": "/jobs"})
+    return recommendations
+
+
+def _run_section(func, *args):
+    close_old_connections()  # drop this thread's connection if it broke or outlived CONN_MAX_AGE
+    try:
+        return func(*args)
+    finally:
+        _free_threads.release()
+
+
+def _submit(func, *args):
+    if _free_threads.acquire(blocking=False):
+        return _executor.submit(_run_section, func, *args)
+    future = Future()  # pool saturated: run on the request thread and its connection
+    try:
+        future.set_result(func(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def build_student_dashboard(user, params=None):
+    """Run the independent dashboard sections concurrently and gather them into one payload.
+
+    Each section runs on its own pooled thread with its own DB connection, so the slowest
+    section sets the response time instead of the sum of all of them; when every pooled
+    thread is busy a section runs inline instead of waiting for one. A failing section is
+    reported under "errors" rather than failing the whole dashboard. `params` may carry the
+    performance chart's granularity/start/end; bad values raise AnalyticsQueryError.
+    """
+    granularity, start, end = parse_range(params or {})
+    profile = get_profile(user)  # resolved once here and shared with the sections that need it
+    sections = {
+        "summary": (student_summary, user),
+        "performance": (student_performance, user, granularity, start, end),
+        "recent_submissions": (recent_submissions, user),
+        "featured_challenges": (featured_challenges,),
+        "recommendations": (student_recommendations, profile),
+    }
+    futures = {name: _submit(*call) for name, call in sections.items()}
+    payload = {}
+    errors = {}
+    for name, future in futures.items():
+        try:
+            payload[name] = future.result()
+        except Exception as e:
+            logger.error(f"Dashboard section {name} failed for user {user.email}: {str(e)}")
+            payload[name] = None
+            errors[name] = "Could not load this section"
+    if errors:
+        payload["errors"] = errors
+    return payload
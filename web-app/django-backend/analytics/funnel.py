@@ -0,0 +1,128 @@
+import atexit
+import os
+import threading
+from collections import defaultdict
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from .aggregation import ANALYTICS_TIME_ZONE
+from .hll import HyperLogLog
+from .models import FunnelCounter
+import logging
+logger = logging.getLogger(__name__)
+
+# Funnel events are buffered per process and merged into FunnelCounter rows by a background thread once either limit is hit.
+FUNNEL_FLUSH_SIZE = getattr(settings, 'FUNNEL_FLUSH_SIZE', 200)  # distinct (challenge, stage, day) buckets
+FUNNEL_FLUSH_INTERVAL = getattr(settings, 'FUNNEL_FLUSH_INTERVAL', 60)  # seconds
+
+STAGES = [stage for stage, _ in FunnelCounter.STAGE_CHOICES]
+
+
+class FunnelBuffer:
+    """Collects funnel events in per-bucket HyperLogLogs; a daemon thread merges them into the database.
+
+    Like analytics.activity.ActivityBuffer, recording never writes: the flusher thread wakes
+    when `max_size` buckets are waiting or every `interval` seconds and merges them in its own
+    transaction, so no request pays for the write or holds FunnelCounter locks while its
+    own transaction is open.
+    """
+
+    def __init__(self, max_size=FUNNEL_FLUSH_SIZE, interval=FUNNEL_FLUSH_INTERVAL):
+        self.max_size = max_size
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._pending = {}  # (challenge_id, stage, day) -> [HyperLogLog, events]
+        self._wake = threading.Event()
+        self._start_lock = threading.Lock()
+        self._pid = None
+
+    def record(self, stage, challenge_ids, user_id, at=None):
+        day = (at or timezone.now()).astimezone(ANALYTICS_TIME_ZONE).date()
+        with self._lock:
+            for challenge_id in challenge_ids:
+                bucket = self._pending.setdefault((challenge_id, stage, day), [HyperLogLog(), 0])
+                bucket[0].add(user_id)
+                bucket[1] += 1
+            due = len(self._pending) >= self.max_size
+        if self._pid != os.getpid():
+            self._start()
+        if due:
+            self._wake.set()
+
+    def _start(self):
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # Also restarts the flusher in a forked worker, which inherits the buffer but not the thread.
+            threading.Thread(target=self._run, name='funnel-flusher', daemon=True).start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            close_old_connections()
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            with transaction.atomic():
+                FunnelCounter.objects.bulk_create(
+                    [FunnelCounter(challenge_id=c, stage=s, day=d) for c, s, d in pending], ignore_conflicts=True
+                )
+                # Row locks make the read-merge-write safe against other workers flushing the same buckets.
+                match = Q()
+                for challenge_id, stage, day in pending:
+                    match |= Q(challenge_id=challenge_id, stage=stage, day=day)
+                rows = list(FunnelCounter.objects.select_for_update().filter(match).order_by('id'))
+                for row in rows:
+                    sketch, events = pending[(row.challenge_id, row.stage, row.day)]
+                    row.registers = HyperLogLog.from_bytes(bytes(row.registers)).merge(sketch).to_bytes()
+                    row.events += events
+                FunnelCounter.objects.bulk_update(rows, ['registers', 'events'], batch_size=200)
+        except Exception as e:
+            logger.error(f"Failed to flush {len(pending)} funnel buckets: {str(e)}")
+            return 0
+        return len(pending)
+
+
+funnel_buffer = FunnelBuffer()
+atexit.register(funnel_buffer.flush)
+
+
+def record(stage, challenge_ids, user_id):
+    """Count `user_id` as having reached `stage` of each challenge today, once the current transaction commits."""
+    challenge_ids = list(challenge_ids)
+    transaction.on_commit(lambda: funnel_buffer.record(stage, challenge_ids, user_id))
+
+
+def challenge_funnel(challenge, start, end):
+    """Unique users and events per stage of `challenge` over local days [start, end].
+
+    One query for at most five rows per day; the day registers are merged in memory, so
+    the cost depends on the length of the range and never on the number of events.
+    """
+    sketches = defaultdict(HyperLogLog)
+    events = defaultdict(int)
+    for stage, registers, count in FunnelCounter.objects.filter(
+        challenge=challenge, day__gte=start, day__lte=end
+    ).values_list('stage', 'registers', 'events'):
+        sketches[stage].merge(HyperLogLog.from_bytes(bytes(registers)))
+        events[stage] += count
+    stages = []
+    previous = None
+    for stage in STAGES:
+        users = sketches[stage].count() if stage in sketches else 0
+        stages.append({
+            "stage": stage,
+            "users": users,
+            "events": events[stage],
+            "conversion": round(min(users / previous, 1.0), 4) if previous else None,
+        })
+        previous = users
+    return {"challenge_id": challenge.id, "start": start.isoformat(), "end": end.isoformat(), "stages": stages}
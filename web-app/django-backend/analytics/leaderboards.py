@@ -0,0 +1,208 @@
+from django.db import transaction
+from django.db.models import F, Sum, Window
+from django.db.models.functions import Rank
+from submissions.models import Submission
+from .maintenance import category_links
+from .models import ChallengeAnalytics, LeaderboardEntry, UserAnalytics
+
+GLOBAL = ('global', 0)
+# Challenge ranks are kept exact on every review; category and global ranks are as of the
+# last refresh_leaderboards run.
+EXACT_RANK_SCOPES = {'challenge'}
+# A board with more moves than this in one batch (bulk grading) is re-ranked whole instead.
+RANK_SHIFT_LIMIT = 50
+
+
+def board(scope, scope_id=0):
+    return LeaderboardEntry.objects.filter(scope=scope, scope_id=scope_id)
+
+
+def _upsert(scope, rows):
+    """Write {(scope_id, user_id): score} onto the `scope` boards, clearing the moved entries' ranks."""
+    LeaderboardEntry.objects.bulk_create(
+        [LeaderboardEntry(scope=scope, scope_id=scope_id, user_id=user_id, score=score) for (scope_id, user_id), score in rows.items()],
+        batch_size=1000, update_conflicts=True,
+        unique_fields=['scope', 'scope_id', 'user'], update_fields=['score', 'rank', 'updated_at']
+    )
+
+
+def _lock_challenge_boards(challenge_ids):
+    """Serialize writers per challenge board on its ChallengeAnalytics row, taken in id order."""
+    ChallengeAnalytics.objects.bulk_create([ChallengeAnalytics(challenge_id=challenge_id) for challenge_id in challenge_ids], ignore_conflicts=True)
+    list(ChallengeAnalytics.objects.select_for_update().filter(challenge_id__in=challenge_ids).order_by('challenge_id').values_list('id'))
+
+
+def rank_board(scope, scope_id=0):
+    """Re-rank one board with a RANK() window over its scores; only rows whose rank moved are written.
+
+    Ties share a rank (1, 2, 2, 4). Reads then find any user's rank, or a slice of the
+    board, through the (scope, scope_id, rank) index instead of sorting per request.
+    """
+    with transaction.atomic():
+        if scope == 'challenge':
+            _lock_challenge_boards([scope_id])
+        ranked = board(scope, scope_id).annotate(
+            new_rank=Window(Rank(), order_by=F('score').desc())
+        ).values_list('id', 'rank', 'new_rank')
+        moved = [LeaderboardEntry(id=entry_id, rank=new_rank) for entry_id, rank, new_rank in ranked if rank != new_rank]
+        LeaderboardEntry.objects.bulk_update(moved, ['rank'], batch_size=1000)
+    return len(moved)
+
+
+def _rank_among(others, score):
+    """Rank `score` takes among `others`, whose ranks already account for it, from its neighbours on the score index."""
+    below = others.filter(score__lte=score).order_by('-score').values_list('score', 'rank').first()
+    if below is not None and below[1] is not None:
+        return below[1] if below[0] == score else below[1] - 1
+    above = others.filter(score__gt=score).order_by('score').values_list('score', 'rank').first()
+    if below is None and above is not None and above[1] is not None:
+        return above[1] + others.filter(score=above[0]).count()
+    if below is None and above is None:
+        return 1
+    return others.filter(score__gt=score).count() + 1  # a neighbour is unranked: count instead
+
+
+def _shift(challenge_id, user_id, score):
+    """Move one user to `score` (None to drop them) on a challenge board, keeping every rank exact.
+
+    Only the entries between the old and new score move, by one place, in a single UPDATE:
+    a rise pushes the rows it passes down, a fall pulls them up. Entering the board pushes
+    down everything below the new score and leaving it pulls up everything below the old one.
+    """
+    entries = board('challenge', challenge_id)
+    entry = entries.filter(user_id=user_id).first()
+    others = entries.exclude(user_id=user_id)
+    if entry is None:
+        if score is None:
+            return
+        others.filter(score__lt=score).update(rank=F('rank') + 1)
+    elif score is None:
+        others.filter(score__lt=entry.score).update(rank=F('rank') - 1)
+        entry.delete()
+        return
+    elif score > entry.score:
+        others.filter(score__gte=entry.score, score__lt=score).update(rank=F('rank') + 1)
+    elif score < entry.score:
+        others.filter(score__gte=score, score__lt=entry.score).update(rank=F('rank') - 1)
+    rank = _rank_among(others, score)
+    if entry is None:
+        LeaderboardEntry.objects.create(scope='challenge', scope_id=challenge_id, user_id=user_id, score=score, rank=rank)
+    elif (entry.score, entry.rank) != (score, rank):
+        entry.score, entry.rank = score, rank
+        entry.save(update_fields=['score', 'rank', 'updated_at'])
+
+
+def record_score_changes(changes):
+    """Move the owners of re-scored submissions on their challenge, category and global boards.
+
+    Challenge boards are locked one at a time and kept exactly ranked by shifting only the
+    entries each move passes (see _shift); a board with more than RANK_SHIFT_LIMIT moves in
+    the batch is re-ranked whole instead. Category and global scores are upserted straight
+    away and re-ranked by the refresh_leaderboards command; until then a moved entry has
+    no stored rank and is counted from the score index when read, and the other entries'
+    ranks are approximate.
+    """
+    changes = [change for change in changes if change.old_score != change.new_score]
+    if not changes:
+        return
+    user_ids = {change.user_id for change in changes}
+    challenge_ids = {change.challenge_id for change in changes}
+    categories = category_links(challenge_ids)
+    category_ids = set().union(*categories.values())
+    by_challenge = {}
+    for change in changes:
+        by_challenge.setdefault(change.challenge_id, {})[change.user_id] = change.new_score
+
+    with transaction.atomic():
+        _lock_challenge_boards(sorted(by_challenge))
+        for challenge_id, scores in sorted(by_challenge.items()):
+            if len(scores) <= RANK_SHIFT_LIMIT:
+                for user_id, score in scores.items():
+                    _shift(challenge_id, user_id, score)
+                continue
+            _upsert('challenge', {(challenge_id, user_id): score for user_id, score in scores.items() if score is not None})
+            board('challenge', challenge_id).filter(user_id__in=[user_id for user_id, score in scores.items() if score is None]).delete()
+            rank_board('challenge', challenge_id)
+
+        totals = dict(
+            UserAnalytics.objects.filter(user_id__in=user_ids, scored_count__gt=0).values_list('user_id', 'total_score')
+        )
+        _upsert('global', {(0, user_id): total for user_id, total in totals.items()})
+        board(*GLOBAL).filter(user_id__in=user_ids - set(totals)).delete()
+
+        if category_ids:
+            scores = {
+                (row['challenge__categories'], row['user_id']): row['total']
+                for row in Submission.objects.filter(
+                    user_id__in=user_ids, final_score__isnull=False, challenge__categories__in=category_ids
+                ).order_by().values('user_id', 'challenge__categories').annotate(total=Sum('final_score'))
+            }
+            _upsert('category', scores)
+            for change in changes:
+                for category_id in categories[change.challenge_id]:
+                    if (category_id, change.user_id) not in scores:
+                        board('category', category_id).filter(user_id=change.user_id).delete()
+
+
+def rebuild(scope):
+    """Recompute every `scope` board from the source tables and re-rank it. Returns the number of boards."""
+    if scope == 'challenge':
+        rows = Submission.objects.filter(final_score__isnull=False).values_list('challenge_id', 'user_id', 'final_score')
+    elif scope == 'category':
+        rows = Submission.objects.filter(final_score__isnull=False, challenge__categories__isnull=False).order_by().values(
+            'challenge__categories', 'user_id'
+        ).annotate(total=Sum('final_score')).values_list('challenge__categories', 'user_id', 'total')
+    else:
+        rows = UserAnalytics.objects.filter(scored_count__gt=0).values_list('user_id', 'total_score')
+        rows = ((0, user_id, total) for user_id, total in rows)
+
+    scores = {(scope_id, user_id): score for scope_id, user_id, score in rows}
+    with transaction.atomic():
+        LeaderboardEntry.objects.filter(scope=scope).delete()
+        LeaderboardEntry.objects.bulk_create(
+            [LeaderboardEntry(scope=scope, scope_id=scope_id, user_id=user_id, score=score) for (scope_id, user_id), score in scores.items()],
+            batch_size=1000
+        )
+    boards = {scope_id for scope_id, _ in scores}
+    for scope_id in boards:
+        rank_board(scope, scope_id)
+    return len(boards)
+
+
+def _rank_of(entry):
+    if entry.rank is not None:
+        return entry.rank
+    return board(entry.scope, entry.scope_id).filter(score__gt=entry.score).count() + 1
+
+
+def _row(entry, rank=None):
+    return {
+        "rank": rank or _rank_of(entry),
+        "user_id": entry.user_id,
+        "name": f"{entry.user.first_name} {entry.user.last_name[:1]}".strip() or f"User {entry.user_id}",
+        "score": round(entry.score, 2),
+    }
+
+
+def top(scope, scope_id=0, limit=10):
+    entries = board(scope, scope_id).select_related('user').order_by('-score', 'user_id')[:limit]
+    return [_row(entry) for entry in entries]
+
+
+def standing(scope, scope_id, user, around=5):
+    """The user's own row plus up to `around` entries either side, or None if they are not on the board.
+
+    Neighbours are read off the score index, so they are the right entries even while the
+    stored ranks of a category or global board wait for the next refresh.
+    """
+    entry = board(scope, scope_id).select_related('user').filter(user=user).first()
+    if entry is None:
+        return None
+    others = board(scope, scope_id).exclude(user=user).select_related('user')
+    above = others.filter(score__gt=entry.score).order_by('score', '-user_id')[:around]
+    below = others.filter(score__lte=entry.score).order_by('-score', 'user_id')[:around]
+    return {
+        "me": _row(entry),
+        "neighbours": [_row(neighbour) for neighbour in [*reversed(list(above)), *below]],
+        "participants": board(scope, scope_id).count(),
+    }
@@ -0,0 +1,197 @@
+from collections import defaultdict
+from django.conf import settings
+from django.db.models import Case, Count, F, FloatField, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+from challenges.models import Challenge
+from badges.models import UserBadge
+from submissions.models import Submission
+from .models import CategoryAnalytics, ChallengeAnalytics, UserAnalytics
+from .sketches import TDigest, merged
+
+# A submission passes when its final score reaches this fraction of the challenge's max_score.
+ANALYTICS_PASS_MARK = getattr(settings, 'ANALYTICS_PASS_MARK', 0.5)
+
+
+def apply_deltas(model, key_field, deltas):
+    """Add per-row deltas to counter columns of `model`, creating missing rows first.
+
+    `deltas` maps key (e.g. a user id) -> {field: delta}. Every field is moved with one
+    UPDATE ... SET field = field + CASE key WHEN ... END over all keys, so concurrent
+    writers never overwrite each other and the cost does not grow with the key count.
+    """
+    deltas = {key: fields for key, fields in deltas.items() if any(fields.values())}
+    if not deltas:
+        return
+    model.objects.bulk_create([model(**{key_field: key}) for key in deltas], ignore_conflicts=True)
+    fields = {field for changes in deltas.values() for field in changes}
+    updates = {}
+    for field in fields:
+        cast = float if isinstance(model._meta.get_field(field), FloatField) else int
+        updates[field] = F(field) + Case(
+            *[When(**{key_field: key}, then=Value(cast(changes.get(field, 0)))) for key, changes in deltas.items()],
+            default=Value(cast(0)),
+            output_field=FloatField() if cast is float else IntegerField()
+        )
+    model.objects.filter(**{f'{key_field}__in': list(deltas)}).update(updated_at=timezone.now(), **updates)
+
+
+def _ratio(numerator, denominator):
+    return Case(
+        When(**{f'{denominator}__gt': 0}, then=Cast(numerator, FloatField()) / F(denominator)),
+        default=Value(0.0),
+        output_field=FloatField()
+    )
+
+
+def refresh_derived(user_ids=(), challenge_ids=()):
+    """Recompute average_score / pass_rate from the running sums of the given rows."""
+    if user_ids:
+        UserAnalytics.objects.filter(user_id__in=list(user_ids)).update(
+            average_score=_ratio('total_score', 'scored_count')
+        )
+    if challenge_ids:
+        ChallengeAnalytics.objects.filter(challenge_id__in=list(challenge_ids)).update(
+            average_score=_ratio('score_sum', 'completions'),
+            pass_rate=_ratio('pass_count', 'completions')
+        )
+
+
+def record_score_changes(changes):
+    """Fold changed final scores (submissions.scoring.ScoreChange) into the analytics rows.
+
+    Each change contributes new - old to the score sums and +1/-1 to the scored counts
+    when a submission gains or loses its score, so nothing is re-aggregated.
+    """
+    if not changes:
+        return
+    max_scores = dict(
+        Challenge.objects.filter(id__in={change.challenge_id for change in changes}).values_list('id', 'max_score')
+    )
+
+    def passed(score, challenge_id):
+        return score is not None and score >= ANALYTICS_PASS_MARK * (max_scores.get(challenge_id) or 0)
+
+    users = defaultdict(lambda: defaultdict(float))
+    challenges = defaultdict(lambda: defaultdict(float))
+    for change in changes:
+        if change.old_score == change.new_score:
+            continue
+        counted = (change.new_score is not None) - (change.old_score is not None)
+        score_delta = (change.new_score or 0) - (change.old_score or 0)
+        users[change.user_id]['total_score'] += score_delta
+        users[change.user_id]['scored_count'] += counted
+        challenges[change.challenge_id]['score_sum'] += score_delta
+        challenges[change.challenge_id]['completions'] += counted
+        challenges[change.challenge_id]['pass_count'] += (
+            passed(change.new_score, change.challenge_id) - passed(change.old_score, change.challenge_id)
+        )
+
+    apply_deltas(UserAnalytics, 'user_id', users)
+    apply_deltas(ChallengeAnalytics, 'challenge_id', challenges)
+    refresh_derived(users, challenges)
+    record_score_sketches(changes, max_scores)
+
+
+def category_links(challenge_ids):
+    """{challenge id: {category ids}} for the given challenges."""
+    links = defaultdict(set)
+    for challenge_id, category_id in Challenge.categories.through.objects.filter(
+        challenge_id__in=challenge_ids
+    ).values_list('challenge_id', 'challengecategory_id'):
+        links[challenge_id].add(category_id)
+    return links
+
+
+def challenge_sketch(challenge_id, max_score):
+    """A fresh digest of every final score of one challenge, as a percentage of max_score."""
+    scores = Submission.objects.filter(challenge_id=challenge_id, final_score__isnull=False).values_list('final_score', flat=True)
+    return TDigest().update(100 * score / max_score for score in scores.iterator()) if max_score else TDigest()
+
+
+def merge_category_sketches(category_ids):
+    """Rebuild category digests by merging their challenges' digests; the caller holds the row locks."""
+    sketches = defaultdict(list)
+    for category_id, sketch in ChallengeAnalytics.objects.filter(challenge__categories__in=category_ids).values_list(
+        'challenge__categories', 'score_sketch'
+    ):
+        sketches[category_id].append(sketch)
+    return {category_id: merged(sketches[category_id]) for category_id in category_ids}
+
+
+def record_score_sketches(changes, max_scores):
+    """Fold changed final scores into the challenge and category score digests.
+
+    New scores are simply added. A digest cannot forget a value, so a challenge where a
+    score changed or disappeared gets its digest rebuilt from its final scores, and its
+    categories are re-merged from their challenges' digests. Rows are locked in id order.
+    """
+    added = defaultdict(list)
+    rebuilt = set()
+    for change in changes:
+        if change.old_score == change.new_score or not max_scores.get(change.challenge_id):
+            continue
+        if change.old_score is None:
+            added[change.challenge_id].append(100 * change.new_score / max_scores[change.challenge_id])
+        else:
+            rebuilt.add(change.challenge_id)
+    if not added and not rebuilt:
+        return
+
+    rows = list(
+        ChallengeAnalytics.objects.select_for_update().filter(challenge_id__in=set(added) | rebuilt).order_by('challenge_id')
+    )
+    for row in rows:
+        if row.challenge_id in rebuilt:
+            digest = challenge_sketch(row.challenge_id, max_scores[row.challenge_id])
+        else:
+            digest = TDigest.from_dict(row.score_sketch).update(added[row.challenge_id])
+        row.score_sketch = digest.to_dict()
+    ChallengeAnalytics.objects.bulk_update(rows, ['score_sketch'])
+
+    links = category_links(set(added) | rebuilt)
+    remerge = {category_id for challenge_id in rebuilt for category_id in links[challenge_id]}
+    additions = defaultdict(list)
+    for challenge_id, values in added.items():
+        if challenge_id not in rebuilt:
+            for category_id in links[challenge_id] - remerge:
+                additions[category_id].extend(values)
+    if not additions and not remerge:
+        return
+    CategoryAnalytics.objects.bulk_create(
+        [CategoryAnalytics(category_id=category_id) for category_id in set(additions) | remerge], ignore_conflicts=True
+    )
+    categories = list(
+        CategoryAnalytics.objects.select_for_update().filter(category_id__in=set(additions) | remerge).order_by('category_id')
+    )
+    fresh = merge_category_sketches(remerge) if remerge else {}
+    for category in categories:
+        if category.category_id in remerge:
+            digest = fresh[category.category_id]
+        else:
+            digest = TDigest.from_dict(category.score_sketch).update(additions[category.category_id])
+        category.score_sketch = digest.to_dict()
+        category.completions = digest.count
+    CategoryAnalytics.objects.bulk_update(categories, ['score_sketch', 'completions'])
+
+
+def record_submissions(user_ids, sign=1):
+    """Count new (or with sign=-1, deleted) submissions against their owners."""
+    deltas = defaultdict(lambda: defaultdict(int))
+    for user_id in user_ids:
+        deltas[user_id]['submissions_made'] += sign
+    apply_deltas(UserAnalytics, 'user_id', deltas)
+
+
+def refresh_badge_counts(user_ids):
+    """Set badges_earned from UserBadge for users whose badges were bulk-inserted (no signals fire)."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    UserAnalytics.objects.bulk_create([UserAnalytics(user_id=user_id) for user_id in user_ids], ignore_conflicts=True)
+    UserAnalytics.objects.filter(user_id__in=user_ids).update(
+        badges_earned=Coalesce(Subquery(
+            UserBadge.objects.filter(user_id=OuterRef('user_id')).order_by().values('user_id').annotate(n=Count('id')).values('n')[:1]
+        ), 0),
+        updated_at=timezone.now()
+    )
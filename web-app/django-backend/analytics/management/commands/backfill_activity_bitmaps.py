@@ -0,0 +1,34 @@
+from collections import defaultdict
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from django.db.models.functions import TruncDate
+from submissions.models import Submission, SubmissionReview
+from analytics.aggregation import ANALYTICS_TIME_ZONE
+from analytics.streaks import mark
+
+class Command(BaseCommand):
+    help = ("Sets activity bitmap bits from every existing submission and review. Only ever adds bits, "
+            "so it is safe to run while new activity is being recorded")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Users per bitmap write')
+
+    def handle(self, *args, **options):
+        sources = [
+            Submission.objects.annotate(actor=F('user_id'), day=TruncDate('submitted_at', tzinfo=ANALYTICS_TIME_ZONE)),
+            SubmissionReview.objects.filter(reviewer__isnull=False).annotate(
+                actor=F('reviewer_id'), day=TruncDate('reviewed_at', tzinfo=ANALYTICS_TIME_ZONE)
+            ),
+        ]
+        users = set()
+        for rows in sources:
+            # One row per (user, local day), in user order so each batch holds whole users.
+            batch = defaultdict(set)
+            for user_id, day in rows.values_list('actor', 'day').distinct().order_by('actor').iterator(chunk_size=5000):
+                if user_id not in batch and len(batch) >= options['batch_size']:
+                    mark(batch)
+                    batch = defaultdict(set)
+                batch[user_id].add(day)
+                users.add(user_id)
+            mark(batch)
+        self.stdout.write(self.style.SUCCESS(f'Backfilled activity bitmaps for {len(users)} users'))
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from analytics.activity import ACTIVITY_RETENTION_DAYS, prune
+
+class Command(BaseCommand):
+    help = f"Deletes activity events older than ACTIVITY_RETENTION_DAYS ({ACTIVITY_RETENTION_DAYS}), a day at a time; schedule it daily"
+
+    def handle(self, *args, **options):
+        deleted = prune()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} activity events'))
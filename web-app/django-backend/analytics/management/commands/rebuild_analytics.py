@@ -0,0 +1,38 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from django.core.management.base import BaseCommand
+from django.db import connections
+from analytics.backfill import init_worker, rebuild_categories, rebuild_shard, shards
+
+class Command(BaseCommand):
+    help = ("Recomputes ChallengeAnalytics, CategoryAnalytics and UserAnalytics from submissions and badges, sharded across a process pool. "
+            "Normally the rows are kept current incrementally; run this after imports, restores or a pass-mark change")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', choices=['challenges', 'users'], help='Rebuild only one of the two tables')
+        parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1),
+                            help='Worker processes; 1 rebuilds in this process')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Challenges or users per shard')
+
+    def handle(self, *args, **options):
+        kinds = [options['only']] if options['only'] else ['challenges', 'users']
+        work = [shard for kind in kinds for shard in shards(kind, options['batch_size'])]
+        totals = dict.fromkeys(kinds, 0)
+
+        if options['workers'] <= 1:
+            for kind, ids in work:
+                totals[kind] += rebuild_shard(kind, ids)[1]
+        else:
+            # Children must not inherit this process's open connection (fork) and must set Django up (spawn).
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=init_worker) as pool:
+                for future in as_completed([pool.submit(rebuild_shard, kind, ids) for kind, ids in work]):
+                    kind, count = future.result()
+                    totals[kind] += count
+
+        if 'challenges' in kinds:
+            totals['categories'] = rebuild_categories()  # merges the challenge digests written above
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt analytics in {len(work)} shards: " + ', '.join(f"{count} {kind}" for kind, count in totals.items())
+        ))
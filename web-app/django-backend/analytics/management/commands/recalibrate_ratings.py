@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from analytics.ratings import recalibrate
+
+class Command(BaseCommand):
+    help = ("Refits every student skill rating and challenge difficulty rating from the full history of graded "
+            "submissions; schedule it nightly")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100, help='Most fitting passes to run')
+        parser.add_argument('--tolerance', type=float, default=0.01,
+                            help='Stop once no rating moves by more than this many points in a pass')
+
+    def handle(self, *args, **options):
+        players, challenges, iterations = recalibrate(options['iterations'], options['tolerance'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Rated {players} student-category pairs and {challenges} challenges in {iterations} passes'
+        ))
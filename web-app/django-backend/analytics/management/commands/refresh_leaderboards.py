@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from analytics.leaderboards import rank_board, rebuild
+from analytics.models import LeaderboardEntry
+
+class Command(BaseCommand):
+    help = ("Re-ranks the category and global leaderboards (challenge boards are kept ranked on every review; --scope challenge repairs them). "
+            "Schedule it every few minutes; --rebuild recomputes the scores from submissions first")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scope', choices=['challenge', 'category', 'global'], action='append', dest='scopes',
+                            help='Only this scope (repeatable); default is category and global')
+        parser.add_argument('--rebuild', action='store_true', help='Recompute scores from the source tables')
+
+    def handle(self, *args, **options):
+        scopes = options['scopes'] or ['category', 'global']
+        for scope in scopes:
+            if options['rebuild']:
+                boards = rebuild(scope)
+                self.stdout.write(f'Rebuilt {boards} {scope} boards')
+                continue
+            moved = 0
+            scope_ids = LeaderboardEntry.objects.filter(scope=scope).values_list('scope_id', flat=True).distinct()
+            for scope_id in scope_ids.order_by('scope_id'):
+                moved += rank_board(scope, scope_id)
+            self.stdout.write(f'Re-ranked {scope} boards, {moved} entries moved')
+        self.stdout.write(self.style.SUCCESS('Leaderboards are up to date'))
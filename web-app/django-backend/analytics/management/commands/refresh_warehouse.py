@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from analytics.warehouse import WarehouseUnavailable, refresh
+
+class Command(BaseCommand):
+    help = ("Copies submissions, reviews, challenges, categories and enrollments changed since the last run into "
+            "the DuckDB reporting warehouse. Schedule it every few minutes, and with --full nightly")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rebuild the warehouse from scratch instead of refreshing it')
+
+    def handle(self, *args, **options):
+        try:
+            snapshot = refresh(full=options['full'])
+        except WarehouseUnavailable as e:
+            raise CommandError(str(e))
+        for table, counts in snapshot.row_counts.items():
+            self.stdout.write(f"{table}: {counts['loaded']} rows loaded, {counts['total']} in total")
+        self.stdout.write(self.style.SUCCESS(f'Warehouse snapshot written to {snapshot.path}'))
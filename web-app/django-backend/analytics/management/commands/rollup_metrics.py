@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from analytics.models import MetricRollup, RollupWatermark
+from analytics.rollups import compact, roll_up
+
+class Command(BaseCommand):
+    help = ("Brings the hourly metric rollups up to date and compacts old ones into daily and monthly rows. "
+            "Safe to re-run; schedule it every few minutes to an hour")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Drop all rollups and watermarks and rebuild them from the full history')
+        parser.add_argument('--no-compact', action='store_true', help='Skip compaction this run')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            with transaction.atomic():
+                MetricRollup.objects.all().delete()
+                RollupWatermark.objects.filter(name__startswith='metric_rollup').delete()
+
+        written, start, end = roll_up()
+        self.stdout.write(f'Rolled up {written} hourly buckets between {start.isoformat()} and {end.isoformat()}')
+        if not options['no_compact']:
+            days, months = compact()
+            self.stdout.write(f'Compacted into {days} daily and {months} monthly buckets')
+        self.stdout.write(self.style.SUCCESS('Metric rollups are up to date'))
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from analytics.benchmarks import snapshot
+
+class Command(BaseCommand):
+    help = "Recomputes platform-wide challenge benchmarks and each challenge's percentiles; schedule it nightly"
+
+    def handle(self, *args, **options):
+        groups = snapshot()
+        self.stdout.write(self.style.SUCCESS(f'Benchmarked {groups} challenge type/difficulty groups'))
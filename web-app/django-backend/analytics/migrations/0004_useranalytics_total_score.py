@@ -0,0 +1,46 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Sum
+
+
+def remove_duplicate_user_analytics(apps, schema_editor):
+    # Keep the most recent row per user so `user` can become one-to-one.
+    UserAnalytics = apps.get_model('analytics', 'UserAnalytics')
+    duplicates = UserAnalytics.objects.values('user_id').annotate(latest=Max('id'), n=Count('id')).filter(n__gt=1)
+    for row in duplicates.iterator():
+        UserAnalytics.objects.filter(user_id=row['user_id']).exclude(id=row['latest']).delete()
+
+
+def backfill_total_score(apps, schema_editor):
+    Submission = apps.get_model('submissions', 'Submission')
+    UserAnalytics = apps.get_model('analytics', 'UserAnalytics')
+    totals = Submission.objects.filter(final_score__isnull=False).values('user_id').annotate(total=Sum('final_score'))
+    for row in totals.iterator():
+        UserAnalytics.objects.update_or_create(user_id=row['user_id'], defaults={'total_score': row['total']})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_initial'),
+        ('submissions', '0012_submission_review_summary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_user_analytics, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='useranalytics',
+            name='total_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AlterField(
+            model_name='useranalytics',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='analytics', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_total_score, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:40
+
+import django.db.models.deletion
+from collections import defaultdict
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Max, Q, Sum
+
+
+def remove_duplicate_challenge_analytics(apps, schema_editor):
+    # Keep the most recent row per challenge so `challenge` can become one-to-one.
+    ChallengeAnalytics = apps.get_model('analytics', 'ChallengeAnalytics')
+    duplicates = ChallengeAnalytics.objects.values('challenge_id').annotate(latest=Max('id'), n=Count('id')).filter(n__gt=1)
+    for row in duplicates.iterator():
+        ChallengeAnalytics.objects.filter(challenge_id=row['challenge_id']).exclude(id=row['latest']).delete()
+
+
+def backfill_running_sums(apps, schema_editor):
+    Submission = apps.get_model('submissions', 'Submission')
+    ChallengeAnalytics = apps.get_model('analytics', 'ChallengeAnalytics')
+    UserAnalytics = apps.get_model('analytics', 'UserAnalytics')
+    UserBadge = apps.get_model('badges', 'UserBadge')
+    pass_mark = getattr(settings, 'ANALYTICS_PASS_MARK', 0.5)
+    scored = Submission.objects.filter(final_score__isnull=False).order_by()
+
+    challenges = scored.values('challenge_id').annotate(
+        n=Count('id'), total=Sum('final_score'),
+        passed=Count('id', filter=Q(final_score__gte=F('challenge__max_score') * pass_mark))
+    )
+    for row in challenges.iterator():
+        ChallengeAnalytics.objects.update_or_create(challenge_id=row['challenge_id'], defaults={
+            'completions': row['n'], 'score_sum': row['total'], 'pass_count': row['passed'],
+            'average_score': row['total'] / row['n'], 'pass_rate': row['passed'] / row['n'],
+        })
+
+    # Every user with a submission or a badge; the dashboard reads these columns instead of counting.
+    users = defaultdict(lambda: {'submissions_made': 0, 'scored_count': 0, 'total_score': 0.0, 'average_score': 0.0, 'badges_earned': 0})
+    for row in Submission.objects.order_by().values('user_id').annotate(
+        made=Count('id'), n=Count('id', filter=Q(final_score__isnull=False)), total=Sum('final_score')
+    ).iterator():
+        users[row['user_id']].update({
+            'submissions_made': row['made'], 'scored_count': row['n'], 'total_score': row['total'] or 0.0,
+            'average_score': row['total'] / row['n'] if row['n'] else 0.0,
+        })
+    for row in UserBadge.objects.order_by().values('user_id').annotate(n=Count('id')).iterator():
+        users[row['user_id']]['badges_earned'] = row['n']
+    for user_id, defaults in users.items():
+        UserAnalytics.objects.update_or_create(user_id=user_id, defaults=defaults)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_useranalytics_total_score'),
+        ('badges', '0003_initial'),
+        ('challenges', '0008_challenge_consensus_method'),
+        ('submissions', '0012_submission_review_summary'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_challenge_analytics, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='challengeanalytics',
+            name='pass_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='challengeanalytics',
+            name='score_sum',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='useranalytics',
+            name='scored_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='challengeanalytics',
+            name='challenge',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='analytics', to='challenges.challenge'),
+        ),
+        migrations.RunPython(backfill_running_sums, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0005_challenge_and_user_analytics_running_sums'),
+        ('challenges', '0008_challenge_consensus_method'),
+        ('companies', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('position', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MetricRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day'), ('month', 'Month')], max_length=10)),
+                ('bucket', models.DateTimeField()),
+                ('submission_count', models.IntegerField(default=0)),
+                ('review_count', models.IntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0.0)),
+                ('score_sq_sum', models.FloatField(default=0.0)),
+                ('challenge', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='metric_rollups', to='challenges.challenge')),
+                ('company', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='metric_rollups', to='companies.company')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['company', 'bucket'], name='analytics_m_company_735ad7_idx'), models.Index(fields=['granularity', 'bucket'], name='analytics_m_granula_c2d8e5_idx')],
+                'unique_together': {('challenge', 'granularity', 'bucket')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0006_metric_rollups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('challenge', 'Challenge'), ('category', 'Category'), ('global', 'Global')], max_length=10)),
+                ('scope_id', models.IntegerField(default=0)),
+                ('score', models.FloatField(default=0.0)),
+                ('rank', models.IntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['scope', 'scope_id', 'rank'], name='analytics_l_scope_558234_idx'), models.Index(fields=['scope', 'scope_id', '-score'], name='analytics_l_scope_0a91e6_idx')],
+                'unique_together': {('scope', 'scope_id', 'user')},
+            },
+        ),
+    ]
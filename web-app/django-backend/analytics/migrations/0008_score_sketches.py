@@ -0,0 +1,57 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:48
+
+import django.db.models.deletion
+from collections import defaultdict
+from django.db import migrations, models
+from analytics.sketches import TDigest
+
+
+def backfill_score_sketches(apps, schema_editor):
+    Submission = apps.get_model('submissions', 'Submission')
+    ChallengeAnalytics = apps.get_model('analytics', 'ChallengeAnalytics')
+    CategoryAnalytics = apps.get_model('analytics', 'CategoryAnalytics')
+    Challenge = apps.get_model('challenges', 'Challenge')
+    challenges = defaultdict(TDigest)
+    for challenge_id, score, max_score in Submission.objects.filter(
+        final_score__isnull=False, challenge__max_score__gt=0
+    ).values_list('challenge_id', 'final_score', 'challenge__max_score').iterator():
+        challenges[challenge_id].add(100 * score / max_score)
+    categories = defaultdict(TDigest)
+    for challenge_id, category_id in Challenge.categories.through.objects.filter(
+        challenge_id__in=list(challenges)
+    ).values_list('challenge_id', 'challengecategory_id'):
+        categories[category_id].merge(challenges[challenge_id])
+    for challenge_id, digest in challenges.items():
+        ChallengeAnalytics.objects.update_or_create(challenge_id=challenge_id, defaults={'score_sketch': digest.to_dict()})
+    for category_id, digest in categories.items():
+        CategoryAnalytics.objects.update_or_create(
+            category_id=category_id, defaults={'score_sketch': digest.to_dict(), 'completions': digest.count}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0007_leaderboard_entry'),
+        ('challenges', '0008_challenge_consensus_method'),
+        ('submissions', '0012_submission_review_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='challengeanalytics',
+            name='score_sketch',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.CreateModel(
+            name='CategoryAnalytics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('completions', models.IntegerField(default=0)),
+                ('score_sketch', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='analytics', to='challenges.challengecategory')),
+            ],
+        ),
+        migrations.RunPython(backfill_score_sketches, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0008_score_sketches'),
+        ('challenges', '0008_challenge_consensus_method'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FunnelCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(choices=[('viewed', 'Viewed'), ('opened', 'Opened'), ('started', 'Started'), ('submitted', 'Submitted'), ('graded', 'Graded')], max_length=10)),
+                ('day', models.DateField()),
+                ('registers', models.BinaryField(default=b'')),
+                ('events', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('challenge', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='funnel_counters', to='challenges.challenge')),
+            ],
+            options={
+                'unique_together': {('challenge', 'stage', 'day')},
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0009_funnel_counter'),
+        ('challenges', '0008_challenge_consensus_method'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChallengeBenchmark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metrics', models.JSONField(blank=True, default=dict)),
+                ('computed_at', models.DateTimeField()),
+                ('challenge', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='benchmark', to='challenges.challenge')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PlatformBenchmark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('challenge_type', models.CharField(max_length=50)),
+                ('difficulty', models.CharField(max_length=20)),
+                ('challenge_count', models.IntegerField(default=0)),
+                ('distributions', models.JSONField(blank=True, default=dict)),
+                ('computed_at', models.DateTimeField()),
+            ],
+            options={
+                'unique_together': {('challenge_type', 'difficulty')},
+            },
+        ),
+    ]
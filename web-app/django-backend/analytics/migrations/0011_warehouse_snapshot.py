@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0010_benchmarks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WarehouseSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=500)),
+                ('position', models.DateTimeField()),
+                ('full', models.BooleanField(default=False)),
+                ('row_counts', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0011_warehouse_snapshot'),
+        ('challenges', '0008_challenge_consensus_method'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('challenge_list', 'Challenge list viewed'), ('challenge_open', 'Challenge opened'), ('download', 'Download'), ('dashboard', 'Dashboard viewed')], max_length=20)),
+                ('detail', models.CharField(blank=True, max_length=50)),
+                ('day', models.DateField()),
+                ('occurred_at', models.DateTimeField()),
+                ('challenge', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='challenges.challenge')),
+                ('user', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'kind'], name='analytics_a_day_057750_idx'), models.Index(fields=['day', 'challenge'], name='analytics_a_day_ff833a_idx'), models.Index(fields=['day', 'user'], name='analytics_a_day_8c1071_idx')],
+            },
+        ),
+    ]
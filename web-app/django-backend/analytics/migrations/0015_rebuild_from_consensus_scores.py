@@ -0,0 +1,106 @@
+# Generated by Django 5.2.5 on 2026-10-19 18:40
+
+from collections import defaultdict
+from importlib import import_module
+import numpy as np
+from django.db import migrations
+from django.db.models import Sum
+from analytics.ratings import fit, outcome
+
+running_sums = import_module('analytics.migrations.0005_challenge_and_user_analytics_running_sums')
+score_sketches = import_module('analytics.migrations.0008_score_sketches')
+
+
+def _ranked(scope, scope_id, scores):
+    """Entries for one board, ranked with ties sharing a rank (1, 2, 2, 4)."""
+    ordered = sorted(scores.items(), key=lambda item: -item[1])
+    entries, rank, previous = [], 0, None
+    for position, (user_id, score) in enumerate(ordered, start=1):
+        if score != previous:
+            rank, previous = position, score
+        entries.append((scope, scope_id, user_id, score, rank))
+    return entries
+
+
+def rebuild_leaderboards(apps, schema_editor):
+    Submission = apps.get_model('submissions', 'Submission')
+    UserAnalytics = apps.get_model('analytics', 'UserAnalytics')
+    LeaderboardEntry = apps.get_model('analytics', 'LeaderboardEntry')
+    if not LeaderboardEntry.objects.exists():
+        return  # never filled; refresh_leaderboards --rebuild builds the boards from scratch
+    boards = defaultdict(dict)
+    scored = Submission.objects.filter(final_score__isnull=False).order_by()
+    for challenge_id, user_id, score in scored.values_list('challenge_id', 'user_id', 'final_score'):
+        boards[('challenge', challenge_id)][user_id] = score
+    for category_id, user_id, total in scored.filter(challenge__categories__isnull=False).values(
+        'challenge__categories', 'user_id'
+    ).annotate(total=Sum('final_score')).values_list('challenge__categories', 'user_id', 'total'):
+        boards[('category', category_id)][user_id] = total
+    for user_id, total in UserAnalytics.objects.filter(scored_count__gt=0).values_list('user_id', 'total_score'):
+        boards[('global', 0)][user_id] = total
+    LeaderboardEntry.objects.all().delete()
+    LeaderboardEntry.objects.bulk_create([
+        LeaderboardEntry(scope=scope, scope_id=scope_id, user_id=user_id, score=score, rank=rank)
+        for (scope, scope_id), scores in boards.items()
+        for scope, scope_id, user_id, score, rank in _ranked(scope, scope_id, scores)
+    ], batch_size=1000)
+
+
+def refit_ratings(apps, schema_editor):
+    # Same joint fit as analytics.ratings.recalibrate, over the historical models.
+    Submission = apps.get_model('submissions', 'Submission')
+    Challenge = apps.get_model('challenges', 'Challenge')
+    SkillRating = apps.get_model('analytics', 'SkillRating')
+    ChallengeRating = apps.get_model('analytics', 'ChallengeRating')
+    if not SkillRating.objects.exists() and not ChallengeRating.objects.exists():
+        return  # never filled; recalibrate_ratings builds them from scratch
+    links = defaultdict(list)
+    for challenge_id, category_id in Challenge.categories.through.objects.values_list('challenge_id', 'challengecategory_id'):
+        links[challenge_id].append(category_id)
+    observations = []
+    for user_id, challenge_id, score, max_score in Submission.objects.filter(
+        final_score__isnull=False, challenge__max_score__gt=0
+    ).values_list('user_id', 'challenge_id', 'final_score', 'challenge__max_score').iterator(chunk_size=5000):
+        categories = links.get(challenge_id, [])
+        for category_id in categories:
+            observations.append(((user_id, category_id), challenge_id, outcome(score, max_score), 1 / len(categories)))
+    SkillRating.objects.all().delete()
+    ChallengeRating.objects.all().delete()
+    if not observations:
+        return
+
+    player_keys = sorted({player for player, _, _, _ in observations})
+    challenge_keys = sorted({challenge_id for _, challenge_id, _, _ in observations})
+    player_index = {player: i for i, player in enumerate(player_keys)}
+    challenge_index = {challenge_id: i for i, challenge_id in enumerate(challenge_keys)}
+    players = np.array([player_index[player] for player, _, _, _ in observations])
+    challenges = np.array([challenge_index[challenge_id] for _, challenge_id, _, _ in observations])
+    weights = np.array([weight for _, _, _, weight in observations])
+    skill, difficulty, _ = fit(players, challenges, np.array([result for _, _, result, _ in observations]), weights)
+    player_games = np.bincount(players, minlength=len(player_keys))
+    challenge_games = np.rint(np.bincount(challenges, weights, minlength=len(challenge_keys))).astype(int)
+    SkillRating.objects.bulk_create([
+        SkillRating(user_id=user_id, category_id=category_id, rating=float(rating), games=int(games))
+        for (user_id, category_id), rating, games in zip(player_keys, skill, player_games)
+    ], batch_size=1000)
+    ChallengeRating.objects.bulk_create([
+        ChallengeRating(challenge_id=challenge_id, rating=float(rating), games=int(games))
+        for challenge_id, rating, games in zip(challenge_keys, difficulty, challenge_games)
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    # submissions/0013 recomputes final_score as the mean of the reviews, and may run after the
+    # earlier analytics backfills that read final_score. Everything built from it is redone here.
+
+    dependencies = [
+        ('analytics', '0014_ratings'),
+        ('submissions', '0013_recompute_final_scores_as_mean'),
+    ]
+
+    operations = [
+        migrations.RunPython(running_sums.backfill_running_sums, migrations.RunPython.noop),
+        migrations.RunPython(score_sketches.backfill_score_sketches, migrations.RunPython.noop),
+        migrations.RunPython(rebuild_leaderboards, migrations.RunPython.noop),
+        migrations.RunPython(refit_ratings, migrations.RunPython.noop),
+    ]
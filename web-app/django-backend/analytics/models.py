@@ -1,24 +1,242 @@
 # analytics/models.py
 from django.db import models
-from challenges.models import Challenge
+from challenges.models import Challenge, ChallengeCategory
 from users.models import CustomUser
 
 class ChallengeAnalytics(models.Model):
-    challenge = models.ForeignKey(Challenge, on_delete=models.CASCADE)
-    completions = models.IntegerField(default=0)
+    challenge = models.OneToOneField(Challenge, on_delete=models.CASCADE, related_name='analytics')
+    completions = models.IntegerField(default=0)  # submissions with a final score
     pass_rate = models.FloatField(default=0.0)
     average_score = models.FloatField(default=0.0)
+    # Running sums behind the derived columns above, maintained by analytics.maintenance
+    score_sum = models.FloatField(default=0.0)
+    pass_count = models.IntegerField(default=0)
+    # analytics.sketches.TDigest of final scores as a percentage of max_score
+    score_sketch = models.JSONField(default=dict, blank=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"Analytics for {self.challenge.title}"
 
+class CategoryAnalytics(models.Model):
+    category = models.OneToOneField(ChallengeCategory, on_delete=models.CASCADE, related_name='analytics')
+    completions = models.IntegerField(default=0)  # scored submissions across the category's challenges
+    # Merged digest of the category's challenge sketches, as a percentage of each max_score
+    score_sketch = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Analytics for {self.category.name}"
+
 class UserAnalytics(models.Model):
-    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name='analytics')
     submissions_made = models.IntegerField(default=0)
+    total_score = models.FloatField(default=0.0)  # sum of final_score over the user's submissions
+    scored_count = models.IntegerField(default=0)  # submissions with a final score
     average_score = models.FloatField(default=0.0)
     badges_earned = models.IntegerField(default=0)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return f"Analytics for {self.user.email}"
\ No newline at end of file
+        return f"Analytics for {self.user.email}"
+
+class MetricRollup(models.Model):
+    # Submission and review totals for one challenge over one time bucket, filled by analytics.rollups.
+    # Buckets start at local (ANALYTICS_TIME_ZONE) hour/day/month boundaries; hourly rows are
+    # compacted into daily ones, and daily into monthly, as they age.
+    GRANULARITY_CHOICES = (
+        ('hour', 'Hour'),
+        ('day', 'Day'),
+        ('month', 'Month'),
+    )
+    company = models.ForeignKey('companies.Company', on_delete=models.SET_NULL, null=True, blank=True, related_name='metric_rollups')
+    challenge = models.ForeignKey(Challenge, on_delete=models.CASCADE, related_name='metric_rollups')
+    granularity = models.CharField(max_length=10, choices=GRANULARITY_CHOICES)
+    bucket = models.DateTimeField()
+    submission_count = models.IntegerField(default=0)
+    review_count = models.IntegerField(default=0)
+    score_sum = models.FloatField(default=0.0)
+    score_sq_sum = models.FloatField(default=0.0)
+
+    class Meta:
+        unique_together = ('challenge', 'granularity', 'bucket')
+        indexes = [
+            models.Index(fields=['company', 'bucket']),
+            models.Index(fields=['granularity', 'bucket']),
+        ]
+
+    def __str__(self):
+        return f"{self.granularity} rollup for challenge {self.challenge_id} at {self.bucket}"
+
+class RollupWatermark(models.Model):
+    # How far a rollup job has got; `position` is the start of the first bucket not yet final.
+    ROLLUP = 'metric_rollup'  # hourly rows before this are complete
+    HOURLY_COMPACTION = 'metric_rollup_hourly_compaction'  # only daily/monthly rows before this
+    DAILY_COMPACTION = 'metric_rollup_daily_compaction'  # only monthly rows before this
+
+    name = models.CharField(max_length=50, unique=True)
+    position = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} at {self.position}"
+
+class LeaderboardEntry(models.Model):
+    # One user's score and materialized rank on one board, maintained by analytics.leaderboards.
+    # scope_id is the challenge or category id, and 0 on the global board.
+    SCOPE_CHOICES = (
+        ('challenge', 'Challenge'),
+        ('category', 'Category'),
+        ('global', 'Global'),
+    )
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    scope_id = models.IntegerField(default=0)
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='leaderboard_entries')
+    score = models.FloatField(default=0.0)
+    rank = models.IntegerField(null=True, blank=True)  # null until the board is next ranked
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('scope', 'scope_id', 'user')
+        indexes = [
+            models.Index(fields=['scope', 'scope_id', 'rank']),
+            models.Index(fields=['scope', 'scope_id', '-score']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.email} #{self.rank} on {self.scope} {self.scope_id}"
+
+class FunnelCounter(models.Model):
+    # Unique users (HyperLogLog registers, analytics.hll) and raw event count for one
+    # challenge, participation stage and local day, written by analytics.funnel.
+    STAGE_CHOICES = (
+        ('viewed', 'Viewed'),
+        ('opened', 'Opened'),
+        ('started', 'Started'),
+        ('submitted', 'Submitted'),
+        ('graded', 'Graded'),
+    )
+    challenge = models.ForeignKey(Challenge, on_delete=models.CASCADE, related_name='funnel_counters')
+    stage = models.CharField(max_length=10, choices=STAGE_CHOICES)
+    day = models.DateField()
+    registers = models.BinaryField(default=b'')
+    events = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('challenge', 'stage', 'day')
+
+    def __str__(self):
+        return f"{self.stage} funnel for challenge {self.challenge_id} on {self.day}"
+
+class PlatformBenchmark(models.Model):
+    # Platform-wide p25/p50/p75/p90 of each benchmark metric for one challenge type and difficulty,
+    # from the nightly snapshot_benchmarks run (analytics.benchmarks).
+    challenge_type = models.CharField(max_length=50)
+    difficulty = models.CharField(max_length=20)
+    challenge_count = models.IntegerField(default=0)
+    distributions = models.JSONField(default=dict, blank=True)  # metric -> {"count", "p25", "p50", "p75", "p90"}
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('challenge_type', 'difficulty')
+
+    def __str__(self):
+        return f"Benchmarks for {self.difficulty} {self.challenge_type} challenges"
+
+class ChallengeBenchmark(models.Model):
+    # One challenge's benchmark metrics and where each falls among its PlatformBenchmark peers.
+    challenge = models.OneToOneField(Challenge, on_delete=models.CASCADE, related_name='benchmark')
+    metrics = models.JSONField(default=dict, blank=True)  # metric -> {"value", "percentile"}
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Benchmark for {self.challenge.title}"
+
+class WarehouseSnapshot(models.Model):
+    # One DuckDB file built by refresh_warehouse (analytics.warehouse); reports read the newest.
+    # `position` is the watermark: rows changed before it are in the file.
+    path = models.CharField(max_length=500)
+    position = models.DateTimeField()
+    full = models.BooleanField(default=False)  # rebuilt from scratch rather than refreshed incrementally
+    row_counts = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Warehouse snapshot at {self.position}"
+
+class ActivityEvent(models.Model):
+    # Append-only log of what users look at, written in batches by analytics.activity.
+    # Ids are kept without foreign key constraints so inserts stay cheap and old days can
+    # be dropped wholesale (prune_activity_events); `day` is the local day and leads every index.
+    KIND_CHOICES = (
+        ('challenge_list', 'Challenge list viewed'),
+        ('challenge_open', 'Challenge opened'),
+        ('download', 'Download'),
+        ('dashboard', 'Dashboard viewed'),
+    )
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    user = models.ForeignKey(CustomUser, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name='+')
+    challenge = models.ForeignKey(Challenge, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name='+')
+    detail = models.CharField(max_length=50, blank=True)  # e.g. the download format or which dashboard
+    day = models.DateField()
+    occurred_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['day', 'kind']),
+            models.Index(fields=['day', 'challenge']),
+            models.Index(fields=['day', 'user']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} by user {self.user_id} at {self.occurred_at}"
+
+class ActivityBitmap(models.Model):
+    # One bit per local day of `year` on which the user submitted or reviewed (bit 0 = 1 January),
+    # maintained by analytics.streaks; 46 bytes cover a leap year.
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='activity_bitmaps')
+    year = models.PositiveSmallIntegerField()
+    days = models.BinaryField(default=bytes(46))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('user', 'year')
+
+    def __str__(self):
+        return f"Activity of {self.user.email} in {self.year}"
+
+class SkillRating(models.Model):
+    # A student's Elo-style rating in one category, maintained by analytics.ratings from
+    # graded submissions; `games` is how many graded challenges it has seen.
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='skill_ratings')
+    category = models.ForeignKey(ChallengeCategory, on_delete=models.CASCADE, related_name='skill_ratings')
+    rating = models.FloatField(default=1500.0)
+    games = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('user', 'category')
+        indexes = [
+            models.Index(fields=['category', '-rating']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.email} rated {self.rating:.0f} in category {self.category_id}"
+
+class ChallengeRating(models.Model):
+    # Calibrated difficulty of a challenge on the same scale as SkillRating: a student rated
+    # the same is expected to score half of max_score.
+    challenge = models.OneToOneField(Challenge, on_delete=models.CASCADE, related_name='rating')
+    rating = models.FloatField(default=1500.0)
+    games = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['rating']),
+        ]
+
+    def __str__(self):
+        return f"{self.challenge.title} rated {self.rating:.0f}"
@@ -0,0 +1,260 @@
+import math
+from collections import defaultdict
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Abs, Coalesce
+from django.utils import timezone
+from challenges.models import Challenge
+from submissions.models import Submission
+from .maintenance import category_links
+from .models import ChallengeRating, SkillRating
+
+# Elo-style K factors: ratings with fewer than RATING_PROVISIONAL_GAMES graded challenges move faster.
+RATING_K = getattr(settings, 'RATING_K', 24)
+RATING_K_PROVISIONAL = getattr(settings, 'RATING_K_PROVISIONAL', 48)
+RATING_PROVISIONAL_GAMES = getattr(settings, 'RATING_PROVISIONAL_GAMES', 10)
+# Recalibration pulls every rating towards 1500 with this many pseudo-observations' weight.
+RATING_PRIOR_WEIGHT = getattr(settings, 'RATING_PRIOR_WEIGHT', 1.0)
+# Talent rankings leave out ratings built on fewer graded challenges than this by default.
+RATING_MIN_GAMES = getattr(settings, 'RATING_MIN_GAMES', 3)
+
+BASE_RATING = 1500.0
+SCALE = 400 / math.log(10)  # rating points per logit
+# Recommended challenges sit where a student is expected to score about 60% of max_score.
+RECOMMENDATION_TARGET = 0.6
+
+
+def expected_score(rating, difficulty):
+    """Expected fraction of max_score for a student rated `rating` on a challenge rated `difficulty`."""
+    return 1 / (1 + 10 ** ((difficulty - rating) / 400))
+
+
+def outcome(score, max_score):
+    return min(max(score / max_score, 0.0), 1.0)
+
+
+def k_factor(games):
+    return RATING_K_PROVISIONAL if games < RATING_PROVISIONAL_GAMES else RATING_K
+
+
+def _lock_ratings(challenge_ids, pairs):
+    """Create any missing rating rows and lock them all in id order.
+
+    recalibrate() deletes and recreates every row, so rows can vanish between the insert
+    and the lock; the insert and lock are retried once for those, and rows still missing
+    after that are left out of the returned maps.
+    """
+    challenges, skills = {}, {}
+    for _ in range(2):
+        ChallengeRating.objects.bulk_create(
+            [ChallengeRating(challenge_id=challenge_id) for challenge_id in challenge_ids if challenge_id not in challenges],
+            ignore_conflicts=True
+        )
+        SkillRating.objects.bulk_create(
+            [SkillRating(user_id=user_id, category_id=category_id) for user_id, category_id in pairs if (user_id, category_id) not in skills],
+            ignore_conflicts=True
+        )
+        challenges = {row.challenge_id: row for row in ChallengeRating.objects.select_for_update().filter(
+            challenge_id__in=challenge_ids
+        ).order_by('id')}
+        skills = {(row.user_id, row.category_id): row for row in SkillRating.objects.select_for_update().filter(
+            user_id__in={user_id for user_id, _ in pairs}, category_id__in={category_id for _, category_id in pairs}
+        ).order_by('id') if (row.user_id, row.category_id) in pairs}
+        if len(challenges) == len(challenge_ids) and len(skills) == len(pairs):
+            break
+    return challenges, skills
+
+
+def record_score_changes(changes):
+    """Play each newly graded submission as a match between its student and its challenge.
+
+    The outcome is the score as a fraction of max_score. The student's rating in every
+    category of the challenge moves by K * (outcome - expected) and the challenge moves
+    the opposite way by the mean of those surprises. A re-graded submission shifts both
+    sides by the change in outcome instead of counting as another game, unless a side has
+    no games yet (its row was recreated by recalibrate_ratings), when it counts as the
+    first. Scores that go away are left to recalibrate_ratings. Runs inside the scoring
+    transaction; rows are locked in id order.
+    """
+    changes = [change for change in changes if change.new_score is not None and change.old_score != change.new_score]
+    if not changes:
+        return
+    challenge_ids = {change.challenge_id for change in changes}
+    max_scores = dict(Challenge.objects.filter(id__in=challenge_ids).values_list('id', 'max_score'))
+    links = category_links(challenge_ids)
+    changes = [change for change in changes if links[change.challenge_id] and max_scores.get(change.challenge_id)]
+    if not changes:
+        return
+    pairs = {(change.user_id, category_id) for change in changes for category_id in links[change.challenge_id]}
+
+    with transaction.atomic():
+        challenges, skills = _lock_ratings({change.challenge_id for change in changes}, pairs)
+
+        for change in changes:
+            challenge = challenges.get(change.challenge_id)
+            players = [skills.get((change.user_id, category_id)) for category_id in sorted(links[change.challenge_id])]
+            if challenge is None or None in players:
+                continue  # deleted by a concurrent recalibration that outlived the retry
+            new = outcome(change.new_score, max_scores[change.challenge_id])
+            old = None if change.old_score is None else outcome(change.old_score, max_scores[change.challenge_id])
+            ratings = [player.rating for player in players]
+            for player in players:
+                if old is None or player.games == 0:
+                    player.rating += k_factor(player.games) * (new - expected_score(player.rating, challenge.rating))
+                    player.games += 1
+                else:
+                    player.rating += k_factor(player.games - 1) * (new - old)
+            if old is None or challenge.games == 0:
+                surprise = sum(new - expected_score(rating, challenge.rating) for rating in ratings) / len(ratings)
+                challenge.rating -= k_factor(challenge.games) * surprise
+                challenge.games += 1
+            else:
+                challenge.rating -= k_factor(challenge.games - 1) * (new - old)
+
+        now = timezone.now()
+        for row in [*challenges.values(), *skills.values()]:
+            row.updated_at = now
+        ChallengeRating.objects.bulk_update(challenges.values(), ['rating', 'games', 'updated_at'])
+        SkillRating.objects.bulk_update(skills.values(), ['rating', 'games', 'updated_at'], batch_size=500)
+
+
+def fit(players, challenges, outcomes, weights, iterations=100, tolerance=0.01, prior=RATING_PRIOR_WEIGHT):
+    """Jointly fit player and challenge ratings to every observed outcome at once.
+
+    Each observation i says player players[i] scored outcomes[i] (0..1) on challenge
+    challenges[i]; `weights` scale each observation's pull on the challenge side. This
+    maximises the logistic likelihood the Elo updates approximate, with a Gaussian prior
+    at 1500, by alternating diagonal Newton steps for all players and then all
+    challenges. Every step is a handful of array operations over all observations.
+    Returns (player ratings, challenge ratings, iterations run).
+    """
+    n_players = players.max() + 1 if len(players) else 0
+    n_challenges = challenges.max() + 1 if len(challenges) else 0
+    skill = np.zeros(n_players)
+    difficulty = np.zeros(n_challenges)
+
+    def probabilities():
+        return 1 / (1 + np.exp(difficulty[challenges] - skill[players]))
+
+    iteration = 0
+    for iteration in range(1, iterations + 1):
+        p = probabilities()
+        step = (np.bincount(players, outcomes - p, n_players) - prior * skill) / (
+            np.bincount(players, p * (1 - p), n_players) + prior
+        )
+        skill += step
+        moved = np.abs(step).max(initial=0)
+        p = probabilities()
+        step = (np.bincount(challenges, weights * (p - outcomes), n_challenges) - prior * difficulty) / (
+            np.bincount(challenges, weights * p * (1 - p), n_challenges) + prior
+        )
+        difficulty += step
+        moved = max(moved, np.abs(step).max(initial=0))
+        if moved * SCALE < tolerance:
+            break
+    return BASE_RATING + skill * SCALE, BASE_RATING + difficulty * SCALE, iteration
+
+
+def recalibrate(iterations=100, tolerance=0.01):
+    """Refit every SkillRating and ChallengeRating from the full history of graded submissions.
+
+    Incremental updates depend on the order scores arrived in and never forget a removed
+    score; this replaces them with the joint fit over everything (see fit). A submission
+    counts once per category of its challenge, and on the challenge side each of those
+    counts 1/n so every submission weighs the same. Returns (players, challenges, iterations).
+    """
+    links = defaultdict(list)
+    for challenge_id, category_id in Challenge.categories.through.objects.values_list('challenge_id', 'challengecategory_id'):
+        links[challenge_id].append(category_id)
+    user_ids, category_ids, challenge_ids, outcomes, weights = [], [], [], [], []
+    for user_id, challenge_id, score, max_score in Submission.objects.filter(
+        final_score__isnull=False, challenge__max_score__gt=0
+    ).values_list('user_id', 'challenge_id', 'final_score', 'challenge__max_score').iterator(chunk_size=5000):
+        categories = links.get(challenge_id)
+        if not categories:
+            continue
+        result = outcome(score, max_score)
+        for category_id in categories:
+            user_ids.append(user_id)
+            category_ids.append(category_id)
+            challenge_ids.append(challenge_id)
+            outcomes.append(result)
+            weights.append(1 / len(categories))
+
+    user_ids = np.array(user_ids, dtype=np.int64)
+    category_ids = np.array(category_ids, dtype=np.int64)
+    player_keys, players = np.unique(user_ids * (category_ids.max(initial=0) + 1) + category_ids, return_inverse=True)
+    challenge_keys, challenges = np.unique(np.array(challenge_ids, dtype=np.int64), return_inverse=True)
+    weights = np.array(weights)
+    skill, difficulty, iteration = fit(players, challenges, np.array(outcomes), weights, iterations, tolerance)
+    player_games = np.bincount(players, minlength=len(player_keys))
+    challenge_games = np.rint(np.bincount(challenges, weights, minlength=len(challenge_keys))).astype(int)
+    player_users = player_keys // (category_ids.max(initial=0) + 1)
+    player_categories = player_keys % (category_ids.max(initial=0) + 1)
+
+    with transaction.atomic():
+        SkillRating.objects.all().delete()
+        SkillRating.objects.bulk_create([
+            SkillRating(user_id=int(user_id), category_id=int(category_id), rating=float(rating), games=int(games))
+            for user_id, category_id, rating, games in zip(player_users, player_categories, skill, player_games)
+        ], batch_size=1000)
+        ChallengeRating.objects.all().delete()
+        ChallengeRating.objects.bulk_create([
+            ChallengeRating(challenge_id=int(challenge_id), rating=float(rating), games=int(games))
+            for challenge_id, rating, games in zip(challenge_keys, difficulty, challenge_games)
+        ], batch_size=1000)
+    return len(player_keys), len(challenge_keys), iteration
+
+
+def talent_ranking(category_id, limit=20, min_games=RATING_MIN_GAMES):
+    """Top-rated students and graduates in a category, read straight off the (category, -rating) index."""
+    rows = SkillRating.objects.filter(
+        category_id=category_id, games__gte=min_games, user__role__in=['student', 'graduate']
+    ).order_by('-rating').values('user_id', 'user__email', 'user__first_name', 'user__last_name', 'rating', 'games')[:limit]
+    return [{
+        "rank": position,
+        "user_id": row['user_id'],
+        "email": row['user__email'],
+        "name": f"{row['user__first_name']} {row['user__last_name']}".strip(),
+        "rating": round(row['rating']),
+        "graded_challenges": row['games'],
+    } for position, row in enumerate(rows, start=1)]
+
+
+def user_ratings(user):
+    return [{
+        "category_id": row['category_id'],
+        "category": row['category__name'],
+        "rating": round(row['rating']),
+        "graded_challenges": row['games'],
+        "provisional": row['games'] < RATING_PROVISIONAL_GAMES,
+    } for row in SkillRating.objects.filter(user=user).order_by('-rating').values('category_id', 'category__name', 'rating', 'games')]
+
+
+def recommended_challenges(user, limit=3, categories=3):
+    """Open challenges in the user's best-rated categories whose difficulty rating puts the
+    expected score nearest RECOMMENDATION_TARGET; unrated challenges count as 1500."""
+    offset = 400 * math.log10(RECOMMENDATION_TARGET / (1 - RECOMMENDATION_TARGET))
+    skills = list(SkillRating.objects.filter(user=user).select_related('category').order_by('-rating')[:categories])
+    attempted = Submission.objects.filter(user=user).values('challenge_id')
+    picks = []
+    seen = set()
+    for skill in skills:
+        target = skill.rating - offset
+        for challenge in Challenge.objects.filter(
+            is_published=True, visibility='public', end_date__gt=timezone.now(), categories=skill.category
+        ).exclude(id__in=attempted).exclude(id__in=seen).annotate(
+            difficulty_rating=Coalesce(F('rating__rating'), Value(BASE_RATING), output_field=FloatField())
+        ).annotate(distance=Abs(F('difficulty_rating') - target)).order_by('distance', 'end_date')[:limit]:
+            seen.add(challenge.id)
+            picks.append((challenge.distance, skill, challenge))
+    picks.sort(key=lambda pick: pick[0])
+    return [{
+        "challenge_id": challenge.id,
+        "title": challenge.title,
+        "category": skill.category.name,
+        "difficulty_rating": round(challenge.difficulty_rating),
+        "expected_score_pct": round(100 * expected_score(skill.rating, challenge.difficulty_rating)),
+    } for _, skill, challenge in picks[:limit]]
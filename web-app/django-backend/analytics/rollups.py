@@ -0,0 +1,160 @@
+from datetime import timedelta
+from collections import defaultdict
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Min, Sum
+from django.db.models.functions import TruncDay, TruncHour, TruncMonth
+from django.utils import timezone
+from submissions.models import Submission, SubmissionReview
+from .aggregation import ANALYTICS_TIME_ZONE
+from .models import MetricRollup, RollupWatermark
+
+# Hours this far behind the watermark are recomputed on every run, to pick up late writes.
+ROLLUP_LATENESS = timedelta(hours=getattr(settings, 'ROLLUP_LATENESS_HOURS', 6))
+# Hourly rows older than this are folded into daily rows, and daily rows into monthly ones.
+ROLLUP_HOURLY_RETENTION = timedelta(days=getattr(settings, 'ROLLUP_HOURLY_RETENTION_DAYS', 7))
+ROLLUP_DAILY_RETENTION = timedelta(days=getattr(settings, 'ROLLUP_DAILY_RETENTION_DAYS', 400))
+
+TRUNCATE = {'hour': TruncHour, 'day': TruncDay, 'month': TruncMonth}
+METRICS = ['submission_count', 'review_count', 'score_sum', 'score_sq_sum']
+
+
+def floor(moment, granularity):
+    """Start of the local hour, day or month containing `moment`."""
+    local = moment.astimezone(ANALYTICS_TIME_ZONE).replace(minute=0, second=0, microsecond=0)
+    if granularity in ('day', 'month'):
+        local = local.replace(hour=0)
+    if granularity == 'month':
+        local = local.replace(day=1)
+    return local
+
+
+def _watermark(name):
+    mark, _ = RollupWatermark.objects.select_for_update().get_or_create(name=name)
+    return mark
+
+
+def _earliest_activity():
+    first = [
+        Submission.objects.aggregate(first=Min('submitted_at'))['first'],
+        SubmissionReview.objects.aggregate(first=Min('reviewed_at'))['first'],
+    ]
+    first = [moment for moment in first if moment]
+    return min(first) if first else None
+
+
+def _hourly_rows(start, end):
+    """Fresh hourly MetricRollup rows for [start, end), from two grouped queries over the raw tables."""
+    totals = defaultdict(lambda: dict.fromkeys(METRICS, 0))
+    companies = {}
+    submissions = Submission.objects.filter(submitted_at__gte=start, submitted_at__lt=end).annotate(
+        hour=TruncHour('submitted_at', tzinfo=ANALYTICS_TIME_ZONE)
+    ).order_by().values('challenge_id', 'challenge__company_id', 'hour').annotate(n=Count('id'))
+    for row in submissions:
+        companies[row['challenge_id']] = row['challenge__company_id']
+        totals[(row['challenge_id'], row['hour'])]['submission_count'] = row['n']
+
+    reviews = SubmissionReview.objects.filter(reviewed_at__gte=start, reviewed_at__lt=end).annotate(
+        hour=TruncHour('reviewed_at', tzinfo=ANALYTICS_TIME_ZONE)
+    ).order_by().values('submission__challenge_id', 'submission__challenge__company_id', 'hour').annotate(
+        n=Count('id'), total=Sum('score'), total_sq=Sum(F('score') * F('score'))
+    )
+    for row in reviews:
+        companies[row['submission__challenge_id']] = row['submission__challenge__company_id']
+        metrics = totals[(row['submission__challenge_id'], row['hour'])]
+        metrics['review_count'] = row['n']
+        metrics['score_sum'] = row['total'] or 0.0
+        metrics['score_sq_sum'] = row['total_sq'] or 0.0
+
+    return [
+        MetricRollup(company_id=companies[challenge_id], challenge_id=challenge_id, granularity='hour', bucket=hour, **metrics)
+        for (challenge_id, hour), metrics in totals.items()
+    ]
+
+
+def roll_up(now=None):
+    """Rebuild hourly rollups from the watermark (less ROLLUP_LATENESS) up to the current hour.
+
+    The window's rows are deleted and recomputed from the raw tables in one transaction,
+    so running the job twice, or after a crash, gives the same rows. The first run starts
+    at the oldest submission or review. Returns (hourly rows written, window start, window end).
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        mark = _watermark(RollupWatermark.ROLLUP)
+        compacted = _watermark(RollupWatermark.HOURLY_COMPACTION).position
+        if mark.position:
+            start = floor(mark.position - ROLLUP_LATENESS, 'hour')
+        else:
+            start = floor(_earliest_activity() or now, 'hour')
+        if compacted and start < compacted:
+            start = compacted  # those hours now only exist inside daily rows
+        end = floor(now, 'hour') + timedelta(hours=1)
+
+        MetricRollup.objects.filter(granularity='hour', bucket__gte=start, bucket__lt=end).delete()
+        rows = MetricRollup.objects.bulk_create(_hourly_rows(start, end), batch_size=1000)
+        mark.position = floor(now, 'hour')  # the current hour is still filling up
+        mark.save(update_fields=['position', 'updated_at'])
+    return len(rows), start, end
+
+
+def _fold(source, target, cutoff):
+    """Add every `source` row before `cutoff` into its `target` bucket, then delete it."""
+    old = MetricRollup.objects.filter(granularity=source, bucket__lt=cutoff)
+    grouped = old.annotate(target=TRUNCATE[target]('bucket', tzinfo=ANALYTICS_TIME_ZONE)).order_by().values(
+        'challenge_id', 'challenge__company_id', 'target'
+    ).annotate(**{f'total_{metric}': Sum(metric) for metric in METRICS})
+    folded = {(row['challenge_id'], row['target']): row for row in grouped}
+    if not folded:
+        return 0
+    existing = {
+        (row.challenge_id, row.bucket): row
+        for row in MetricRollup.objects.filter(
+            granularity=target,
+            challenge_id__in={challenge_id for challenge_id, _ in folded},
+            bucket__in={bucket for _, bucket in folded}
+        )
+    }
+    rows = []
+    for (challenge_id, bucket), row in folded.items():
+        current = existing.get((challenge_id, bucket))
+        rows.append(MetricRollup(
+            company_id=row['challenge__company_id'], challenge_id=challenge_id, granularity=target, bucket=bucket,
+            **{metric: row[f'total_{metric}'] + (getattr(current, metric) if current else 0) for metric in METRICS}
+        ))
+    MetricRollup.objects.bulk_create(
+        rows, batch_size=1000, update_conflicts=True,
+        unique_fields=['challenge', 'granularity', 'bucket'], update_fields=['company'] + METRICS
+    )
+    old.delete()
+    return len(rows)
+
+
+def compact(now=None):
+    """Fold aged hourly rows into days and aged daily rows into months.
+
+    Only whole local days (months) are folded, and never hours the rollup job may still
+    rewrite, so every bucket is counted exactly once. Returns (daily rows, monthly rows) written.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        rolled = _watermark(RollupWatermark.ROLLUP).position
+        hourly = _watermark(RollupWatermark.HOURLY_COMPACTION)
+        daily = _watermark(RollupWatermark.DAILY_COMPACTION)
+        if rolled is None:
+            return 0, 0
+
+        days = 0
+        cutoff = min(floor(now - ROLLUP_HOURLY_RETENTION, 'day'), floor(rolled - ROLLUP_LATENESS, 'day'))
+        if hourly.position is None or cutoff > hourly.position:
+            days = _fold('hour', 'day', cutoff)
+            hourly.position = cutoff
+            hourly.save(update_fields=['position', 'updated_at'])
+
+        months = 0
+        cutoff = min(floor(now - ROLLUP_DAILY_RETENTION, 'month'), floor(hourly.position, 'month'))
+        if daily.position is None or cutoff > daily.position:
+            months = _fold('day', 'month', cutoff)
+            daily.position = cutoff
+            daily.save(update_fields=['position', 'updated_at'])
+    return days, months
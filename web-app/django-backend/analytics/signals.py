@@ -0,0 +1,64 @@
+from django.db.models.signals import post_save, post_delete
+from submissions.models import Submission, SubmissionReview
+from submissions.signals import submission_scored, reviews_created
+from badges.models import UserBadge
+from .maintenance import apply_deltas, record_submissions
+from . import funnel, leaderboards, ratings, streaks
+from .models import UserAnalytics
+
+# Final-score changes reach the analytics rows through submissions.scoring, inside the
+# scoring transaction; these receivers cover the remaining counters.
+
+
+def count_submission(sender, instance, created, **kwargs):
+    if created:
+        record_submissions([instance.user_id])
+        funnel.record('submitted', [instance.challenge_id], instance.user_id)
+        streaks.mark_events([(instance.user_id, instance.submitted_at)])
+
+
+def uncount_submission(sender, instance, **kwargs):
+    record_submissions([instance.user_id], sign=-1)
+
+
+def mark_review_day(sender, instance, created, **kwargs):
+    if created:
+        streaks.mark_events([(instance.reviewer_id, instance.reviewed_at)])
+
+
+def mark_bulk_review_days(sender, reviews, **kwargs):
+    streaks.mark_events([(review.reviewer_id, review.reviewed_at) for review in reviews])
+
+
+def count_badge(sender, instance, created, **kwargs):
+    if created:
+        apply_deltas(UserAnalytics, 'user_id', {instance.user_id: {'badges_earned': 1}})
+
+
+def uncount_badge(sender, instance, **kwargs):
+    apply_deltas(UserAnalytics, 'user_id', {instance.user_id: {'badges_earned': -1}})
+
+
+def move_on_leaderboards(sender, changes, **kwargs):
+    leaderboards.record_score_changes(changes)
+
+
+def update_ratings(sender, changes, **kwargs):
+    ratings.record_score_changes(changes)
+
+
+def record_graded(sender, changes, **kwargs):
+    for change in changes:
+        if change.old_score is None and change.new_score is not None:
+            funnel.record('graded', [change.challenge_id], change.user_id)
+
+
+post_save.connect(count_submission, sender=Submission, dispatch_uid='analytics_count_submission')
+post_delete.connect(uncount_submission, sender=Submission, dispatch_uid='analytics_uncount_submission')
+post_save.connect(mark_review_day, sender=SubmissionReview, dispatch_uid='analytics_mark_review_day')
+reviews_created.connect(mark_bulk_review_days, dispatch_uid='analytics_mark_bulk_review_days')
+post_save.connect(count_badge, sender=UserBadge, dispatch_uid='analytics_count_badge')
+post_delete.connect(uncount_badge, sender=UserBadge, dispatch_uid='analytics_uncount_badge')
+submission_scored.connect(move_on_leaderboards, dispatch_uid='analytics_move_on_leaderboards')
+submission_scored.connect(update_ratings, dispatch_uid='analytics_update_ratings')
+submission_scored.connect(record_graded, dispatch_uid='analytics_record_graded')
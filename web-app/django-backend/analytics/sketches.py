@@ -0,0 +1,162 @@
+import math
+
+# Centroid budget of a digest: more centroids, better accuracy, bigger JSON. At 100 a
+# digest keeps about 60 centroids (a little over 1 KB of JSON) and mid-range percentiles
+# come out within a fraction of a point of the exact ones.
+DEFAULT_COMPRESSION = 100
+
+
+class TDigest:
+    """Merging t-digest (Dunning & Ertl) for streaming quantiles and CDFs.
+
+    Values are buffered and periodically merged into a sorted list of [mean, weight]
+    centroids whose sizes follow the k1 scale function, so they stay small near the tails
+    where accuracy matters most. Two digests merge by pooling their centroids, which is
+    what lets challenge digests roll up into category and company ones. Plain Python and
+    JSON-serializable so it can live in a JSONField and run inside migrations.
+    """
+
+    def __init__(self, compression=DEFAULT_COMPRESSION, centroids=None, min_value=None, max_value=None):
+        self.compression = compression
+        self.centroids = [list(centroid) for centroid in centroids or []]
+        self.min = min_value
+        self.max = max_value
+        self._buffer = []
+
+    @classmethod
+    def from_dict(cls, data):
+        if not data:
+            return cls()
+        return cls(data.get('compression', DEFAULT_COMPRESSION), data.get('centroids'), data.get('min'), data.get('max'))
+
+    def to_dict(self):
+        self._flush()
+        return {
+            "compression": self.compression,
+            "min": self.min,
+            "max": self.max,
+            "centroids": [[round(mean, 6), weight] for mean, weight in self.centroids],
+        }
+
+    @property
+    def count(self):
+        self._flush()
+        return sum(weight for _, weight in self.centroids)
+
+    def add(self, value, weight=1):
+        self._buffer.append([value, weight])
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if len(self._buffer) >= 5 * self.compression:
+            self._flush()
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other):
+        other._flush()
+        if not other.centroids:
+            return self
+        self._buffer.extend(list(centroid) for centroid in other.centroids)
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self._flush()
+        return self
+
+    def _k(self, q):
+        return self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        points = sorted(self.centroids + self._buffer, key=lambda centroid: centroid[0])
+        self._buffer = []
+        total = sum(weight for _, weight in points)
+        merged = []
+        current = list(points[0])
+        cumulative = 0
+        k_lower = self._k(0)
+        for mean, weight in points[1:]:
+            if self._k((cumulative + current[1] + weight) / total) - k_lower <= 1:
+                current[0] += (mean - current[0]) * weight / (current[1] + weight)
+                current[1] += weight
+            else:
+                merged.append(current)
+                cumulative += current[1]
+                k_lower = self._k(cumulative / total)
+                current = [mean, weight]
+        merged.append(current)
+        self.centroids = merged
+
+    def quantile(self, q):
+        """Estimated value below which a fraction `q` of the data lies; None when empty."""
+        self._flush()
+        centroids = self.centroids
+        if not centroids:
+            return None
+        total = sum(weight for _, weight in centroids)
+        target = min(max(q, 0.0), 1.0) * total
+        first_mean, first_weight = centroids[0]
+        if target <= first_weight / 2:
+            return self.min + (first_mean - self.min) * target / (first_weight / 2)
+        last_mean, last_weight = centroids[-1]
+        if target >= total - last_weight / 2:
+            return last_mean + (self.max - last_mean) * (target - (total - last_weight / 2)) / (last_weight / 2)
+        cumulative = first_weight / 2  # weight up to the middle of the current centroid
+        for (mean, weight), (next_mean, next_weight) in zip(centroids, centroids[1:]):
+            gap = (weight + next_weight) / 2
+            if target <= cumulative + gap:
+                return mean + (next_mean - mean) * (target - cumulative) / gap
+            cumulative += gap
+        return last_mean
+
+    def cdf(self, value):
+        """Estimated fraction of the data below `value` (interpolated between centroids); None when empty."""
+        self._flush()
+        centroids = self.centroids
+        if not centroids:
+            return None
+        if value <= self.min:
+            return 0.0
+        if value > self.max:
+            return 1.0
+        total = sum(weight for _, weight in centroids)
+        first_mean, first_weight = centroids[0]
+        if value < first_mean:
+            return (value - self.min) / (first_mean - self.min) * first_weight / 2 / total
+        last_mean, last_weight = centroids[-1]
+        if value >= last_mean:
+            span = self.max - last_mean
+            inside = (value - last_mean) / span if span else 0.0
+            return (total - last_weight / 2 + inside * last_weight / 2) / total
+        cumulative = first_weight / 2
+        for (mean, weight), (next_mean, next_weight) in zip(centroids, centroids[1:]):
+            gap = (weight + next_weight) / 2
+            if value < next_mean:
+                return (cumulative + gap * (value - mean) / (next_mean - mean)) / total
+            cumulative += gap
+        return 1.0
+
+    def percentiles(self, percents=(25, 50, 75, 90)):
+        return {f"p{p}": self.quantile(p / 100) for p in percents}
+
+
+def merged(sketches):
+    """One digest merged from serialized digests (e.g. every challenge of a company)."""
+    digest = TDigest()
+    for sketch in sketches:
+        digest.merge(TDigest.from_dict(sketch))
+    return digest
+
+
+def summary(digest, scale=100):
+    """Count and p25/p50/p75/p90 of a digest of percentages, rescaled to `scale` (e.g. a max_score)."""
+    return {
+        "count": digest.count,
+        "percentiles": {
+            name: round(value * scale / 100, 2) if value is not None else None
+            for name, value in digest.percentiles().items()
+        },
+    }
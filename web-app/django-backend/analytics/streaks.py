@@ -0,0 +1,117 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .aggregation import ANALYTICS_TIME_ZONE
+from .models import ActivityBitmap
+
+BITMAP_BYTES = 46  # 366 bits, one per day of a (leap) year
+
+
+def _bits(data):
+    return int.from_bytes(bytes(data or b''), 'little')
+
+
+def _bytes(bits):
+    return bits.to_bytes(BITMAP_BYTES, 'little')
+
+
+def local_day(moment):
+    return moment.astimezone(ANALYTICS_TIME_ZONE).date()
+
+
+def mark(days_by_user):
+    """Set the bits for {user id: local dates} on the users' yearly bitmaps.
+
+    Most events land on a day that is already set, so the bitmaps are read first and only
+    the ones missing a bit are locked and rewritten. Bits are never cleared: deleting a
+    submission does not undo the day's activity.
+    """
+    wanted = defaultdict(int)  # (user id, year) -> bits to set
+    for user_id, days in days_by_user.items():
+        for day in days:
+            wanted[(user_id, day.year)] |= 1 << (day.timetuple().tm_yday - 1)
+    if not wanted:
+        return
+    match = Q()
+    for user_id, year in wanted:
+        match |= Q(user_id=user_id, year=year)
+    current = {(user_id, year): _bits(days) for user_id, year, days in ActivityBitmap.objects.filter(match).values_list('user_id', 'year', 'days')}
+    missing = {key: bits for key, bits in wanted.items() if current.get(key, 0) & bits != bits}
+    if not missing:
+        return
+
+    with transaction.atomic():
+        ActivityBitmap.objects.bulk_create(
+            [ActivityBitmap(user_id=user_id, year=year) for user_id, year in missing if (user_id, year) not in current],
+            ignore_conflicts=True
+        )
+        match = Q()
+        for user_id, year in missing:
+            match |= Q(user_id=user_id, year=year)
+        rows = list(ActivityBitmap.objects.select_for_update().filter(match).order_by('id'))
+        now = timezone.now()
+        for row in rows:
+            row.days = _bytes(_bits(row.days) | missing[(row.user_id, row.year)])
+            row.updated_at = now
+        ActivityBitmap.objects.bulk_update(rows, ['days', 'updated_at'])
+
+
+def mark_events(events):
+    """Mark (user id, aware datetime) pairs, e.g. submissions or reviews."""
+    days = defaultdict(set)
+    for user_id, moment in events:
+        if user_id and moment:
+            days[user_id].add(local_day(moment))
+    mark(days)
+
+
+def _run_ending(bits, index):
+    """Length of the run of set bits ending at bit `index`."""
+    if index < 0 or not bits >> index & 1:
+        return 0
+    unset = ~bits & ((1 << (index + 1)) - 1)
+    return index + 1 - unset.bit_length()
+
+
+def _longest_run(bits):
+    # Each step shortens every run by one, so the step count is the longest run.
+    length = 0
+    while bits:
+        bits &= bits >> 1
+        length += 1
+    return length
+
+
+def calendar(user, year=None, today=None):
+    """Heatmap days for `year` plus active-day counts and streaks across all years.
+
+    The yearly bitmaps are laid end to end in one integer, so a streak that spans New Year
+    is a single run of bits. The current streak counts back from today, or from yesterday
+    when nothing happened yet today.
+    """
+    today = today or local_day(timezone.now())
+    year = year or today.year
+    bitmaps = {row_year: _bits(days) for row_year, days in ActivityBitmap.objects.filter(user=user).values_list('year', 'days')}
+    first = date(min(bitmaps), 1, 1) if bitmaps else date(today.year, 1, 1)
+    combined = 0
+    for row_year, bits in bitmaps.items():
+        combined |= bits << (date(row_year, 1, 1) - first).days
+    position = (today - first).days
+
+    bits = bitmaps.get(year, 0)
+    days = []
+    while bits:
+        lowest = bits & -bits
+        days.append((date(year, 1, 1) + timedelta(days=lowest.bit_length() - 1)).isoformat())
+        bits ^= lowest
+    return {
+        "year": year,
+        "days": days,
+        "active_days": len(days),
+        "total_active_days": combined.bit_count(),
+        "current_streak": _run_ending(combined, position) or _run_ending(combined, position - 1),
+        "longest_streak": _longest_run(combined),
+        "years": sorted(year for year, bits in bitmaps.items() if bits),
+    }
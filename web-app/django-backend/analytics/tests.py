@@ -1,3 +1,138 @@
-from django.test import TestCase
+import random
+from datetime import timedelta
+from unittest import mock
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from challenges.models import Challenge
+from companies.models import Company
+from submissions.scoring import ScoreChange
+from users.models import CustomUser
+from . import leaderboards, ratings
+from .hll import HLL_PRECISION, HyperLogLog
+from .sketches import TDigest, merged
 
-# Create your tests here.
+
+class LeaderboardShiftTests(TestCase):
+    def setUp(self):
+        company = Company.objects.create(name='Acme', industry='Software', domain='acme.com')
+        self.challenge = Challenge.objects.create(
+            title='Sorting', description='Sort things', challenge_type='coding', difficulty='easy', company=company,
+            is_published=True, end_date=timezone.now() + timedelta(days=7)
+        )
+        self.users = [CustomUser.objects.create_user(f'student{i}@example.com', role='student') for i in range(12)]
+
+    def assertRanksExact(self):
+        entries = list(leaderboards.board('challenge', self.challenge.id).values_list('score', 'rank'))
+        scores = [score for score, _ in entries]
+        for score, rank in entries:
+            self.assertEqual(rank, sum(other > score for other in scores) + 1)
+
+    def test_moves_keep_ranks_exact(self):
+        rng = random.Random(7)
+        scores = {}
+        for _ in range(200):
+            user = rng.choice(self.users)
+            old = scores.get(user.id)
+            new = None if old is not None and rng.random() < 0.15 else float(rng.randint(0, 10))
+            if new is None:
+                scores.pop(user.id)
+            else:
+                scores[user.id] = new
+            leaderboards.record_score_changes([ScoreChange(0, user.id, self.challenge.id, old, new)])
+            self.assertRanksExact()
+        self.assertEqual(leaderboards.board('challenge', self.challenge.id).count(), len(scores))
+
+    def test_large_batch_reranks_whole_board(self):
+        changes = [ScoreChange(0, user.id, self.challenge.id, None, float(i % 4)) for i, user in enumerate(self.users)]
+        with mock.patch.object(leaderboards, 'RANK_SHIFT_LIMIT', 5):
+            leaderboards.record_score_changes(changes)
+        self.assertRanksExact()
+
+    def test_neighbours_follow_scores_not_stale_ranks(self):
+        leaderboards.record_score_changes([ScoreChange(0, user.id, self.challenge.id, None, float(i)) for i, user in enumerate(self.users[:5])])
+        leaderboards.board('challenge', self.challenge.id).update(rank=None)
+        standing = leaderboards.standing('challenge', self.challenge.id, self.users[2], around=1)
+        self.assertEqual(standing["me"]["rank"], 3)
+        self.assertEqual([row["user_id"] for row in standing["neighbours"]], [self.users[3].id, self.users[1].id])
+
+
+class TDigestTests(SimpleTestCase):
+    PERCENTS = [1, 10, 25, 50, 75, 90, 99]
+
+    def assertClose(self, digest, values, tolerance):
+        for percent in self.PERCENTS:
+            self.assertAlmostEqual(digest.quantile(percent / 100), np.percentile(values, percent), delta=tolerance, msg=f"p{percent}")
+
+    def test_quantiles_match_numpy(self):
+        rng = np.random.default_rng(43)
+        for values in [rng.uniform(0, 100, 20000), np.clip(rng.normal(60, 15, 20000), 0, 100), 100 * rng.beta(5, 1, 20000)]:
+            self.assertClose(TDigest().update(values.tolist()), values, tolerance=0.5)
+
+    def test_merged_digests_match_pooled_values(self):
+        rng = np.random.default_rng(7)
+        parts = [rng.uniform(0, 100, 3000) for _ in range(6)] + [rng.normal(30, 5, 3000)]
+        digest = merged(TDigest().update(part.tolist()).to_dict() for part in parts)
+        self.assertClose(digest, np.concatenate(parts), tolerance=1.0)
+
+    def test_round_trip_keeps_quantiles(self):
+        values = np.random.default_rng(1).uniform(0, 100, 5000)
+        digest = TDigest().update(values.tolist())
+        copy = TDigest.from_dict(digest.to_dict())
+        self.assertEqual(copy.count, 5000)
+        self.assertAlmostEqual(copy.quantile(0.5), digest.quantile(0.5), places=3)
+
+
+class HyperLogLogTests(SimpleTestCase):
+    # Three standard errors (1.04 / sqrt(m)), about 7% at the default precision.
+    BOUND = 3 * 1.04 / (1 << HLL_PRECISION) ** 0.5
+
+    def test_error_within_bounds(self):
+        for distinct in [10000, 100000]:
+            hll = HyperLogLog()
+            for user_id in range(distinct):
+                hll.add(user_id)
+            self.assertLess(abs(hll.count() - distinct) / distinct, self.BOUND, msg=f"{distinct} distinct values")
+
+    def test_small_counts_are_exact_enough(self):
+        hll = HyperLogLog()
+        for user_id in range(50):
+            hll.add(user_id)
+            hll.add(user_id)
+        self.assertAlmostEqual(hll.count(), 50, delta=2)
+
+    def test_merge_counts_the_union(self):
+        first, second = HyperLogLog(), HyperLogLog()
+        for user_id in range(6000):
+            first.add(user_id)
+        for user_id in range(4000, 10000):
+            second.add(user_id)
+        union = HyperLogLog.from_bytes(first.to_bytes()).merge(second)
+        self.assertLess(abs(union.count() - 10000) / 10000, self.BOUND)
+
+
+class RatingFitTests(SimpleTestCase):
+    def test_fit_recovers_known_ratings(self):
+        rng = np.random.default_rng(50)
+        skill = rng.normal(0, 1, 300)
+        difficulty = rng.normal(0, 1, 40)
+        players = rng.integers(0, len(skill), 30000)
+        challenges = rng.integers(0, len(difficulty), 30000)
+        chance = 1 / (1 + np.exp(difficulty[challenges] - skill[players]))
+        outcomes = (rng.random(len(chance)) < chance).astype(float)
+
+        player_ratings, challenge_ratings, iterations = ratings.fit(players, challenges, outcomes, np.ones(len(outcomes)))
+        self.assertLess(iterations, 100)
+        self.assertGreater(np.corrcoef(player_ratings, skill)[0, 1], 0.95)
+        self.assertGreater(np.corrcoef(challenge_ratings, difficulty)[0, 1], 0.98)
+        # On the rating scale the fitted gaps between challenges match the true ones.
+        true = ratings.BASE_RATING + difficulty * ratings.SCALE
+        self.assertLess(np.abs((challenge_ratings - challenge_ratings.mean()) - (true - true.mean())).mean(), 25)
+
+    def test_expected_outcomes_are_reproduced(self):
+        players = np.array([0, 0, 1, 1])
+        challenges = np.array([0, 1, 0, 1])
+        outcomes = np.array([0.9, 0.6, 0.5, 0.2])
+        player_ratings, challenge_ratings, _ = ratings.fit(players, challenges, outcomes, np.ones(4), prior=0.001)
+        self.assertGreater(player_ratings[0], player_ratings[1])
+        self.assertGreater(challenge_ratings[1], challenge_ratings[0])
@@ -2,16 +2,19 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from django.utils import timezone
-from django.db.models import Sum, Count
-from django.db.models.functions import TruncMonth, TruncDay
 from challenges.models import Challenge
-from submissions.models import Submission, SubmissionReview
-from badges.models import UserBadge
-from users.models import CustomUser, StudentProfile, GraduateProfile
 from companies.models import CompanyUser
-from challenges.serializers import FeaturedChallengeSerializer
-from submissions.serializers import StudentSubmissionSerializer
+from .dashboard import (
+    get_profile, student_summary, recent_submissions,
+    featured_challenges, student_recommendations, build_student_dashboard
+)
+from .models import CategoryAnalytics, ChallengeAnalytics
+from .sketches import TDigest, merged, summary
+from challenges.models import ChallengeCategory
+from . import funnel, leaderboards
+from .benchmarks import get_company_report as get_benchmark_report
+from . import activity, ratings, streaks, warehouse
+from .aggregation import AnalyticsQueryError, parse_range, student_performance, company_performance
 import logging
 logger = logging.getLogger(__name__)
 
@@ -22,15 +25,7 @@ class FeaturedChallengesView(APIView):
         """List up to 5 featured challenges for students/graduates."""
         if request.user.role not in ['student', 'graduate']:
             return Response({"error": "Only students or graduates can view featured challenges"}, status=status.HTTP_403_FORBIDDEN)
-        
-        challenges = Challenge.objects.filter(
-            is_published=True,
-            is_featured=True,
-            visibility='public',
-            end_date__gte=timezone.now()
-        )[:5]
-        serializer = FeaturedChallengeSerializer(challenges, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(featured_challenges(), status=status.HTTP_200_OK)
 
 class StudentSummaryView(APIView):
     permission_classes = [IsAuthenticated]
@@ -39,63 +34,22 @@ class StudentSummaryView(APIView):
         """Return summary data for the student/graduate dashboard."""
         if request.user.role not in ['student', 'graduate']:
             return Response({"error": "Only students/graduates can view summary"}, status=status.HTTP_403_FORBIDDEN)
-        
-        graded = Submission.objects.filter(user=request.user, status='graded')
-        total_score = SubmissionReview.objects.filter(submission__user=request.user).aggregate(total=Sum('score'))['total'] or 0
-        pending = Submission.objects.filter(user=request.user, status='pending')
-        rejected = Submission.objects.filter(user=request.user, status='rejected')
-        badges = UserBadge.objects.filter(user=request.user).count()
-        
-        return Response({
-            "total_score": total_score,
-            "total_submissions": graded.count() + pending.count() + rejected.count(),
-            "badges_earned": badges
-        }, status=status.HTTP_200_OK)
+        return Response(student_summary(request.user), status=status.HTTP_200_OK)
 
 class StudentPerformanceView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
+        """Scores and submissions by category; ?granularity=day|week|month&start=YYYY-MM-DD&end=YYYY-MM-DD."""
         try:
             if request.user.role not in ['student', 'graduate']:
                 return Response({"error": "Only students/graduates can view performance"}, status=status.HTTP_403_FORBIDDEN)
-            
-            # Get current month and year
-            now = timezone.now()
-            current_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            next_month_start = (current_month_start + timezone.timedelta(days=32)).replace(day=1)
-            
-            # Fetch daily scores for the current month
-            scores = SubmissionReview.objects.filter(
-                submission__user=request.user,
-                reviewed_at__gte=current_month_start,
-                reviewed_at__lt=next_month_start
-            ).annotate(
-                day=TruncDay('reviewed_at')
-            ).values('day').annotate(total=Sum('score')).order_by('day')
-            
-            scores_data = [{"date": s['day'].strftime('%Y-%m-%d'), "score": s['total']} for s in scores]
-            
-            # Submissions by category
-            submissions = Submission.objects.filter(user=request.user).prefetch_related('challenge__categories')
-            category_data = {}
-            for sub in submissions:
-                for cat in sub.challenge.categories.all():
-                    if cat.name not in category_data:
-                        category_data[cat.name] = {"count": 0, "total_score": 0}
-                    category_data[cat.name]["count"] += 1
-                    score = SubmissionReview.objects.filter(submission=sub).aggregate(total=Sum('score'))['total'] or 0
-                    category_data[cat.name]["total_score"] += score
-            submissions_by_category = [
-                {"category": k, "count": v["count"], "total_score": v["total_score"]} for k, v in category_data.items()
-            ]
-            
-            logger.info(f"Performance data for user {request.user.email}: scores={scores_data}, submissions_by_category={submissions_by_category}")
-            return Response({
-                "aggregation_type": "daily",
-                "scores": scores_data,
-                "submissions_by_category": submissions_by_category
-            }, status=status.HTTP_200_OK)
+            granularity, start, end = parse_range(request.query_params)
+            data = student_performance(request.user, granularity, start, end)
+            logger.info(f"Performance data for user {request.user.email}: scores={data['scores']}, submissions_by_category={data['submissions_by_category']}")
+            return Response(data, status=status.HTTP_200_OK)
+        except AnalyticsQueryError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Error in StudentPerformanceView: {str(e)}")
             return Response({"error": f"Server error: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -104,6 +58,7 @@ class CompanyPerformanceView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
+        """Challenge and submission trends plus submissions by category; same query params as StudentPerformanceView."""
         try:
             if request.user.role != 'company_user':
                 return Response({"error": "Only company users can view performance"}, status=status.HTTP_403_FORBIDDEN)
@@ -114,45 +69,165 @@ class CompanyPerformanceView(APIView):
                 company = company_user.company
             except CompanyUser.DoesNotExist:
                 return Response({"error": "User is not associated with any company"}, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Get current month and year
-            now = timezone.now()
-            current_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            next_month_start = (current_month_start + timezone.timedelta(days=32)).replace(day=1)
-            
-            # Fetch daily challenge creations for the current month
-            challenges = Challenge.objects.filter(
-                company=company,
-                created_at__gte=current_month_start,
-                created_at__lt=next_month_start
-            ).annotate(
-                day=TruncDay('created_at')
-            ).values('day').annotate(count=Count('id')).order_by('day')
-            
-            challenge_trends = [{"date": c['day'].strftime('%Y-%m-%d'), "count": c['count']} for c in challenges]
-            
-            # Submissions by category
-            submissions = Submission.objects.filter(challenge__company=company).prefetch_related('challenge__categories')
-            category_data = {}
-            for sub in submissions:
-                for cat in sub.challenge.categories.all():
-                    if cat.name not in category_data:
-                        category_data[cat.name] = {"count": 0}
-                    category_data[cat.name]["count"] += 1
-            submissions_by_category = [
-                {"category": k, "count": v["count"]} for k, v in category_data.items()
-            ]
-            
-            logger.info(f"Performance data for company {company.name}: challenge_trends={challenge_trends}, submissions_by_category={submissions_by_category}")
-            return Response({
-                "aggregation_type": "daily",
-                "challenge_trends": challenge_trends,
-                "submissions_by_category": submissions_by_category
-            }, status=status.HTTP_200_OK)
+
+            granularity, start, end = parse_range(request.query_params)
+            data = company_performance(company, granularity, start, end)
+            activity.record('dashboard', request.user.id, detail='company')
+            logger.info(f"Performance data for company {company.name}: challenge_trends={data['challenge_trends']}, submissions_by_category={data['submissions_by_category']}")
+            return Response(data, status=status.HTTP_200_OK)
+        except AnalyticsQueryError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Error in CompanyPerformanceView: {str(e)}")
             return Response({"error": f"Server error: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+class ChallengeAnalyticsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, challenge_id):
+        """Completions, average score and pass rate for one of the company's challenges."""
+        if request.user.role != 'company_user':
+            return Response({"error": "Only company users can view challenge analytics"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            company_user = CompanyUser.objects.get(user=request.user)
+            challenge = Challenge.objects.get(id=challenge_id, company=company_user.company)
+        except CompanyUser.DoesNotExist:
+            return Response({"error": "User is not associated with any company"}, status=status.HTTP_400_BAD_REQUEST)
+        except Challenge.DoesNotExist:
+            return Response({"error": "Challenge not found or not owned by your company"}, status=status.HTTP_404_NOT_FOUND)
+        row = ChallengeAnalytics.objects.filter(challenge=challenge).values(
+            'completions', 'average_score', 'pass_rate', 'score_sketch', 'updated_at'
+        ).first() or {"completions": 0, "average_score": 0.0, "pass_rate": 0.0, "score_sketch": {}, "updated_at": None}
+        digest = TDigest.from_dict(row.pop('score_sketch'))
+        return Response({
+            "challenge_id": challenge.id,
+            "max_score": challenge.max_score,
+            **row,
+            "percentiles": summary(digest, challenge.max_score)["percentiles"],
+        }, status=status.HTTP_200_OK)
+
+class ChallengeFunnelView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, challenge_id):
+        """Unique students who viewed, opened, started, submitted and got graded on a challenge,
+        over `start`..`end` (default: the current month)."""
+        if request.user.role != 'company_user':
+            return Response({"error": "Only company users can view challenge funnels"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            company_user = CompanyUser.objects.get(user=request.user)
+            challenge = Challenge.objects.get(id=challenge_id, company=company_user.company)
+            _, start, end = parse_range(request.query_params)
+        except CompanyUser.DoesNotExist:
+            return Response({"error": "User is not associated with any company"}, status=status.HTTP_400_BAD_REQUEST)
+        except Challenge.DoesNotExist:
+            return Response({"error": "Challenge not found or not owned by your company"}, status=status.HTTP_404_NOT_FOUND)
+        except AnalyticsQueryError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(funnel.challenge_funnel(challenge, start, end), status=status.HTTP_200_OK)
+
+class CompanyBenchmarkView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """The company's challenges against platform percentiles for the same type and difficulty (nightly snapshot)."""
+        if request.user.role != 'company_user':
+            return Response({"error": "Only company users can view benchmarks"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            company_user = CompanyUser.objects.get(user=request.user)
+        except CompanyUser.DoesNotExist:
+            return Response({"error": "User is not associated with any company"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(get_benchmark_report(company_user.company), status=status.HTTP_200_OK)
+
+class PlatformReportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Platform-wide submission trends and breakdowns for admins, read from the reporting warehouse."""
+        if request.user.role != 'admin':
+            return Response({"error": "Admin access required"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            granularity, start, end = parse_range(request.query_params)
+            data = warehouse.platform_report(granularity, start, end)
+        except AnalyticsQueryError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except warehouse.WarehouseUnavailable as e:
+            return Response({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response({"as_of": warehouse.snapshot_info(), **data}, status=status.HTTP_200_OK)
+
+class CompanyReportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Per-challenge reporting for the company, read from the reporting warehouse; same query params as CompanyPerformanceView."""
+        if request.user.role != 'company_user':
+            return Response({"error": "Only company users can view reports"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            company_user = CompanyUser.objects.get(user=request.user)
+        except CompanyUser.DoesNotExist:
+            return Response({"error": "User is not associated with any company"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            granularity, start, end = parse_range(request.query_params)
+            data = warehouse.company_report(company_user.company_id, granularity, start, end)
+        except AnalyticsQueryError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except warehouse.WarehouseUnavailable as e:
+            return Response({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response({"as_of": warehouse.snapshot_info(), **data}, status=status.HTTP_200_OK)
+
+class CompanyScoreDistributionView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Score percentiles (as % of max_score) across all of the company's challenges, merged from their sketches."""
+        if request.user.role != 'company_user':
+            return Response({"error": "Only company users can view score distributions"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            company_user = CompanyUser.objects.get(user=request.user)
+        except CompanyUser.DoesNotExist:
+            return Response({"error": "User is not associated with any company"}, status=status.HTTP_400_BAD_REQUEST)
+        sketches = ChallengeAnalytics.objects.filter(challenge__company=company_user.company).values_list('score_sketch', flat=True)
+        return Response(summary(merged(sketches)), status=status.HTTP_200_OK)
+
+class CategoryScoreDistributionView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, category_id):
+        """Score percentiles (as % of max_score) across one category's challenges."""
+        try:
+            category = ChallengeCategory.objects.get(id=category_id)
+        except ChallengeCategory.DoesNotExist:
+            return Response({"error": "Category not found"}, status=status.HTTP_404_NOT_FOUND)
+        sketch = CategoryAnalytics.objects.filter(category=category).values_list('score_sketch', flat=True).first()
+        return Response({"category": category.name, **summary(TDigest.from_dict(sketch))}, status=status.HTTP_200_OK)
+
+class LeaderboardView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, scope, scope_id=0):
+        """Top `limit` entries of a challenge, category or the global board, plus the caller's rank and
+        up to `around` entries either side of it. `ranks_exact` is false for category and global
+        boards, whose ranks are as of the last scheduled re-rank."""
+        if scope == 'challenge' and not Challenge.objects.filter(id=scope_id, is_published=True).exists():
+            return Response({"error": "Challenge not found"}, status=status.HTTP_404_NOT_FOUND)
+        if scope == 'category' and not ChallengeCategory.objects.filter(id=scope_id).exists():
+            return Response({"error": "Category not found"}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 100)
+            around = min(max(int(request.query_params.get('around', 5)), 0), 50)
+        except ValueError:
+            return Response({"error": "limit and around must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+        standing = leaderboards.standing(scope, scope_id, request.user, around)
+        return Response({
+            "scope": scope,
+            "scope_id": scope_id or None,
+            "top": leaderboards.top(scope, scope_id, limit),
+            "me": standing["me"] if standing else None,
+            "neighbours": standing["neighbours"] if standing else [],
+            "participants": standing["participants"] if standing else leaderboards.board(scope, scope_id).count(),
+            "ranks_exact": scope in leaderboards.EXACT_RANK_SCOPES,
+        }, status=status.HTTP_200_OK)
+
 class RecentSubmissionsView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -160,9 +235,7 @@ class RecentSubmissionsView(APIView):
         """List up to 3 recent submissions by the student/graduate."""
         if request.user.role not in ['student', 'graduate']:
             return Response({"error": "Only students/graduates can view recent submissions"}, status=status.HTTP_403_FORBIDDEN)
-        submissions = Submission.objects.filter(user=request.user).order_by('-submitted_at')[:2]
-        serializer = StudentSubmissionSerializer(submissions, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(recent_submissions(request.user), status=status.HTTP_200_OK)
 
 class StudentRecommendationsView(APIView):
     permission_classes = [IsAuthenticated]
@@ -171,32 +244,64 @@ class StudentRecommendationsView(APIView):
         """Return actionable recommendations for the student/graduate."""
         if request.user.role not in ['student', 'graduate']:
             return Response({"error": "Only students/graduates can view recommendations"}, status=status.HTTP_403_FORBIDDEN)
-        
-        recommendations = []
-        # Check for incomplete profile skills
-        profile = request.user.student_profile if request.user.role == 'student' else request.user.graduate_profile
-        if not profile.skills:
-            recommendations.append({"action": "Update your skills", "link": "/my_account"})
-        
-        # Find challenges with nearest deadlines
-        now = timezone.now()
-        challenges = Challenge.objects.filter(
-            is_published=True,
-            visibility='public',
-            end_date__gt=now
-        ).order_by('end_date')[:2]  # Get up to 2 challenges with earliest end_date
-        
-        if challenges.exists():
-            earliest_end_date = challenges.first().end_date
-            # Include challenges with the same earliest end_date (up to 2)
-            for challenge in challenges:
-                if challenge.end_date == earliest_end_date:
-                    days_left = (challenge.end_date - now).days
-                    recommendations.append({
-                        "action": f"Complete '{challenge.title}' (Due in {days_left} day{'s' if days_left != 1 else ''})",
-                        "link": f"/challenges/{challenge.id}"
-                    })
-        
-        # Always include job exploration
-        recommendations.append({"action": "Explore job opportunities", "link": "/jobs"})
-        return Response(recommendations, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(student_recommendations(get_profile(request.user)), status=status.HTTP_200_OK)
+
+class ActivityCalendarView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Days the caller was active in `year` (default: this year) for a contribution heatmap, with
+        active-day counts and current and longest streaks."""
+        try:
+            year = int(request.query_params['year']) if request.query_params.get('year') else None
+        except ValueError:
+            return Response({"error": "year must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        if year is not None and not 2000 <= year <= 9999:
+            return Response({"error": "year is out of range"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(streaks.calendar(request.user, year), status=status.HTTP_200_OK)
+
+class StudentRatingsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """The caller's skill rating per category and open challenges pitched at those ratings."""
+        if request.user.role not in ['student', 'graduate']:
+            return Response({"error": "Only students/graduates have skill ratings"}, status=status.HTTP_403_FORBIDDEN)
+        return Response({
+            "ratings": ratings.user_ratings(request.user),
+            "recommended_challenges": ratings.recommended_challenges(request.user),
+        }, status=status.HTTP_200_OK)
+
+class TalentRankingView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, category_id):
+        """Students and graduates ranked by skill rating in a category, for recruiters."""
+        if request.user.role not in ['company_user', 'admin']:
+            return Response({"error": "Only company users can view talent rankings"}, status=status.HTTP_403_FORBIDDEN)
+        if not ChallengeCategory.objects.filter(id=category_id).exists():
+            return Response({"error": "Category not found"}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+            min_games = max(int(request.query_params.get('min_games', ratings.RATING_MIN_GAMES)), 0)
+        except ValueError:
+            return Response({"error": "limit and min_games must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            "category_id": category_id,
+            "candidates": ratings.talent_ranking(category_id, limit, min_games),
+        }, status=status.HTTP_200_OK)
+
+class StudentDashboardView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Return every student dashboard section (summary, performance, recent submissions,
+        featured challenges and recommendations) in one response."""
+        if request.user.role not in ['student', 'graduate']:
+            return Response({"error": "Only students/graduates can view the dashboard"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            payload = build_student_dashboard(request.user, request.query_params)
+        except AnalyticsQueryError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        activity.record('dashboard', request.user.id, detail='student')
+        return Response(payload, status=status.HTTP_200_OK)
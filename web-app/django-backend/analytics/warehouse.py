@@ -0,0 +1,288 @@
+import csv
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from challenges.models import Challenge, ChallengeCategory
+from submissions.models import Submission, SubmissionReview
+from universities.models import StudentEnrollment
+from .aggregation import ANALYTICS_TIME_ZONE, local_bounds
+from .models import WarehouseSnapshot
+import logging
+logger = logging.getLogger(__name__)
+
+WAREHOUSE_DIR = getattr(settings, 'ANALYTICS_WAREHOUSE_DIR', os.path.join(settings.BASE_DIR, 'warehouse'))
+# Incremental refreshes re-read rows changed this long before the previous watermark.
+WAREHOUSE_LATENESS_MINUTES = getattr(settings, 'ANALYTICS_WAREHOUSE_LATENESS_MINUTES', 15)
+# Older snapshot files are kept this many at a time so readers that opened them can finish.
+WAREHOUSE_KEEP_SNAPSHOTS = 2
+
+NULL = r'\N'
+
+
+class WarehouseUnavailable(Exception):
+    pass
+
+
+def _duckdb():
+    try:
+        import duckdb
+    except ImportError:
+        raise WarehouseUnavailable("The analytics warehouse needs the duckdb package")
+    return duckdb
+
+
+# table -> (queryset factory, [(column, duckdb type, field)], filter for rows changed since a moment or None).
+# Tables without a filter are small and reloaded in full on every refresh; the others are upserted by id.
+# Timestamps are stored naive in ANALYTICS_TIME_ZONE so date_trunc buckets match the rest of analytics.
+TABLES = {
+    'challenges': (Challenge.objects.all, [
+        ('id', 'INTEGER', 'id'),
+        ('company_id', 'INTEGER', 'company_id'),
+        ('title', 'VARCHAR', 'title'),
+        ('challenge_type', 'VARCHAR', 'challenge_type'),
+        ('difficulty', 'VARCHAR', 'difficulty'),
+        ('max_score', 'DOUBLE', 'max_score'),
+        ('is_published', 'BOOLEAN', 'is_published'),
+        ('created_at', 'TIMESTAMP', 'created_at'),
+    ], None),
+    'categories': (ChallengeCategory.objects.all, [
+        ('id', 'INTEGER', 'id'),
+        ('name', 'VARCHAR', 'name'),
+    ], None),
+    'challenge_categories': (Challenge.categories.through.objects.all, [
+        ('challenge_id', 'INTEGER', 'challenge_id'),
+        ('category_id', 'INTEGER', 'challengecategory_id'),
+    ], None),
+    'enrollments': (StudentEnrollment.objects.all, [
+        ('id', 'INTEGER', 'id'),
+        ('student_id', 'INTEGER', 'student_id'),
+        ('university_id', 'INTEGER', 'university_id'),
+        ('enrollment_date', 'DATE', 'enrollment_date'),
+        ('graduation_date', 'DATE', 'graduation_date'),
+    ], None),
+    'submissions': (Submission.objects.all, [
+        ('id', 'INTEGER', 'id'),
+        ('user_id', 'INTEGER', 'user_id'),
+        ('challenge_id', 'INTEGER', 'challenge_id'),
+        ('status', 'VARCHAR', 'status'),
+        ('submitted_at', 'TIMESTAMP', 'submitted_at'),
+        ('final_score', 'DOUBLE', 'final_score'),
+        ('review_count', 'INTEGER', 'review_count'),
+        ('last_reviewed_at', 'TIMESTAMP', 'last_reviewed_at'),
+    ], lambda since: Q(submitted_at__gte=since) | Q(last_reviewed_at__gte=since)),
+    'reviews': (SubmissionReview.objects.all, [
+        ('id', 'INTEGER', 'id'),
+        ('submission_id', 'INTEGER', 'submission_id'),
+        ('reviewer_id', 'INTEGER', 'reviewer_id'),
+        ('score', 'DOUBLE', 'score'),
+        ('reviewed_at', 'TIMESTAMP', 'reviewed_at'),
+    ], lambda since: Q(reviewed_at__gte=since) | Q(submission__last_reviewed_at__gte=since)),
+}
+
+
+def _cell(value):
+    if value is None:
+        return NULL
+    if hasattr(value, 'tzinfo') and value.tzinfo is not None:
+        return value.astimezone(ANALYTICS_TIME_ZONE).replace(tzinfo=None).isoformat()
+    return value
+
+
+def _sql_path(path):
+    return str(path).replace('\\', '/').replace("'", "''")
+
+
+def _load(con, table, queryset, columns, scratch):
+    """Stream `queryset` through a CSV file into a temp staging table; returns the row count."""
+    fields = [field for _, _, field in columns]
+    con.execute(f"CREATE OR REPLACE TEMP TABLE staging AS SELECT * FROM {table} LIMIT 0")
+    path = os.path.join(scratch, f'{table}.csv')
+    rows = 0
+    with open(path, 'w', newline='', encoding='utf-8') as out:
+        writer = csv.writer(out)
+        for row in queryset.order_by().values_list(*fields).iterator(chunk_size=5000):
+            writer.writerow([_cell(value) for value in row])
+            rows += 1
+    con.execute(f"COPY staging FROM '{_sql_path(path)}' (FORMAT csv, HEADER false, NULLSTR '{NULL}')")
+    os.remove(path)
+    return rows
+
+
+def _create_schema(con):
+    for table, (_, columns, _) in TABLES.items():
+        con.execute(f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(f'{name} {kind}' for name, kind, _ in columns)})")
+
+
+def latest_snapshot():
+    return WarehouseSnapshot.objects.order_by('-created_at').first()
+
+
+def refresh(full=False):
+    """Build a new warehouse file from the previous one plus everything changed since its watermark.
+
+    The previous file is copied and the copy updated, so reports keep reading the old file
+    until the new one is recorded; DuckDB allows a single writer per file and this way
+    readers and the refresh never contend for it. Small tables are reloaded in full. Rows
+    of submissions and reviews changed since the watermark (minus a lateness allowance)
+    are upserted by id, and rows deleted from PostgreSQL are dropped by diffing ids.
+    Changes that move no timestamp (a status flip, a review deleted) reach the warehouse
+    with the next full rebuild, so schedule one nightly. Returns the new WarehouseSnapshot.
+    """
+    duckdb = _duckdb()
+    os.makedirs(WAREHOUSE_DIR, exist_ok=True)
+    previous = None if full else latest_snapshot()
+    if previous and not os.path.exists(previous.path):
+        previous = None
+    position = timezone.now()  # taken before reading so nothing written meanwhile is skipped next time
+    path = os.path.join(WAREHOUSE_DIR, f"analytics-{position.strftime('%Y%m%d%H%M%S%f')}.duckdb")
+    if previous:
+        shutil.copyfile(previous.path, path)
+    since = previous.position - timedelta(minutes=WAREHOUSE_LATENESS_MINUTES) if previous else None
+
+    counts = {}
+    con = duckdb.connect(path)
+    try:
+        _create_schema(con)
+        with tempfile.TemporaryDirectory(dir=WAREHOUSE_DIR) as scratch:
+            for table, (queryset, columns, changed) in TABLES.items():
+                incremental = since is not None and changed is not None
+                rows = queryset().filter(changed(since)) if incremental else queryset()
+                con.execute("BEGIN TRANSACTION")
+                loaded = _load(con, table, rows, columns, scratch)
+                if incremental:
+                    con.execute(f"DELETE FROM {table} WHERE id IN (SELECT id FROM staging)")
+                    con.execute(f"INSERT INTO {table} SELECT * FROM staging")
+                    ids = os.path.join(scratch, f'{table}-ids.csv')
+                    with open(ids, 'w', newline='') as out:
+                        csv.writer(out).writerows((pk,) for pk in queryset().order_by().values_list('id', flat=True).iterator(chunk_size=20000))
+                    con.execute("CREATE OR REPLACE TEMP TABLE live_ids (id INTEGER)")
+                    con.execute(f"COPY live_ids FROM '{_sql_path(ids)}' (FORMAT csv, HEADER false)")
+                    con.execute(f"DELETE FROM {table} WHERE id NOT IN (SELECT id FROM live_ids)")
+                    os.remove(ids)
+                else:
+                    con.execute(f"DELETE FROM {table}")
+                    con.execute(f"INSERT INTO {table} SELECT * FROM staging")
+                con.execute("COMMIT")
+                counts[table] = {"loaded": loaded, "total": con.execute(f"SELECT count(*) FROM {table}").fetchone()[0]}
+        con.execute("CHECKPOINT")
+    except Exception:
+        con.close()
+        os.remove(path)
+        raise
+    con.close()
+
+    snapshot = WarehouseSnapshot.objects.create(path=path, position=position, full=since is None, row_counts=counts)
+    _prune()
+    return snapshot
+
+
+def _prune():
+    """Delete all but the newest few snapshot files; a file still open (Windows) is retried next run."""
+    for old in WarehouseSnapshot.objects.order_by('-created_at')[WAREHOUSE_KEEP_SNAPSHOTS:]:
+        try:
+            if os.path.exists(old.path):
+                os.remove(old.path)
+        except OSError as e:
+            logger.warning(f"Could not remove warehouse snapshot {old.path}: {str(e)}")
+            continue
+        old.delete()
+
+
+def query(sql, params=None):
+    """Run a read-only query against the newest snapshot; returns a list of dicts."""
+    duckdb = _duckdb()
+    snapshot = latest_snapshot()
+    if snapshot is None or not os.path.exists(snapshot.path):
+        raise WarehouseUnavailable("The analytics warehouse has not been built yet; run refresh_warehouse")
+    con = duckdb.connect(snapshot.path, read_only=True)
+    try:
+        cursor = con.execute(sql, params or [])
+        names = [column[0] for column in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+    finally:
+        con.close()
+
+
+def _window(start, end):
+    start, end = local_bounds(start, end)
+    return start.replace(tzinfo=None), end.replace(tzinfo=None)
+
+
+# Submissions in range with their challenge, normalized score and first-review turnaround.
+SCORED_SUBMISSIONS = """
+    WITH first_reviews AS (
+        SELECT submission_id, min(reviewed_at) AS first_reviewed_at, count(DISTINCT reviewer_id) AS reviewers
+        FROM reviews GROUP BY submission_id
+    ), scored AS (
+        SELECT s.*, c.company_id, c.title, c.challenge_type, c.difficulty,
+               CASE WHEN c.max_score > 0 THEN 100 * s.final_score / c.max_score END AS score_pct,
+               epoch(f.first_reviewed_at - s.submitted_at) / 3600 AS turnaround_hours,
+               f.reviewers
+        FROM submissions s
+        JOIN challenges c ON c.id = s.challenge_id
+        LEFT JOIN first_reviews f ON f.submission_id = s.id
+        WHERE s.submitted_at >= ? AND s.submitted_at < ? {where}
+    )
+"""
+
+
+def platform_report(granularity, start, end):
+    """Platform-wide trends and breakdowns for admins, computed in the warehouse."""
+    window = list(_window(start, end))
+    cte = SCORED_SUBMISSIONS.format(where='')
+    return {
+        "trends": query(cte + f"""
+            SELECT CAST(date_trunc('{granularity}', submitted_at) AS DATE) AS period, count(*) AS submissions,
+                   count(DISTINCT user_id) AS students, count(final_score) AS graded, round(avg(score_pct), 2) AS average_score_pct
+            FROM scored GROUP BY 1 ORDER BY 1
+        """, window),
+        "by_type": query(cte + """
+            SELECT challenge_type, difficulty, count(DISTINCT challenge_id) AS challenges, count(*) AS submissions,
+                   round(avg(score_pct), 2) AS average_score_pct, round(median(turnaround_hours), 2) AS median_turnaround_hours
+            FROM scored GROUP BY 1, 2 ORDER BY submissions DESC
+        """, window),
+        "by_category": query(cte + """
+            SELECT cat.id AS category_id, cat.name, count(*) AS submissions, round(avg(score_pct), 2) AS average_score_pct
+            FROM scored JOIN challenge_categories cc ON cc.challenge_id = scored.challenge_id
+            JOIN categories cat ON cat.id = cc.category_id
+            GROUP BY 1, 2 ORDER BY submissions DESC
+        """, window),
+        "by_university": query(cte + """
+            SELECT e.university_id, count(DISTINCT e.student_id) AS participating_students, count(*) AS submissions,
+                   round(avg(score_pct), 2) AS average_score_pct
+            FROM scored JOIN enrollments e ON e.student_id = scored.user_id
+            GROUP BY 1 ORDER BY submissions DESC
+        """, window),
+    }
+
+
+def company_report(company_id, granularity, start, end):
+    """Per-challenge and per-period reporting for one company, computed in the warehouse."""
+    params = list(_window(start, end)) + [company_id]
+    cte = SCORED_SUBMISSIONS.format(where='AND c.company_id = ?')
+    return {
+        "trends": query(cte + f"""
+            SELECT CAST(date_trunc('{granularity}', submitted_at) AS DATE) AS period, count(*) AS submissions,
+                   count(final_score) AS graded, round(avg(score_pct), 2) AS average_score_pct,
+                   round(median(turnaround_hours), 2) AS median_turnaround_hours
+            FROM scored GROUP BY 1 ORDER BY 1
+        """, params),
+        "by_challenge": query(cte + """
+            SELECT challenge_id, title, challenge_type, difficulty, count(*) AS submissions, count(final_score) AS graded,
+                   count(*) FILTER (WHERE status = 'pending') AS pending,
+                   round(avg(score_pct), 2) AS average_score_pct,
+                   round(quantile_cont(score_pct, 0.9), 2) AS p90_score_pct,
+                   round(median(turnaround_hours), 2) AS median_turnaround_hours,
+                   round(avg(reviewers), 2) AS average_reviewers
+            FROM scored GROUP BY 1, 2, 3, 4 ORDER BY submissions DESC
+        """, params),
+    }
+
+
+def snapshot_info():
+    snapshot = latest_snapshot()
+    return {"position": snapshot.position, "full": snapshot.full} if snapshot else None
@@ -0,0 +1,61 @@
+from .models import Badge, UserBadge
+from analytics.models import UserAnalytics
+from analytics.maintenance import refresh_badge_counts
+
+# Cumulative score (across all companies) needed for each badge
+BADGE_THRESHOLDS = [
+    {'name': 'Beginner', 'threshold': 100},
+    {'name': 'Intermediate', 'threshold': 500},
+    {'name': 'Expert', 'threshold': 1000},
+]
+
+
+def _threshold_badges():
+    """Badge rows for BADGE_THRESHOLDS, created on first use."""
+    badges = {badge.name: badge for badge in Badge.objects.filter(name__in=[b['name'] for b in BADGE_THRESHOLDS])}
+    for badge_data in BADGE_THRESHOLDS:
+        if badge_data['name'] not in badges:
+            badges[badge_data['name']], _ = Badge.objects.get_or_create(
+                name=badge_data['name'],
+                defaults={
+                    'description': f"Awarded for achieving {badge_data['threshold']} points across all challenges",
+                    'criteria': f"Total score >= {badge_data['threshold']}"
+                }
+            )
+    return badges
+
+
+def evaluate_badges(evidence):
+    """Award threshold badges to many users at once.
+
+    `evidence` maps user id -> the submission id recorded as evidence for any badge newly
+    earned. Totals are read from UserAnalytics.total_score (kept current by
+    submissions.scoring) in one query and new badges go in with one bulk insert, so the
+    cost does not grow with the number of users graded.
+    """
+    if not evidence:
+        return []
+    totals = dict(
+        UserAnalytics.objects.filter(user_id__in=list(evidence)).values_list('user_id', 'total_score')
+    )
+    earners = {
+        badge_data['name']: [user_id for user_id, total in totals.items() if (total or 0) >= badge_data['threshold']]
+        for badge_data in BADGE_THRESHOLDS
+    }
+    if not any(earners.values()):
+        return []
+
+    badges = _threshold_badges()
+    already_earned = set(
+        UserBadge.objects.filter(user_id__in=list(totals), badge__in=badges.values()).values_list('user_id', 'badge_id')
+    )
+    new_badges = [
+        UserBadge(user_id=user_id, badge=badges[name], evidence_id=evidence[user_id])
+        for name, user_ids in earners.items()
+        for user_id in user_ids
+        if (user_id, badges[name].id) not in already_earned
+    ]
+    # ignore_conflicts covers a concurrent grader awarding the same badge first
+    created = UserBadge.objects.bulk_create(new_badges, ignore_conflicts=True)
+    refresh_badge_counts({badge.user_id for badge in created})  # bulk_create sends no post_save
+    return created
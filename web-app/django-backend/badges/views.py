@@ -1,15 +1,15 @@
-from django.db.models import Sum
+from django.db import transaction
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from .models import Badge, UserBadge
 from .serializers import BadgeSerializer, UserBadgeSerializer
-from submissions.models import Submission, SubmissionReview
+from .utils import evaluate_badges
+from submissions.models import Submission
 from submissions.serializers import SubmissionReviewSerializer
-from users.models import CustomUser
+from submissions.signals import submission_scored
 from companies.models import CompanyUser
-from django.db.models.signals import post_save
 from django.dispatch import receiver
 
 class BadgeListView(APIView):
@@ -32,36 +32,10 @@ class UserBadgeListView(APIView):
         serializer = UserBadgeSerializer(user_badges, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
-@receiver(post_save, sender=SubmissionReview)
-def assign_badges(sender, instance, created, **kwargs):
+@receiver(submission_scored)
+def assign_badges(sender, changes, **kwargs):
     """Automatically assign badges based on cumulative score from all companies after a submission is reviewed."""
-    if created:
-        user = instance.submission.user
-        total_score = SubmissionReview.objects.filter(
-            submission__user=user
-        ).aggregate(total=Sum('score'))['total'] or 0
-
-        # Define badge thresholds
-        badge_thresholds = [
-            {'name': 'Beginner', 'threshold': 100},
-            {'name': 'Intermediate', 'threshold': 500},
-            {'name': 'Expert', 'threshold': 1000},
-        ]
-
-        for badge_data in badge_thresholds:
-            if total_score >= badge_data['threshold']:
-                badge, _ = Badge.objects.get_or_create(
-                    name=badge_data['name'],
-                    defaults={
-                        'description': f"Awarded for achieving {badge_data['threshold']} points across all challenges",
-                        'criteria': f"Total score >= {badge_data['threshold']}"
-                    }
-                )
-                UserBadge.objects.get_or_create(
-                    user=user,
-                    badge=badge,
-                    defaults={'evidence': instance.submission}
-                )
+    evaluate_badges({change.user_id: change.submission_id for change in changes if change.new_score is not None})
 
 class CompanyScoreSubmissionView(APIView):
     permission_classes = [IsAuthenticated]
@@ -73,11 +47,16 @@ class CompanyScoreSubmissionView(APIView):
         try:
             company_user = CompanyUser.objects.get(user=request.user)
             submission = Submission.objects.get(id=submission_id, challenge__company=company_user.company)
+            if submission.is_leased_by_other(request.user):
+                return Response({"error": "Submission is leased to another reviewer"}, status=status.HTTP_409_CONFLICT)
             serializer = SubmissionReviewSerializer(data=request.data, context={'submission': submission})
             if serializer.is_valid():
-                serializer.save(submission=submission, reviewer=request.user)
-                submission.status = 'graded'
-                submission.save()
+                with transaction.atomic():
+                    serializer.save(submission=submission, reviewer=request.user)
+                    submission.status = 'graded'
+                    submission.leased_by = None
+                    submission.lease_expires_at = None
+                    submission.save(update_fields=['status', 'leased_by', 'lease_expires_at'])
                 return Response({"message": "Submission scored successfully"}, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except CompanyUser.DoesNotExist:
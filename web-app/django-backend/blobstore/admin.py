@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import Blob
+
+@admin.register(Blob)
+class BlobAdmin(admin.ModelAdmin):
+    list_display = ('sha256', 'file', 'size', 'ref_count', 'created_at')
+    list_filter = ('created_at',)
+    search_fields = ('sha256', 'file')
+    readonly_fields = ('sha256', 'file', 'size', 'ref_count', 'created_at')
@@ -0,0 +1,156 @@
+import os
+import shutil
+import time
+from datetime import timedelta
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+from django.db.models import ProtectedError
+from django.utils import timezone
+from blobstore.models import Blob
+from blobstore.signals import BLOB_BACKED_MODELS
+from submissions.models import ChunkedUpload
+from submissions.uploads import partial_path, discard_partial
+
+class Command(BaseCommand):
+    help = (
+        'Deletes (or quarantines) files under MEDIA_ROOT that no database row references. '
+        'Meant to run nightly from cron / Task Scheduler: python manage.py gc_media'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be reclaimed without touching anything')
+        parser.add_argument('--quarantine', metavar='DIR', help='Move unreferenced files here instead of deleting them')
+        parser.add_argument('--min-age-hours', type=float, default=24,
+                            help='Leave files younger than this alone, so uploads in flight are never collected')
+        parser.add_argument('--abandoned-upload-hours', type=float, default=72,
+                            help='Expire resumable uploads that have not received a chunk for this long')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        self.dry_run = options['dry_run']
+        self.quarantine = os.path.abspath(options['quarantine']) if options['quarantine'] else None
+        self.batch_size = options['batch_size']
+        min_age = timedelta(hours=options['min_age_hours'])
+        self.file_fields = [
+            (model, field.name)
+            for model in apps.get_models()
+            for field in model._meta.concrete_fields
+            if isinstance(field, models.FileField)
+        ]
+
+        released, released_bytes = self.release_unreferenced_blobs(timezone.now() - min_age)
+        abandoned, abandoned_bytes = self.expire_abandoned_uploads(timezone.now() - timedelta(hours=options['abandoned_upload_hours']))
+        media_root = os.path.abspath(settings.MEDIA_ROOT)
+        scanned = collected = reclaimed = 0
+        batch = []
+        for entry in self.walk(media_root, time.time() - min_age.total_seconds()):
+            batch.append(entry)
+            if len(batch) >= self.batch_size:
+                n, size = self.collect(media_root, batch)
+                scanned, collected, reclaimed = scanned + len(batch), collected + n, reclaimed + size
+                batch = []
+        if batch:
+            n, size = self.collect(media_root, batch)
+            scanned, collected, reclaimed = scanned + len(batch), collected + n, reclaimed + size
+
+        action = 'Would reclaim' if self.dry_run else ('Quarantined' if self.quarantine else 'Deleted')
+        self.stdout.write(self.style.SUCCESS(
+            f'Scanned {scanned} files, released {released} unreferenced blobs ({released_bytes} bytes), '
+            f'expired {abandoned} abandoned uploads ({abandoned_bytes} bytes). '
+            f'{action} {collected} files, {reclaimed} bytes ({reclaimed / 1024 ** 2:.1f} MiB)'
+        ))
+
+    def release_unreferenced_blobs(self, older_than):
+        """Drop Blob rows nothing points at any more, so their files become collectable below.
+
+        Returns (blobs released, their bytes). A dry run deletes nothing, so the released
+        blobs' files are remembered and counted as unreferenced when the walk reaches them.
+        """
+        relations = [apps.get_model(label) for label in BLOB_BACKED_MODELS]
+        released = released_bytes = 0
+        self.released_files = set()
+        candidates = Blob.objects.filter(ref_count__lte=0, created_at__lt=older_than).values_list('id', flat=True)
+        for blob_id in candidates.iterator(chunk_size=self.batch_size):
+            try:
+                with transaction.atomic():
+                    # store_blob and the signals count references; with the blob locked, a new
+                    # reference either committed before the re-check or waits until the delete is done.
+                    blob = Blob.objects.select_for_update().filter(id=blob_id, ref_count__lte=0).first()
+                    if blob is None or any(model.objects.filter(blob_id=blob_id).exists() for model in relations):
+                        continue
+                    if self.dry_run:
+                        self.released_files.add(blob.file.name)
+                    else:
+                        blob.delete()
+            except ProtectedError:
+                # Referenced by a row that committed in between; PROTECT kept it.
+                continue
+            released += 1
+            released_bytes += blob.size
+        return released, released_bytes
+
+    def expire_abandoned_uploads(self, older_than):
+        """Remove partial files of resumable uploads the client never finished."""
+        stale = ChunkedUpload.objects.filter(status='uploading', updated_at__lt=older_than)
+        expired = reclaimed = 0
+        for upload in stale.iterator(chunk_size=self.batch_size):
+            path = partial_path(upload)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            expired += 1
+            reclaimed += size
+            if not self.dry_run:
+                discard_partial(upload)
+                ChunkedUpload.objects.filter(id=upload.id).update(status='failed')
+        return expired, reclaimed
+
+    def walk(self, root, cutoff):
+        """Yield (relative name, size) for files older than `cutoff`, one directory handle at a time."""
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if os.path.abspath(entry.path) != self.quarantine:
+                                stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            stat = entry.stat(follow_symlinks=False)
+                            if stat.st_mtime < cutoff:
+                                name = os.path.relpath(entry.path, root).replace(os.sep, '/')
+                                yield name, stat.st_size
+            except OSError as e:
+                self.stderr.write(self.style.WARNING(f'Skipping {directory}: {str(e)}'))
+
+    def collect(self, root, batch):
+        names = [name for name, _ in batch]
+        referenced = set()
+        for model, field_name in self.file_fields:
+            referenced.update(
+                model._default_manager.filter(**{f'{field_name}__in': names}).values_list(field_name, flat=True)
+            )
+        referenced -= self.released_files
+
+        collected = reclaimed = 0
+        for name, size in batch:
+            if name in referenced:
+                continue
+            collected += 1
+            reclaimed += size
+            path = os.path.join(root, name)
+            if self.dry_run:
+                self.stdout.write(f'unreferenced: {name} ({size} bytes)')
+            elif self.quarantine:
+                target = os.path.join(self.quarantine, name)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.move(path, target)
+            else:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    self.stderr.write(self.style.WARNING(f'Could not delete {name}: {str(e)}'))
+                    collected -= 1
+                    reclaimed -= size
+        return collected, reclaimed
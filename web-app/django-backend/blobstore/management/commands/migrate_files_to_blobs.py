@@ -0,0 +1,37 @@
+import os
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from blobstore.models import Blob
+from blobstore.signals import BLOB_BACKED_MODELS
+from blobstore.utils import store_blob
+
+class Command(BaseCommand):
+    help = 'Moves files uploaded before the blob store existed into it, deduplicating identical content'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        for label in BLOB_BACKED_MODELS:
+            model = apps.get_model(label)
+            migrated = missing = 0
+            pending = model.objects.filter(blob__isnull=True).exclude(file='').values_list('id', 'file')
+            for row_id, name in pending.iterator(chunk_size=options['batch_size']):
+                field_file = model(file=name).file
+                if not field_file.storage.exists(name):
+                    missing += 1
+                    continue
+                with field_file.open('rb') as content:
+                    blob = store_blob(content, name)
+                updated = model.objects.filter(id=row_id, blob__isnull=True).update(
+                    file=blob.file.name,
+                    blob=blob,
+                    original_name=os.path.basename(name)[:255]
+                )
+                if not updated:
+                    # Migrated concurrently; give back the reference store_blob counted for it.
+                    Blob.objects.filter(id=blob.id).update(ref_count=F('ref_count') - 1)
+                migrated += updated
+            self.stdout.write(self.style.SUCCESS(f'{label}: migrated {migrated} files, {missing} missing from storage'))
+        self.stdout.write(self.style.NOTICE('Original copies are left in place; run gc_media to reclaim them.'))
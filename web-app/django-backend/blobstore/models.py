@@ -0,0 +1,11 @@
+from django.db import models
+
+class Blob(models.Model):
+    sha256 = models.CharField(max_length=64, unique=True, db_index=True)
+    file = models.FileField(upload_to='blobs/', max_length=255)
+    size = models.BigIntegerField()
+    ref_count = models.IntegerField(default=0, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256} ({self.ref_count} refs)"
@@ -0,0 +1,68 @@
+import os
+import uuid
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.utils.text import get_valid_filename
+
+PRESIGNED_UPLOAD_EXPIRES = getattr(settings, 'PRESIGNED_UPLOAD_EXPIRES', 15 * 60)  # seconds
+PRESIGNED_UPLOAD_MAX_SIZE = getattr(settings, 'PRESIGNED_UPLOAD_MAX_SIZE', 2 * 1024 ** 3)
+UPLOAD_TOKEN_SALT = 'blobstore.presigned-upload'
+
+
+class PresignedUploadError(Exception):
+    pass
+
+
+def presigned_uploads_enabled():
+    """Direct uploads need an S3-compatible default storage (django-storages' S3Storage)."""
+    return hasattr(default_storage, 'bucket') and hasattr(default_storage, 'connection')
+
+
+def _client():
+    return default_storage.connection.meta.client
+
+
+def create_presigned_upload(prefix, filename, size, scope, content_type=None):
+    """Issue a presigned POST for one object under `prefix`.
+
+    The returned `upload_token` is a signed record of the key, size and `scope` (e.g. the
+    submission id); finalize_presigned_upload() only accepts it back for the same scope.
+    """
+    if not presigned_uploads_enabled():
+        raise PresignedUploadError("Direct uploads are not configured on this server")
+    if size <= 0 or size > PRESIGNED_UPLOAD_MAX_SIZE:
+        raise PresignedUploadError(f"size must be between 1 and {PRESIGNED_UPLOAD_MAX_SIZE} bytes")
+
+    original_name = os.path.basename(filename)[:255]
+    key = f"{prefix}/{uuid.uuid4().hex}/{get_valid_filename(original_name)}"
+    fields = {'Content-Type': content_type} if content_type else {}
+    conditions = [['content-length-range', size, size]]
+    if content_type:
+        conditions.append({'Content-Type': content_type})
+    post = _client().generate_presigned_post(
+        Bucket=default_storage.bucket.name,
+        Key=default_storage._normalize_name(key),
+        Fields=fields,
+        Conditions=conditions,
+        ExpiresIn=PRESIGNED_UPLOAD_EXPIRES
+    )
+    token = signing.dumps({'key': key, 'size': size, 'name': original_name, 'scope': scope}, salt=UPLOAD_TOKEN_SALT)
+    return {'url': post['url'], 'fields': post['fields'], 'key': key, 'upload_token': token, 'expires_in': PRESIGNED_UPLOAD_EXPIRES}
+
+
+def finalize_presigned_upload(upload_token, scope):
+    """Check the object behind `upload_token` landed in the bucket. Returns `(key, original name)`."""
+    try:
+        data = signing.loads(upload_token, salt=UPLOAD_TOKEN_SALT, max_age=PRESIGNED_UPLOAD_EXPIRES * 4)
+    except signing.BadSignature:
+        raise PresignedUploadError("Invalid or expired upload token")
+    if data['scope'] != scope:
+        raise PresignedUploadError("Upload token does not belong to this submission")
+    try:
+        head = _client().head_object(Bucket=default_storage.bucket.name, Key=default_storage._normalize_name(data['key']))
+    except Exception:
+        raise PresignedUploadError("Uploaded object not found; upload the file before finalizing")
+    if head['ContentLength'] != data['size']:
+        raise PresignedUploadError("Uploaded object size does not match the requested size")
+    return data['key'], data['name']
@@ -0,0 +1,35 @@
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from .models import Blob
+
+# Models whose `file` is stored through the blob store (see blobstore.utils.attach_blob).
+BLOB_BACKED_MODELS = [
+    'submissions.SubmissionFile',
+    'submissions.SubmissionIntakeFile',
+    'challenges.ChallengeAttachment',
+]
+
+
+def count_blob_reference(sender, instance, created, **kwargs):
+    # A blob routed in by attach_blob was already counted by store_blob.
+    counted = instance.__dict__.pop('_blob_counted', False)
+    if created:
+        if instance.blob_id and not counted:
+            Blob.objects.filter(id=instance.blob_id).update(ref_count=F('ref_count') + 1)
+        return
+    if '_replaced_blob_id' in instance.__dict__:
+        replaced_blob_id = instance.__dict__.pop('_replaced_blob_id')
+        if not counted:
+            Blob.objects.filter(id=instance.blob_id).update(ref_count=F('ref_count') + 1)
+        if replaced_blob_id:
+            Blob.objects.filter(id=replaced_blob_id).update(ref_count=F('ref_count') - 1)
+
+
+def release_blob_reference(sender, instance, **kwargs):
+    if instance.blob_id:
+        Blob.objects.filter(id=instance.blob_id).update(ref_count=F('ref_count') - 1)
+
+
+for model in BLOB_BACKED_MODELS:
+    post_save.connect(count_blob_reference, sender=model, dispatch_uid=f'count_blob_reference_{model}')
+    post_delete.connect(release_blob_reference, sender=model, dispatch_uid=f'release_blob_reference_{model}')
@@ -0,0 +1,47 @@
+import hashlib
+import os
+from django.core.files.storage import default_storage
+
+
+class ContentAddressedStorage:
+    """Stores file content once per sha256 digest on top of a regular Django storage.
+
+    Blobs live at `blobs/<aa>/<bb>/<digest><ext>`, so whether some content is already
+    stored is answered from its digest alone.
+    """
+
+    def __init__(self, storage=None, prefix='blobs'):
+        self.storage = storage or default_storage
+        self.prefix = prefix
+
+    def path_for(self, digest, name=''):
+        ext = os.path.splitext(name)[1].lower()[:16]
+        return f"{self.prefix}/{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+    def digest(self, content):
+        """Return the sha256 of `content`, reusing the digest computed during upload when available."""
+        digest = getattr(content, 'sha256', None)
+        if digest:
+            return digest
+        hasher = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks() if hasattr(content, 'chunks') else iter(lambda: content.read(64 * 1024), b''):
+            hasher.update(chunk)
+        return hasher.hexdigest()
+
+    def save(self, content, name=''):
+        """Store `content` unless identical content already exists. Returns `(digest, stored name)`."""
+        digest = self.digest(content)
+        path = self.path_for(digest, name or getattr(content, 'name', '') or '')
+        if self.storage.exists(path):
+            return digest, path
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        return digest, self.storage.save(path, content)
+
+    def exists(self, digest, name=''):
+        return self.storage.exists(self.path_for(digest, name))
+
+
+content_addressed_storage = ContentAddressedStorage()
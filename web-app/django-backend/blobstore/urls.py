@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import BlobLookupView
+
+urlpatterns = [
+    path('<str:sha256>/', BlobLookupView.as_view(), name='blob-lookup'),
+]
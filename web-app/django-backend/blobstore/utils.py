@@ -0,0 +1,68 @@
+import os
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from .models import Blob
+from .storage import content_addressed_storage
+
+
+def store_blob(content, name=''):
+    """Return the Blob holding `content`, writing it to storage only if it is new.
+
+    The caller's reference is counted here, with the blob row locked, so gc_media cannot
+    release the blob between it being found and the caller's row pointing at it. A
+    reference that ends up unused keeps the blob alive rather than losing it.
+    """
+    digest = content_addressed_storage.digest(content)
+    blob = _add_reference(digest)
+    if blob:
+        return blob
+    digest, stored_name = content_addressed_storage.save(content, name)
+    try:
+        with transaction.atomic():
+            return Blob.objects.create(sha256=digest, file=stored_name, size=content.size, ref_count=1)
+    except IntegrityError:
+        # Another request stored the same content concurrently; the file on disk is identical.
+        return _add_reference(digest)
+
+
+def _add_reference(digest):
+    with transaction.atomic():
+        blob = Blob.objects.select_for_update().filter(sha256=digest).first()
+        if blob:
+            blob.ref_count += 1
+            blob.save(update_fields=['ref_count'])
+        return blob
+
+
+def blobs_owned_by(user):
+    """Blobs `user` has uploaded themselves: referenced by their submission files or queued intake files.
+
+    Knowing a digest is not proof of having the bytes, so a client may only reference
+    content by hash when it is already one of these.
+    """
+    return Blob.objects.filter(
+        Q(submission_files__submission__user=user) | Q(intake_files__intake__user=user)
+    ).distinct()
+
+
+def attach_blob(instance, field_name='file'):
+    """Route a newly assigned file on `instance` into the blob store.
+
+    Called from the model's save(). The field ends up pointing at the shared blob path,
+    so existing serializers keep returning a working URL. store_blob counts this reference;
+    blobstore.signals counts the rest.
+    """
+    field_file = getattr(instance, field_name)
+    if not field_file or field_file._committed:
+        return
+    original_name = os.path.basename(field_file.name or '')
+    blob = store_blob(field_file.file, original_name)
+    if instance.pk:
+        # Replacing the file of an existing row: the signal moves the reference over.
+        instance._replaced_blob_id = instance.blob_id
+    instance.blob = blob
+    instance._blob_counted = True
+    if hasattr(instance, 'original_name') and not instance.original_name:
+        instance.original_name = original_name[:255]
+    field_file.name = blob.file.name
+    field_file._committed = True
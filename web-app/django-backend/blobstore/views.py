@@ -0,0 +1,22 @@
+import re
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from .utils import blobs_owned_by
+
+SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+class BlobLookupView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, sha256):
+        """Tell a client whether it has already uploaded content with this sha256, so it can skip
+        re-uploading it. Only the caller's own files are considered."""
+        sha256 = sha256.lower()
+        if not SHA256_RE.match(sha256):
+            return Response({"error": "Invalid sha256 digest"}, status=status.HTTP_400_BAD_REQUEST)
+        blob = blobs_owned_by(request.user).filter(sha256=sha256).values('sha256', 'size').first()
+        if not blob:
+            return Response({"exists": False}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"exists": True, **blob}, status=status.HTTP_200_OK)
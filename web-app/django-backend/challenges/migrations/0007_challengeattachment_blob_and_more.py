@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blobstore', '0001_initial'),
+        ('challenges', '0006_alter_challenge_challenge_type_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='challengeattachment',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='challenge_attachments', to='blobstore.blob'),
+        ),
+        migrations.AddField(
+            model_name='challengeattachment',
+            name='original_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='challengeattachment',
+            name='file',
+            field=models.FileField(max_length=255, upload_to='challenge_attachments/'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0007_challengeattachment_blob_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='challenge',
+            name='consensus_method',
+            field=models.CharField(choices=[('mean', 'Mean'), ('median', 'Median'), ('trimmed_mean', 'Trimmed Mean')], default='mean', max_length=20),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from companies.models import Company
 from users.models import CustomUser
+from blobstore.utils import attach_blob
 
 class ChallengeCategory(models.Model):
     name = models.CharField(max_length=100, unique=True, db_index=True)  # e.g., "Developers", "HR", "Sales", "Accounting"
@@ -56,6 +57,11 @@ class Challenge(models.Model):
         ('video', 'Video Submission'),  # Video pitches
         ('multiple', 'Multiple Formats'),  # Combination of above
     )
+    CONSENSUS_CHOICES = (
+        ('mean', 'Mean'),  # Average of all reviewers
+        ('median', 'Median'),  # Middle score, robust to one outlier
+        ('trimmed_mean', 'Trimmed Mean'),  # Average after dropping the highest and lowest scores
+    )
 
     title = models.CharField(max_length=255, db_index=True)
     description = models.TextField()
@@ -78,6 +84,7 @@ class Challenge(models.Model):
     prerequisite_description = models.TextField(blank=True)
     estimated_completion_time = models.IntegerField(null=True, blank=True)
     max_score = models.FloatField(default=100.0)
+    consensus_method = models.CharField(max_length=20, choices=CONSENSUS_CHOICES, default='mean')  # How multiple reviews combine into a submission's final score
     is_published = models.BooleanField(default=False, db_index=True)
     is_featured = models.BooleanField(default=False, help_text="Mark as featured for dashboard carousel", null=True, blank=True, db_index=True)
     thumbnail = models.ImageField(upload_to='challenges/thumbnails/', blank=True, null=True, help_text="Thumbnail image for the challenge")
@@ -112,13 +119,19 @@ class Task(models.Model):
 
 class ChallengeAttachment(models.Model):
     challenge = models.ForeignKey(Challenge, on_delete=models.CASCADE, related_name='attachments', db_index=True)
-    file = models.FileField(upload_to='challenge_attachments/')
+    file = models.FileField(upload_to='challenge_attachments/', max_length=255)
+    blob = models.ForeignKey('blobstore.Blob', on_delete=models.PROTECT, null=True, blank=True, related_name='challenge_attachments')
+    original_name = models.CharField(max_length=255, blank=True)
     description = models.CharField(max_length=255, blank=True)
     is_required = models.BooleanField(default=False)
 
     def __str__(self):
         return f"Attachment for {self.challenge.title}"
 
+    def save(self, *args, **kwargs):
+        attach_blob(self)  # store content once per sha256
+        super().save(*args, **kwargs)
+
     class Meta:
         indexes = [
             models.Index(fields=['challenge', 'is_required']),
@@ -22,7 +22,7 @@ class TaskSerializer(serializers.ModelSerializer):
 class ChallengeAttachmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = ChallengeAttachment
-        fields = ['id', 'file', 'description', 'is_required']
+        fields = ['id', 'file', 'original_name', 'description', 'is_required']
 
 class ChallengeRubricSerializer(serializers.ModelSerializer):
     class Meta:
@@ -66,7 +66,7 @@ class ChallengeSerializer(serializers.ModelSerializer):
             'company', 'categories', 'created_by', 'created_at', 'updated_at',
             'start_date', 'end_date', 'duration_minutes', 'max_submissions',
             'is_collaborative', 'max_team_size', 'skill_tags', 'learning_outcomes',
-            'prerequisite_description', 'estimated_completion_time', 'max_score', 'is_published',
+            'prerequisite_description', 'estimated_completion_time', 'max_score', 'consensus_method', 'is_published',
             'tasks', 'attachments', 'rubrics', 'groups', 'prerequisites', 'feedback', 'submission_count'
         ]
 
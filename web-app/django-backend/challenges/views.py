@@ -2,13 +2,16 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from .models import Challenge, ChallengeCategory
 from .serializers import ChallengeSerializer, StudentChallengeSerializer, ChallengeCategorySerializer
 from submissions.models import Submission
 from submissions.serializers import SubmissionSerializer, ParticipantSerializer
+from submissions.exports import iter_export_rows, stream_csv, stream_ndjson, stream_submissions_zip
 from users.models import CustomUser, StudentProfile, GraduateProfile
 from companies.models import CompanyUser
+from analytics import activity, funnel
 
 class CompanyCreateChallengeView(APIView):
     permission_classes = [IsAuthenticated]
@@ -78,6 +81,55 @@ class CompanyChallengeSubmissionsView(APIView):
         except Challenge.DoesNotExist:
             return Response({"error": "Challenge not found or not owned by your company"}, status=status.HTTP_404_NOT_FOUND)
 
+class CompanyChallengeSubmissionsExportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, challenge_id):
+        """Stream every submission for a challenge, with files and latest review, as CSV or NDJSON."""
+        if request.user.role != 'company_user':
+            return Response({"error": "Only company users can export submissions"}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            company_user = CompanyUser.objects.get(user=request.user)
+            challenge = Challenge.objects.get(id=challenge_id, company=company_user.company)
+        except CompanyUser.DoesNotExist:
+            return Response({"error": "User is not associated with any company"}, status=status.HTTP_400_BAD_REQUEST)
+        except Challenge.DoesNotExist:
+            return Response({"error": "Challenge not found or not owned by your company"}, status=status.HTTP_404_NOT_FOUND)
+
+        # Not `format`: DRF reserves that query parameter for renderer negotiation.
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format == 'csv':
+            response = StreamingHttpResponse(stream_csv(iter_export_rows(challenge)), content_type='text/csv')
+        elif file_format == 'ndjson':
+            response = StreamingHttpResponse(stream_ndjson(iter_export_rows(challenge)), content_type='application/x-ndjson')
+        else:
+            return Response({"error": "file_format must be 'csv' or 'ndjson'"}, status=status.HTTP_400_BAD_REQUEST)
+        activity.record('download', request.user.id, challenge.id, detail=file_format)
+        response['Content-Disposition'] = f'attachment; filename="challenge-{challenge.id}-submissions.{file_format}"'
+        return response
+
+class CompanyChallengeSubmissionsDownloadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, challenge_id):
+        """Stream a ZIP of all submission files for a challenge, one folder per participant."""
+        if request.user.role != 'company_user':
+            return Response({"error": "Only company users can download submissions"}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            company_user = CompanyUser.objects.get(user=request.user)
+            challenge = Challenge.objects.get(id=challenge_id, company=company_user.company)
+        except CompanyUser.DoesNotExist:
+            return Response({"error": "User is not associated with any company"}, status=status.HTTP_400_BAD_REQUEST)
+        except Challenge.DoesNotExist:
+            return Response({"error": "Challenge not found or not owned by your company"}, status=status.HTTP_404_NOT_FOUND)
+
+        response = StreamingHttpResponse(stream_submissions_zip(challenge), content_type='application/zip')
+        activity.record('download', request.user.id, challenge.id, detail='zip')
+        response['Content-Disposition'] = f'attachment; filename="challenge-{challenge.id}-submissions.zip"'
+        return response
+
 class StudentChallengeListView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -142,6 +194,8 @@ class StudentChallengeListView(APIView):
                     categorized_challenges[challenge_type] = []
                 categorized_challenges[challenge_type].append(challenge_data)
 
+        funnel.record('viewed', {challenge.id for challenge in challenges}, request.user.id)
+        activity.record('challenge_list', request.user.id, detail=group_by)
         return Response(categorized_challenges, status=status.HTTP_200_OK)
 
 class ChallengeParticipantsView(APIView):
@@ -199,6 +253,8 @@ class ChallengeDetailView(APIView):
                 return Response({"error": "Challenge not available for your areas of expertise"}, status=status.HTTP_403_FORBIDDEN)
 
             serializer = StudentChallengeSerializer(challenge)
+            funnel.record('opened', [challenge.id], request.user.id)
+            activity.record('challenge_open', request.user.id, challenge.id)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Challenge.DoesNotExist:
             return Response({"error": "Challenge not found"}, status=status.HTTP_404_NOT_FOUND)
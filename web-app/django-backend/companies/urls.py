@@ -2,16 +2,23 @@ from django.urls import path
 from challenges.views import (
     CompanyCreateChallengeView, CompanyChallengeListView, CompanyChallengeSubmissionsView,
     StudentChallengeListView, ChallengeParticipantsView, ChallengeDetailView,
-    CategorySearchView
+    CategorySearchView, CompanyChallengeSubmissionsExportView,
+    CompanyChallengeSubmissionsDownloadView
 )
 from submissions.views import (
-    SubmitChallengeView, StudentSubmissionListView, CompanyReviewSubmissionView,
-    StudentChallengeResultsView, StudentPendingSubmissionsView, StudentRejectedSubmissionsView
+    SubmitChallengeView, StudentSubmissionListView, CompanyReviewSubmissionView, CompanyBulkReviewView,
+    ReviewQueueView, ReviewQueueReleaseView,
+    StudentChallengeResultsView, StudentPendingSubmissionsView, StudentRejectedSubmissionsView,
+    StartChallengeAttemptView, ChallengeHeartbeatView, SubmissionIntakeStatusView,
+    CreateChunkedUploadView, ChunkedUploadView, PresignSubmissionUploadView, FinalizeSubmissionUploadView
 )
 from analytics.views import (
     FeaturedChallengesView, StudentSummaryView, StudentPerformanceView,
-    RecentSubmissionsView, StudentRecommendationsView, CompanyPerformanceView
+    RecentSubmissionsView, StudentRecommendationsView, CompanyPerformanceView, StudentDashboardView,
+    ChallengeAnalyticsView, ChallengeFunnelView, LeaderboardView, CompanyBenchmarkView,
+    PlatformReportView, CompanyReportView, ActivityCalendarView, StudentRatingsView, TalentRankingView, CompanyScoreDistributionView, CategoryScoreDistributionView
 )
+from evaluations.views import ChallengeConsensusView, CompanyReviewerStatsView
 from .views import CompanyProfileView
 
 urlpatterns = [
@@ -19,6 +26,19 @@ urlpatterns = [
     path('company/challenges/create/', CompanyCreateChallengeView.as_view(), name='company-create-challenge'),
     path('company/challenges/', CompanyChallengeListView.as_view(), name='company-challenge-list'),
     path('company/challenges/<int:challenge_id>/submissions/', CompanyChallengeSubmissionsView.as_view(), name='company-challenge-submissions'),
+    path('company/challenges/<int:challenge_id>/submissions/export/', CompanyChallengeSubmissionsExportView.as_view(), name='company-challenge-submissions-export'),
+    path('company/challenges/<int:challenge_id>/submissions/download/', CompanyChallengeSubmissionsDownloadView.as_view(), name='company-challenge-submissions-download'),
+    path('company/challenges/<int:challenge_id>/consensus/', ChallengeConsensusView.as_view(), name='challenge-consensus'),
+    path('company/challenges/<int:challenge_id>/analytics/', ChallengeAnalyticsView.as_view(), name='challenge-analytics'),
+    path('company/challenges/<int:challenge_id>/funnel/', ChallengeFunnelView.as_view(), name='challenge-funnel'),
+    path('company/reports/', CompanyReportView.as_view(), name='company-reports'),
+    path('reports/platform/', PlatformReportView.as_view(), name='platform-reports'),
+    path('company/benchmarks/', CompanyBenchmarkView.as_view(), name='company-benchmarks'),
+    path('company/score-distribution/', CompanyScoreDistributionView.as_view(), name='company-score-distribution'),
+    path('company/reviewers/stats/', CompanyReviewerStatsView.as_view(), name='company-reviewer-stats'),
+    path('company/review-queue/', ReviewQueueView.as_view(), name='review-queue'),
+    path('company/review-queue/release/', ReviewQueueReleaseView.as_view(), name='review-queue-release'),
+    path('company/submissions/reviews/bulk/', CompanyBulkReviewView.as_view(), name='company-bulk-review'),
     path('company/submissions/<int:submission_id>/review/', CompanyReviewSubmissionView.as_view(), name='company-review-submission'),
     path('company/profile/', CompanyProfileView.as_view(), name='company-profile'),
     path('company/performance/', CompanyPerformanceView.as_view(), name='company-performance'),
@@ -27,17 +47,34 @@ urlpatterns = [
     path('student/challenges/', StudentChallengeListView.as_view(), name='student-challenge-list'),
     path('student/challenges/<int:challenge_id>/', ChallengeDetailView.as_view(), name='challenge-detail'),
     path('student/challenges/<int:challenge_id>/submit/', SubmitChallengeView.as_view(), name='submit-challenge'),
+    path('student/challenges/<int:challenge_id>/start/', StartChallengeAttemptView.as_view(), name='start-challenge-attempt'),
+    path('student/challenges/<int:challenge_id>/heartbeat/', ChallengeHeartbeatView.as_view(), name='challenge-heartbeat'),
+    path('student/submissions/intake/<int:intake_id>/', SubmissionIntakeStatusView.as_view(), name='submission-intake-status'),
+    path('student/submissions/<int:submission_id>/uploads/', CreateChunkedUploadView.as_view(), name='create-chunked-upload'),
+    path('student/submissions/<int:submission_id>/uploads/presign/', PresignSubmissionUploadView.as_view(), name='presign-submission-upload'),
+    path('student/submissions/<int:submission_id>/uploads/finalize/', FinalizeSubmissionUploadView.as_view(), name='finalize-submission-upload'),
+    path('student/uploads/<uuid:upload_id>/', ChunkedUploadView.as_view(), name='chunked-upload'),
     path('student/submissions/', StudentSubmissionListView.as_view(), name='student-submission-list'),
     path('student/results/', StudentChallengeResultsView.as_view(), name='student-challenge-results'),
     path('student/submissions/pending/', StudentPendingSubmissionsView.as_view(), name='student-pending-submissions'),
     path('student/submissions/rejected/', StudentRejectedSubmissionsView.as_view(), name='student-rejected-submissions'),
     path('challenges/<int:challenge_id>/participants/', ChallengeParticipantsView.as_view(), name='challenge-participants'),
     path('categories/search/', CategorySearchView.as_view(), name='category-search'),
+    path('categories/<int:category_id>/score-distribution/', CategoryScoreDistributionView.as_view(), name='category-score-distribution'),
 
     # Dashboard APIs
     path('student/featured-challenges/', FeaturedChallengesView.as_view(), name='featured-challenges'),
+    path('activity/calendar/', ActivityCalendarView.as_view(), name='activity-calendar'),
+    path('student/ratings/', StudentRatingsView.as_view(), name='student-ratings'),
+    path('talent/rankings/categories/<int:category_id>/', TalentRankingView.as_view(), name='talent-ranking'),
+    path('student/dashboard/', StudentDashboardView.as_view(), name='student-dashboard'),
     path('student/summary/', StudentSummaryView.as_view(), name='student-summary'),
     path('student/performance/', StudentPerformanceView.as_view(), name='student-performance'),
     path('student/recent-submissions/', RecentSubmissionsView.as_view(), name='recent-submissions'),
     path('student/recommendations/', StudentRecommendationsView.as_view(), name='student-recommendations'),
+
+    # Leaderboard APIs
+    path('leaderboards/global/', LeaderboardView.as_view(), {'scope': 'global'}, name='leaderboard-global'),
+    path('leaderboards/challenges/<int:scope_id>/', LeaderboardView.as_view(), {'scope': 'challenge'}, name='leaderboard-challenge'),
+    path('leaderboards/categories/<int:scope_id>/', LeaderboardView.as_view(), {'scope': 'category'}, name='leaderboard-category'),
 ]
\ No newline at end of file
@@ -1,3 +1,8 @@
 from django.contrib import admin
+from .models import ReviewerStats
 
-# Register your models here.
+@admin.register(ReviewerStats)
+class ReviewerStatsAdmin(admin.ModelAdmin):
+    list_display = ('reviewer', 'company', 'review_count', 'updated_at')
+    list_filter = ('company',)
+    search_fields = ('reviewer__email',)
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+
+
+def backfill_reviewer_stats(apps, schema_editor):
+    SubmissionReview = apps.get_model('submissions', 'SubmissionReview')
+    ReviewerStats = apps.get_model('evaluations', 'ReviewerStats')
+    rows = SubmissionReview.objects.filter(
+        reviewer__isnull=False, submission__challenge__company__isnull=False, submission__challenge__max_score__gt=0
+    ).annotate(x=F('score') / F('submission__challenge__max_score')).values(
+        'submission__challenge__company_id', 'reviewer_id'
+    ).annotate(n=Count('id'), total=Sum('x'), total_sq=Sum(F('x') * F('x')))
+    ReviewerStats.objects.bulk_create([
+        ReviewerStats(
+            company_id=row['submission__challenge__company_id'],
+            reviewer_id=row['reviewer_id'],
+            review_count=row['n'],
+            score_sum=row['total'],
+            score_sq_sum=row['total_sq']
+        )
+        for row in rows
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0002_initial'),
+        ('evaluations', '0002_initial'),
+        ('submissions', '0012_submission_review_summary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewerStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('review_count', models.IntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0.0)),
+                ('score_sq_sum', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviewer_stats', to='companies.company')),
+                ('reviewer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviewer_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('company', 'reviewer')},
+            },
+        ),
+        migrations.RunPython(backfill_reviewer_stats, migrations.RunPython.noop),
+    ]
@@ -29,4 +29,30 @@ class EvaluationLog(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"Log for evaluation {self.evaluation.id} - {self.step}"
\ No newline at end of file
+        return f"Log for evaluation {self.evaluation.id} - {self.step}"
+
+class ReviewerStats(models.Model):
+    # Running sums of a reviewer's scores within one company, as fractions of each challenge's max_score
+    company = models.ForeignKey('companies.Company', on_delete=models.CASCADE, related_name='reviewer_stats')
+    reviewer = models.ForeignKey('users.CustomUser', on_delete=models.CASCADE, related_name='reviewer_stats')
+    review_count = models.IntegerField(default=0)
+    score_sum = models.FloatField(default=0.0)
+    score_sq_sum = models.FloatField(default=0.0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('company', 'reviewer')
+
+    def __str__(self):
+        return f"Review stats for {self.reviewer.email}"
+
+    @property
+    def mean(self):
+        return self.score_sum / self.review_count if self.review_count else None
+
+    @property
+    def std(self):
+        if self.review_count < 2:
+            return None
+        variance = (self.score_sq_sum - self.score_sum ** 2 / self.review_count) / (self.review_count - 1)
+        return max(variance, 0.0) ** 0.5
@@ -0,0 +1,331 @@
+import time
+from collections import defaultdict
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Sum
+from .models import ReviewerStats
+from challenges.models import Challenge
+from submissions.models import Submission, SubmissionReview
+from submissions.scoring import consensus_scores
+from users.models import CustomUser
+
+CONSENSUS_CACHE_TIMEOUT = getattr(settings, 'CONSENSUS_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+def _version_key(challenge_id):
+    return f"challenge-consensus-version:{challenge_id}"
+
+
+def challenge_cache_key(challenge):
+    # The version moves whenever the report is replaced, so a report still being built from
+    # rows read before a score change is stored under a key nobody reads any more.
+    version = cache.get_or_set(_version_key(challenge.id), time.time_ns, None)
+    return f"challenge-consensus:{challenge.id}:{version}"
+
+
+def company_cache_key(company_id):
+    return f"company-reviewer-stats:{company_id}"
+
+
+def invalidate(challenge_ids):
+    """Drop the cached reviewer report of the companies whose challenges' scores changed."""
+    company_ids = set(Challenge.objects.filter(id__in=challenge_ids).values_list('company_id', flat=True))
+    cache.delete_many([company_cache_key(company_id) for company_id in company_ids if company_id is not None])
+
+
+def record_reviews(reviews, sign=1):
+    """Add (or with sign=-1, remove) reviews from their reviewers' running ReviewerStats sums.
+
+    Scores are stored as a fraction of the challenge's max_score so reviewers can be compared
+    across challenges. Costs one lookup plus one UPDATE per (company, reviewer) pair.
+    """
+    reviews = [review for review in reviews if review.reviewer_id]
+    if not reviews:
+        return
+    challenges = {
+        submission_id: (company_id, max_score)
+        for submission_id, company_id, max_score in Submission.objects.filter(
+            id__in={review.submission_id for review in reviews}
+        ).values_list('id', 'challenge__company_id', 'challenge__max_score')
+    }
+    deltas = defaultdict(lambda: [0, 0.0, 0.0])
+    for review in reviews:
+        company_id, max_score = challenges.get(review.submission_id, (None, None))
+        if company_id is None or not max_score:
+            continue
+        x = review.score / max_score
+        delta = deltas[(company_id, review.reviewer_id)]
+        delta[0] += sign
+        delta[1] += sign * x
+        delta[2] += sign * x * x
+    if not deltas:
+        return
+    ReviewerStats.objects.bulk_create(
+        [ReviewerStats(company_id=company_id, reviewer_id=reviewer_id) for company_id, reviewer_id in deltas],
+        ignore_conflicts=True
+    )
+    for (company_id, reviewer_id), (n, total, total_sq) in deltas.items():
+        ReviewerStats.objects.filter(company_id=company_id, reviewer_id=reviewer_id).update(
+            review_count=F('review_count') + n,
+            score_sum=F('score_sum') + total,
+            score_sq_sum=F('score_sq_sum') + total_sq
+        )
+
+
+def _company_scale(company_id):
+    """Mean and standard deviation of all of a company's reviews, from the running sums."""
+    totals = ReviewerStats.objects.filter(company_id=company_id).aggregate(
+        n=Sum('review_count'), total=Sum('score_sum'), total_sq=Sum('score_sq_sum')
+    )
+    n = totals['n'] or 0
+    if n == 0:
+        return None, None
+    mean = totals['total'] / n
+    if n < 2:
+        return mean, None
+    variance = (totals['total_sq'] - totals['total'] ** 2 / n) / (n - 1)
+    return mean, variance ** 0.5 if variance > 0 else None
+
+
+def _group_mean(index, values, counts):
+    return np.bincount(index, weights=values, minlength=len(counts)) / counts
+
+
+def _reviewer_emails(reviewer_ids):
+    return dict(CustomUser.objects.filter(id__in=[r for r in reviewer_ids if r >= 0]).values_list('id', 'email'))
+
+
+def _score_submissions(challenge, submission_ids=None):
+    """Report entries for the reviewed submissions of `challenge` (or just `submission_ids`).
+
+    Returns the entries by submission id, each consensus as a fraction of max_score, and
+    each submission's reviews as (reviewer_id, fraction) pairs, which are kept with the
+    cached report so the reviewer section can be redone without reading every review again.
+    """
+    reviews = SubmissionReview.objects.filter(submission__challenge=challenge)
+    if submission_ids is not None:
+        reviews = reviews.filter(submission_id__in=submission_ids)
+    rows = list(reviews.order_by().values_list('submission_id', 'submission__user_id', 'reviewer_id', 'score'))
+    if not rows:
+        return {}, {}, {}
+
+    submission_ids = np.array([row[0] for row in rows])
+    user_ids = np.array([row[1] for row in rows])
+    reviewer_ids = np.array([row[2] if row[2] is not None else -1 for row in rows])
+    x = np.array([row[3] for row in rows], dtype=float) / challenge.max_score
+
+    submissions, sub_index, sub_counts = np.unique(submission_ids, return_inverse=True, return_counts=True)
+    sub_users = np.empty(len(submissions), dtype=user_ids.dtype)
+    sub_users[sub_index] = user_ids
+    consensus = consensus_scores(sub_index, x, challenge.consensus_method)
+    means = _group_mean(sub_index, x, sub_counts)
+    spread = np.sqrt(np.maximum(_group_mean(sub_index, x * x, sub_counts) - means ** 2, 0.0))
+
+    company_mean, company_std = _company_scale(challenge.company_id) if challenge.company_id else (None, None)
+    if company_std:
+        stats = {
+            stat.reviewer_id: (stat.mean, stat.std)
+            for stat in ReviewerStats.objects.filter(company_id=challenge.company_id, reviewer_id__in=set(reviewer_ids.tolist()))
+        }
+        reviewer_mean = np.array([(stats.get(r) or (company_mean, None))[0] for r in reviewer_ids.tolist()], dtype=float)
+        reviewer_std = np.array([(stats.get(r) or (None, None))[1] or company_std for r in reviewer_ids.tolist()], dtype=float)
+        z = (x - reviewer_mean) / reviewer_std
+        normalized = np.clip(company_mean + _group_mean(sub_index, z, sub_counts) * company_std, 0.0, 1.0)
+    else:
+        # Not enough history to know anyone's habits yet; fall back to the raw consensus.
+        normalized = consensus
+
+    scale = challenge.max_score
+    entries = {
+        int(submissions[i]): {
+            "submission_id": int(submissions[i]),
+            "user_id": int(sub_users[i]),
+            "review_count": int(sub_counts[i]),
+            "consensus_score": round(float(consensus[i]) * scale, 2),
+            "mean_score": round(float(means[i]) * scale, 2),
+            "score_spread": round(float(spread[i]) * scale, 2),
+            "normalized_score": round(float(normalized[i]) * scale, 2),
+        }
+        for i in range(len(submissions))
+    }
+    fractions = dict(zip(entries, consensus.tolist()))
+    by_submission = defaultdict(list)
+    for submission_id, reviewer_id, fraction in zip(submission_ids.tolist(), reviewer_ids.tolist(), x.tolist()):
+        by_submission[submission_id].append((reviewer_id, fraction))
+    return entries, fractions, dict(by_submission)
+
+
+def _reviewer_section(challenge, consensus, reviews):
+    """Each reviewer's mean, spread and bias (mean gap to the consensus) on this challenge."""
+    rows = [(reviewer_id, fraction, consensus[submission_id]) for submission_id, pairs in reviews.items() for reviewer_id, fraction in pairs]
+    if not rows:
+        return []
+    data = np.array(rows, dtype=float)
+    reviewers, rev_index, rev_counts = np.unique(data[:, 0].astype(np.int64), return_inverse=True, return_counts=True)
+    x = data[:, 1]
+    bias = _group_mean(rev_index, x - data[:, 2], rev_counts)
+    rev_means = _group_mean(rev_index, x, rev_counts)
+    rev_std = np.sqrt(np.maximum(_group_mean(rev_index, x * x, rev_counts) - rev_means ** 2, 0.0))
+
+    scale = challenge.max_score
+    emails = _reviewer_emails(reviewers.tolist())
+    return [
+        {
+            "reviewer_id": int(reviewers[i]) if reviewers[i] >= 0 else None,
+            "email": emails.get(int(reviewers[i])),
+            "review_count": int(rev_counts[i]),
+            "mean_score": round(float(rev_means[i]) * scale, 2),
+            "score_std": round(float(rev_std[i]) * scale, 2),
+            "bias": round(float(bias[i]) * scale, 2),
+        }
+        for i in range(len(reviewers))
+    ]
+
+
+def _challenge_state(challenge):
+    report = {
+        "challenge_id": challenge.id,
+        "consensus_method": challenge.consensus_method,
+        "max_score": challenge.max_score,
+        "submissions": [],
+        "reviewers": [],
+    }
+    state = {"report": report, "consensus": {}, "reviews": {}}
+    if not challenge.max_score:
+        return state
+    entries, state["consensus"], state["reviews"] = _score_submissions(challenge)
+    report["submissions"] = [entries[submission_id] for submission_id in sorted(entries)]
+    report["reviewers"] = _reviewer_section(challenge, state["consensus"], state["reviews"])
+    return state
+
+
+def build_challenge_report(challenge):
+    """Consensus and reviewer-normalised scores for every reviewed submission of `challenge`.
+
+    Each review is z-scored against its reviewer's company-wide mean and spread (from
+    ReviewerStats), the z-scores are averaged per submission and mapped back onto the
+    company's overall scale, so a harsh or lenient reviewer does not sink or lift the
+    submissions they happened to get. Reviewer bias is the mean gap between a reviewer's
+    score and the consensus on the same submissions.
+    """
+    return _challenge_state(challenge)["report"]
+
+
+def get_challenge_report(challenge):
+    key = challenge_cache_key(challenge)
+    state = cache.get(key)
+    if state is None:
+        state = _challenge_state(challenge)
+        cache.set(key, state, CONSENSUS_CACHE_TIMEOUT)
+    return state["report"]
+
+
+def update_challenge_reports(changes):
+    """Patch the cached challenge reports for the submissions in `changes` instead of rebuilding them.
+
+    Only the changed submissions' reviews are read again; their entries are replaced and the
+    reviewer section is redone from the reviews kept with the report. Entries of untouched
+    submissions keep the reviewer normalisation they were built with until the report
+    expires. When two updates of one challenge overlap, the report is dropped instead.
+    """
+    by_challenge = defaultdict(set)
+    for change in changes:
+        by_challenge[change.challenge_id].add(change.submission_id)
+    for challenge in Challenge.objects.filter(id__in=by_challenge):
+        version_key = _version_key(challenge.id)
+        version = cache.get(version_key)
+        lock_key = f"challenge-consensus-lock:{challenge.id}"
+        state = None
+        if version is not None and cache.add(lock_key, 1, 60):
+            try:
+                state = cache.get(f"challenge-consensus:{challenge.id}:{version}")
+                if state is not None and _still_current(challenge, state["report"]):
+                    _update_state(challenge, state, by_challenge[challenge.id])
+                else:
+                    state = None
+            finally:
+                cache.delete(lock_key)
+        new_version = time.time_ns()
+        if state is not None and cache.get(version_key) == version:
+            cache.set(f"challenge-consensus:{challenge.id}:{new_version}", state, CONSENSUS_CACHE_TIMEOUT)
+        cache.set(version_key, new_version, None)
+        if version is not None:
+            cache.delete(f"challenge-consensus:{challenge.id}:{version}")
+
+
+def _still_current(challenge, report):
+    # A new consensus method or max_score changes every entry, so those reports are rebuilt.
+    return bool(challenge.max_score) and (report["consensus_method"], report["max_score"]) == (challenge.consensus_method, challenge.max_score)
+
+
+def _update_state(challenge, state, submission_ids):
+    entries, consensus, reviews = _score_submissions(challenge, submission_ids)
+    for submission_id in submission_ids:
+        state["consensus"].pop(submission_id, None)
+        state["reviews"].pop(submission_id, None)
+    state["consensus"].update(consensus)
+    state["reviews"].update(reviews)
+    report = state["report"]
+    kept = [entry for entry in report["submissions"] if entry["submission_id"] not in submission_ids]
+    report["submissions"] = sorted(kept + list(entries.values()), key=lambda entry: entry["submission_id"])
+    report["reviewers"] = _reviewer_section(challenge, state["consensus"], state["reviews"])
+
+
+def build_company_report(company):
+    """Bias, spread and agreement of every reviewer across the company's whole review history.
+
+    Scores are compared as fractions of max_score against each submission's final_score,
+    with all per-reviewer statistics computed in one vectorized pass.
+    """
+    rows = list(
+        SubmissionReview.objects.filter(
+            submission__challenge__company=company, reviewer__isnull=False, submission__final_score__isnull=False
+        ).values_list('reviewer_id', 'score', 'submission__final_score', 'submission__challenge__max_score')
+    )
+    if not rows:
+        return {"company_id": company.id, "reviewers": []}
+
+    data = np.array(rows, dtype=float)
+    valid = data[:, 3] > 0
+    data = data[valid]
+    reviewer_ids = data[:, 0].astype(np.int64)
+    x = data[:, 1] / data[:, 3]
+    deviation = x - data[:, 2] / data[:, 3]
+
+    reviewers, index, counts = np.unique(reviewer_ids, return_inverse=True, return_counts=True)
+    means = _group_mean(index, x, counts)
+    variance = np.maximum(_group_mean(index, x * x, counts) - means ** 2, 0.0)
+    bias = _group_mean(index, deviation, counts)
+    mean_abs_deviation = _group_mean(index, np.abs(deviation), counts)
+
+    # Reviewer leniency relative to colleagues, as a z-score of each reviewer's mean.
+    spread = means.std()
+    leniency = (means - means.mean()) / spread if spread > 0 else np.zeros_like(means)
+
+    emails = _reviewer_emails(reviewers.tolist())
+    return {
+        "company_id": company.id,
+        "reviewers": [
+            {
+                "reviewer_id": int(reviewers[i]),
+                "email": emails.get(int(reviewers[i])),
+                "review_count": int(counts[i]),
+                "mean_pct": round(float(means[i]) * 100, 2),
+                "variance_pct": round(float(variance[i]) * 100 ** 2, 2),
+                "bias_pct": round(float(bias[i]) * 100, 2),
+                "mean_abs_deviation_pct": round(float(mean_abs_deviation[i]) * 100, 2),
+                "leniency_z": round(float(leniency[i]), 3),
+            }
+            for i in range(len(reviewers))
+        ],
+    }
+
+
+def get_company_report(company):
+    key = company_cache_key(company.id)
+    report = cache.get(key)
+    if report is None:
+        report = build_company_report(company)
+        cache.set(key, report, CONSENSUS_CACHE_TIMEOUT)
+    return report
@@ -0,0 +1,42 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from submissions.models import SubmissionReview
+from submissions.signals import submission_scored, reviews_created
+from .reviewer_stats import record_reviews, invalidate, update_challenge_reports
+
+
+def remember_review(sender, instance, **kwargs):
+    # The stored row before an edit, so record_review can take it out of the stats again.
+    instance._stats_before = None
+    if instance.pk:
+        instance._stats_before = SubmissionReview.objects.filter(pk=instance.pk).only('submission_id', 'reviewer_id', 'score').first()
+
+
+def record_review(sender, instance, created, **kwargs):
+    before = getattr(instance, '_stats_before', None)
+    if before is not None and (before.submission_id, before.reviewer_id, before.score) == (instance.submission_id, instance.reviewer_id, instance.score):
+        return
+    if before is not None:
+        record_reviews([before], sign=-1)
+    record_reviews([instance])
+
+
+def forget_review(sender, instance, **kwargs):
+    record_reviews([instance], sign=-1)
+
+
+def record_bulk_reviews(sender, reviews, **kwargs):
+    record_reviews(reviews)
+
+
+def invalidate_consensus(sender, changes, **kwargs):
+    invalidate({change.challenge_id for change in changes})
+    # After commit, so the cached reports never hold reviews that were rolled back.
+    transaction.on_commit(lambda: update_challenge_reports(changes))
+
+
+pre_save.connect(remember_review, sender=SubmissionReview, dispatch_uid='remember_reviewer_stats')
+post_save.connect(record_review, sender=SubmissionReview, dispatch_uid='record_reviewer_stats')
+post_delete.connect(forget_review, sender=SubmissionReview, dispatch_uid='forget_reviewer_stats')
+reviews_created.connect(record_bulk_reviews, dispatch_uid='record_bulk_reviewer_stats')
+submission_scored.connect(invalidate_consensus, dispatch_uid='invalidate_challenge_consensus')
@@ -1,3 +1,36 @@
-from django.shortcuts import render
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from challenges.models import Challenge
+from companies.models import CompanyUser
+from .reviewer_stats import get_challenge_report, get_company_report
 
-# Create your views here.
+class ChallengeConsensusView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, challenge_id):
+        """Consensus, normalised scores and reviewer bias for one challenge's submissions."""
+        if request.user.role != 'company_user':
+            return Response({"error": "Only company users can view consensus scores"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            company_user = CompanyUser.objects.get(user=request.user)
+            challenge = Challenge.objects.get(id=challenge_id, company=company_user.company)
+        except CompanyUser.DoesNotExist:
+            return Response({"error": "User is not associated with any company"}, status=status.HTTP_400_BAD_REQUEST)
+        except Challenge.DoesNotExist:
+            return Response({"error": "Challenge not found or not owned by your company"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(get_challenge_report(challenge), status=status.HTTP_200_OK)
+
+class CompanyReviewerStatsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Per-reviewer bias and variance across the company's review history."""
+        if request.user.role != 'company_user':
+            return Response({"error": "Only company users can view reviewer statistics"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            company_user = CompanyUser.objects.get(user=request.user)
+        except CompanyUser.DoesNotExist:
+            return Response({"error": "User is not associated with any company"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(get_company_report(company_user.company), status=status.HTTP_200_OK)
@@ -92,6 +92,7 @@ INSTALLED_APPS = [
     'payments',        # Manages subscription plans, subscriptions, and transactions (optional for MVP)
     'analytics',       # Manages challenge and user analytics
     'universities',    # Manages universities, their users, and student enrollments (optional)
+    'blobstore',       # Content-addressed, deduplicated storage for submission files and attachments
 ]
 
 MIDDLEWARE = [
@@ -184,6 +185,28 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')    # For collectstatic
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# S3-compatible object storage via django-storages. Setting AWS_STORAGE_BUCKET_NAME moves media to the
+# bucket and enables presigned direct uploads; AWS_S3_ENDPOINT_URL points at MinIO or another S3 stand-in.
+AWS_STORAGE_BUCKET_NAME = os.environ.get('AWS_STORAGE_BUCKET_NAME')
+AWS_S3_ENDPOINT_URL = os.environ.get('AWS_S3_ENDPOINT_URL')
+AWS_S3_REGION_NAME = os.environ.get('AWS_S3_REGION_NAME')
+AWS_ACCESS_KEY_ID = os.environ.get('AWS_ACCESS_KEY_ID')
+AWS_SECRET_ACCESS_KEY = os.environ.get('AWS_SECRET_ACCESS_KEY')
+AWS_S3_FILE_OVERWRITE = False
+if AWS_STORAGE_BUCKET_NAME:
+    STORAGES = {
+        'default': {'BACKEND': 'storages.backends.s3.S3Storage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    }
+PRESIGNED_UPLOAD_EXPIRES = 15 * 60  # seconds
+PRESIGNED_UPLOAD_MAX_SIZE = 2 * 1024 ** 3  # bytes
+
+# Hash uploads while they stream in so the blob store can deduplicate without re-reading them.
+FILE_UPLOAD_HANDLERS = [
+    'blobstore.uploadhandler.HashingMemoryFileUploadHandler',
+    'blobstore.uploadhandler.HashingTemporaryFileUploadHandler',
+]
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -202,3 +225,74 @@ REST_FRAMEWORK = {
         'rest_framework.authentication.SessionAuthentication',
     ],
 }
+
+# Submissions
+# Timed attempts: heartbeats are buffered per process and flushed in batches.
+ATTEMPT_HEARTBEAT_FLUSH_SIZE = 500
+ATTEMPT_HEARTBEAT_FLUSH_INTERVAL = 300  # seconds
+ATTEMPT_SUBMISSION_GRACE_SECONDS = 30
+
+# Deadline surge: queue submissions (202 + status URL) instead of applying them in the request.
+SUBMISSION_SURGE_MODE = False  # force surge mode for every challenge
+SUBMISSION_SURGE_WINDOW_MINUTES = 60  # automatically queue this close to a challenge's end_date
+SUBMISSION_INTAKE_WORKERS = 4
+
+# Resumable (tus-style) chunked uploads for submission files; partial files live outside MEDIA_ROOT.
+CHUNKED_UPLOAD_DIR = os.path.join(BASE_DIR, 'upload_chunks')
+CHUNKED_UPLOAD_MAX_SIZE = 2 * 1024 ** 3  # bytes
+CHUNKED_UPLOAD_HASH_CACHE_SIZE = 256  # running upload hashes kept in memory per process
+CHUNKED_UPLOAD_CLAIM_SECONDS = 15 * 60  # a chunk writer that has not committed by then is presumed dead
+
+# Review queue: submissions handed to a reviewer stay theirs for this long unless graded or released.
+REVIEW_LEASE_MINUTES = 30
+REVIEW_QUEUE_MAX_BATCH = 50
+
+# Consensus scoring: share of reviews dropped from each end for trimmed_mean challenges.
+CONSENSUS_TRIM_PROPORTION = 0.2
+CONSENSUS_CACHE_TIMEOUT = 60 * 60 * 24  # seconds; a challenge's report is patched in place when its scores change
+
+# Student dashboard: how many dashboards can run their sections concurrently (one pooled thread per section).
+DASHBOARD_WORKERS = 5
+
+# Analytics charts: buckets (day/week/month) are cut in this zone; longest allowed date range.
+ANALYTICS_TIME_ZONE = 'Africa/Nairobi'
+ANALYTICS_MAX_RANGE_DAYS = 366 * 5
+# A final score at or above this fraction of the challenge's max_score counts towards its pass rate.
+ANALYTICS_PASS_MARK = 0.5
+
+# Metric rollups (rollup_metrics command): hours re-read each run for late writes, and how long
+# hourly and daily rows are kept before being compacted into daily and monthly ones.
+ROLLUP_LATENESS_HOURS = 6
+ROLLUP_HOURLY_RETENTION_DAYS = 7
+ROLLUP_DAILY_RETENTION_DAYS = 400
+
+# Challenge funnel events are buffered per process; flushed after this many distinct buckets or seconds.
+FUNNEL_FLUSH_SIZE = 200
+FUNNEL_FLUSH_INTERVAL = 60
+
+# University cohort analytics (compute_cohort_stats command): "active" window and cache lifetime.
+COHORT_ACTIVE_DAYS = 90
+COHORT_CACHE_TIMEOUT = 60 * 60 * 24  # seconds; the batch job also clears the cache it recomputes
+
+# Company benchmarks (snapshot_benchmarks command): reports are cached per company and snapshot.
+BENCHMARK_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Reporting warehouse (refresh_warehouse command): DuckDB snapshot files that the heavy
+# report endpoints read instead of PostgreSQL; incremental runs re-read this many minutes back.
+ANALYTICS_WAREHOUSE_DIR = os.path.join(BASE_DIR, 'warehouse')
+ANALYTICS_WAREHOUSE_LATENESS_MINUTES = 15
+
+# Activity event log: events wait in a bounded per-process buffer (new ones are dropped when it
+# is full) and a background thread writes them after this many events or seconds.
+ACTIVITY_BUFFER_SIZE = 20000
+ACTIVITY_FLUSH_SIZE = 500
+ACTIVITY_FLUSH_INTERVAL = 5
+ACTIVITY_RETENTION_DAYS = 180  # prune_activity_events drops older days
+
+# Skill ratings (Elo scale, 1500 to start): K factors for established and provisional ratings,
+# the recalibrate_ratings prior, and the graded challenges a rating needs to appear in talent rankings.
+RATING_K = 24
+RATING_K_PROVISIONAL = 48
+RATING_PROVISIONAL_GAMES = 10
+RATING_PRIOR_WEIGHT = 1.0
+RATING_MIN_GAMES = 3
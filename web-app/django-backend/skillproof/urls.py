@@ -27,13 +27,14 @@ urlpatterns = [
     #path('api/submissions/', include('submissions.urls')),   # API for submissions (e.g., submit, list)
     #path('api/evaluations/', include('evaluations.urls')),   # API for evaluations (e.g., get scores, logs)
     path('api/badges/', include('badges.urls')),             # API for badges (e.g., list, award)
+    path('api/blobs/', include('blobstore.urls')),           # API for stored file content (e.g., already-uploaded checks)
     #path('api/portfolio/', include('portfolio.urls')),       # API for portfolios (e.g., view, update)
     #path('api/recruiters/', include('recruiters.urls')),     # API for recruiters (e.g., search, shortlist)
     #path('api/mentors/', include('mentors.urls')),           # API for mentors (e.g., assignments, sessions)
     #path('api/notifications/', include('notifications.urls')), # API for notifications (e.g., list, mark read)
     #path('api/payments/', include('payments.urls')),         # API for payments (e.g., subscriptions, transactions)
     #path('api/analytics/', include('analytics.urls')),       # API for analytics (e.g., get stats)
-    #path('api/universities/', include('universities.urls')), # API for universities (e.g., enrollments)
+    path('api/universities/', include('universities.urls')),  # API for universities (e.g., cohort analytics)
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
 # ✅ Serve static files (CSS, JS, admin files) in development
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Submission, SubmissionFile, SubmissionReview
+from .models import Submission, SubmissionFile, SubmissionReview, ChallengeAttempt, SubmissionIntake, SubmissionIntakeFile
 
 class SubmissionFileInline(admin.TabularInline):
     model = SubmissionFile
@@ -28,4 +28,23 @@ class SubmissionReviewAdmin(admin.ModelAdmin):
     list_display = ('submission', 'reviewer', 'score', 'reviewed_at')
     list_filter = ('reviewed_at', 'score')
     search_fields = ('submission__user__email', 'reviewer__email', 'submission__challenge__title')
-    readonly_fields = ('reviewed_at',)
\ No newline at end of file
+    readonly_fields = ('reviewed_at',)
+
+@admin.register(ChallengeAttempt)
+class ChallengeAttemptAdmin(admin.ModelAdmin):
+    list_display = ('user', 'challenge', 'started_at', 'expires_at', 'last_heartbeat_at', 'heartbeat_count')
+    list_filter = ('started_at', 'challenge')
+    search_fields = ('user__email', 'challenge__title')
+    readonly_fields = ('started_at',)
+
+class SubmissionIntakeFileInline(admin.TabularInline):
+    model = SubmissionIntakeFile
+    extra = 0
+
+@admin.register(SubmissionIntake)
+class SubmissionIntakeAdmin(admin.ModelAdmin):
+    list_display = ('user', 'challenge', 'status', 'created_at', 'processed_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('user__email', 'challenge__title')
+    inlines = [SubmissionIntakeFileInline]
+    readonly_fields = ('created_at', 'processed_at')
@@ -0,0 +1,121 @@
+import atexit
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from .models import ChallengeAttempt
+import logging
+logger = logging.getLogger(__name__)
+
+# Heartbeats are buffered per process and written with one bulk_update once either limit is hit.
+HEARTBEAT_FLUSH_SIZE = getattr(settings, 'ATTEMPT_HEARTBEAT_FLUSH_SIZE', 500)
+HEARTBEAT_FLUSH_INTERVAL = getattr(settings, 'ATTEMPT_HEARTBEAT_FLUSH_INTERVAL', 300)  # seconds
+# Allowance for network latency between the client clock running out and the upload arriving.
+SUBMISSION_GRACE_SECONDS = getattr(settings, 'ATTEMPT_SUBMISSION_GRACE_SECONDS', 30)
+ATTEMPT_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_time_limit_minutes(challenge):
+    """Return the enforced time limit for a challenge, or None if it is untimed.
+
+    `duration_minutes` wins; otherwise the per-task limits are summed.
+    """
+    if challenge.duration_minutes:
+        return challenge.duration_minutes
+    return challenge.tasks.aggregate(total=Sum('time_limit_minutes'))['total'] or None
+
+
+def _attempt_cache_key(user_id, challenge_id):
+    return f"challenge-attempt:{user_id}:{challenge_id}"
+
+
+def start_attempt(user, challenge, time_limit_minutes):
+    """Start (or return the already running) attempt for a user on a timed challenge."""
+    now = timezone.now()
+    expires_at = now + timedelta(minutes=time_limit_minutes)
+    if challenge.end_date and challenge.end_date < expires_at:
+        expires_at = challenge.end_date
+    attempt, created = ChallengeAttempt.objects.get_or_create(
+        user=user,
+        challenge=challenge,
+        defaults={'expires_at': expires_at}
+    )
+    cache.set(_attempt_cache_key(user.id, challenge.id), (attempt.id, attempt.expires_at), ATTEMPT_CACHE_TIMEOUT)
+    return attempt, created
+
+
+def get_cached_attempt(user_id, challenge_id):
+    """Return `(attempt_id, expires_at)` for a running attempt, hitting the database only on a cache miss."""
+    key = _attempt_cache_key(user_id, challenge_id)
+    cached = cache.get(key)
+    if cached is None:
+        cached = ChallengeAttempt.objects.filter(
+            user_id=user_id, challenge_id=challenge_id
+        ).values_list('id', 'expires_at').first()
+        if cached is None:
+            return None
+        cache.set(key, cached, ATTEMPT_CACHE_TIMEOUT)
+    return cached
+
+
+def check_submission_window(user, challenge):
+    """Return an error message if the user may not submit to a timed challenge right now, else None."""
+    if not get_time_limit_minutes(challenge):
+        return None
+    cached = get_cached_attempt(user.id, challenge.id)
+    if cached is None:
+        return "This challenge is timed: start an attempt before submitting"
+    _, expires_at = cached
+    if timezone.now() > expires_at + timedelta(seconds=SUBMISSION_GRACE_SECONDS):
+        return "Time limit for this challenge has expired"
+    return None
+
+
+class HeartbeatBuffer:
+    """Absorbs attempt heartbeats in memory and flushes them to the database in batches."""
+
+    def __init__(self, max_size=HEARTBEAT_FLUSH_SIZE, interval=HEARTBEAT_FLUSH_INTERVAL):
+        self.max_size = max_size
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._pending = {}  # attempt_id -> (last seen, beats since last flush)
+        self._last_flush = time.monotonic()
+
+    def record(self, attempt_id, seen_at=None):
+        seen_at = seen_at or timezone.now()
+        with self._lock:
+            _, beats = self._pending.get(attempt_id, (None, 0))
+            self._pending[attempt_id] = (seen_at, beats + 1)
+            due = len(self._pending) >= self.max_size or time.monotonic() - self._last_flush >= self.interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+
+        # Updates are expressed relative to the stored row so concurrent flushes from other
+        # workers never lose beats or move last_heartbeat_at backwards.
+        attempts = []
+        for attempt_id, (seen_at, beats) in pending.items():
+            attempt = ChallengeAttempt(id=attempt_id)
+            attempt.last_heartbeat_at = Greatest(Coalesce(F('last_heartbeat_at'), Value(seen_at)), Value(seen_at))
+            attempt.heartbeat_count = F('heartbeat_count') + beats
+            attempts.append(attempt)
+        try:
+            ChallengeAttempt.objects.bulk_update(attempts, ['last_heartbeat_at', 'heartbeat_count'], batch_size=500)
+        except Exception as e:
+            logger.error(f"Failed to flush {len(attempts)} attempt heartbeats: {str(e)}")
+            return 0
+        return len(attempts)
+
+
+heartbeat_buffer = HeartbeatBuffer()
+atexit.register(heartbeat_buffer.flush)
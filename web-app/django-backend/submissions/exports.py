@@ -0,0 +1,158 @@
+import csv
+import json
+import os
+import zipfile
+from collections import defaultdict
+from itertools import islice
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.text import get_valid_filename
+from django.db.models import OuterRef, Subquery
+from .models import Submission, SubmissionFile, SubmissionReview
+import logging
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_SIZE = 2000
+ZIP_READ_SIZE = 64 * 1024
+
+EXPORT_COLUMNS = [
+    'submission_id', 'user_id', 'email', 'first_name', 'last_name', 'status', 'submitted_at',
+    'repo_link', 'files', 'review_count', 'score', 'comments', 'reviewer_email', 'reviewed_at',
+]
+
+
+class Echo:
+    """File-like object whose write() hands the value back, so csv.writer can feed a generator."""
+
+    def write(self, value):
+        return value
+
+
+class ZipStreamBuffer:
+    """Unseekable sink for zipfile.ZipFile; the generator drains whatever was written after every write."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self._chunks = self._chunks, []
+        return b''.join(chunks)
+
+
+def export_queryset(challenge):
+    """One row per submission, with the latest review's comments joined in via correlated subqueries."""
+    latest_review = SubmissionReview.objects.filter(submission=OuterRef('pk')).order_by('-reviewed_at', '-id')
+    return Submission.objects.filter(challenge=challenge).order_by('id').annotate(
+        comments=Subquery(latest_review.values('comments')[:1]),
+        reviewer_email=Subquery(latest_review.values('reviewer__email')[:1]),
+        reviewed_at=Subquery(latest_review.values('reviewed_at')[:1]),
+    ).values_list(
+        'id', 'user_id', 'user__email', 'user__first_name', 'user__last_name', 'status', 'submitted_at',
+        'repo_link', 'review_count', 'final_score', 'comments', 'reviewer_email', 'reviewed_at',
+    )
+
+
+def iter_export_rows(challenge, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield export rows as dicts, reading through a server-side cursor.
+
+    File names are fetched with one query per chunk rather than per submission, so memory
+    is bounded by `chunk_size` however many submissions the challenge has.
+    """
+    storage = SubmissionFile._meta.get_field('file').storage
+    rows = export_queryset(challenge).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        files = defaultdict(list)
+        for submission_id, name in SubmissionFile.objects.filter(
+            submission_id__in=[row[0] for row in chunk]
+        ).order_by('id').values_list('submission_id', 'file'):
+            files[submission_id].append(storage.url(name))
+        for (submission_id, user_id, email, first_name, last_name, status, submitted_at,
+             repo_link, review_count, score, comments, reviewer_email, reviewed_at) in chunk:
+            yield {
+                'submission_id': submission_id,
+                'user_id': user_id,
+                'email': email,
+                'first_name': first_name,
+                'last_name': last_name,
+                'status': status,
+                'submitted_at': submitted_at,
+                'repo_link': repo_link,
+                'files': files[submission_id],
+                'review_count': review_count,
+                'score': score,
+                'comments': comments,
+                'reviewer_email': reviewer_email,
+                'reviewed_at': reviewed_at,
+            }
+
+
+def stream_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        row['files'] = ' '.join(row['files'])
+        row['submitted_at'] = row['submitted_at'].isoformat() if row['submitted_at'] else ''
+        row['reviewed_at'] = row['reviewed_at'].isoformat() if row['reviewed_at'] else ''
+        yield writer.writerow([row[column] for column in EXPORT_COLUMNS])
+
+
+def stream_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+def _archive_entries(challenge):
+    """Yield (folder, file name, storage name, size) for every submission file, participant by participant."""
+    files = SubmissionFile.objects.filter(submission__challenge=challenge).order_by('submission__user__email', 'id').values_list(
+        'submission__user_id', 'submission__user__email', 'original_name', 'file', 'blob__size',
+    )
+    for user_id, email, original_name, name, size in files.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        folder = get_valid_filename(email.replace('@', '_at_')) if email else f"user-{user_id}"
+        yield folder, get_valid_filename(original_name or os.path.basename(name)), name, size
+
+
+def stream_submissions_zip(challenge):
+    """Generate a ZIP of every submission file, one folder per participant, without buffering.
+
+    The archive is written to an unseekable buffer, so zipfile emits data descriptors instead
+    of seeking back, and each file is copied from storage ZIP_READ_SIZE bytes at a time.
+    Members are stored rather than deflated: submissions are mostly archives and images, and
+    compression would only cost CPU on the request thread.
+    """
+    storage = SubmissionFile._meta.get_field('file').storage
+    buffer = ZipStreamBuffer()
+    with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        seen = set()
+        for folder, filename, name, size in _archive_entries(challenge):
+            arcname = f"{folder}/{filename}"
+            stem, ext = os.path.splitext(filename)
+            n = 1
+            while arcname in seen:
+                arcname = f"{folder}/{stem}-{n}{ext}"
+                n += 1
+            seen.add(arcname)
+
+            try:
+                source = storage.open(name, 'rb')
+            except OSError:
+                logger.warning(f"Skipping missing submission file {name} in challenge {challenge.id} archive")
+                continue
+            if size is None:
+                size = source.size
+            info = zipfile.ZipInfo(arcname)
+            info.file_size = size  # lets zipfile decide up front whether the entry needs zip64
+            with source, archive.open(info, mode='w', force_zip64=size >= zipfile.ZIP64_LIMIT) as member:
+                for block in source.chunks(ZIP_READ_SIZE):
+                    member.write(block)
+                    yield buffer.drain()
+            yield buffer.drain()
+    yield buffer.drain()
@@ -0,0 +1,110 @@
+import csv
+import io
+import math
+from django.db import transaction
+from .models import Submission, SubmissionReview
+from .scoring import refresh_scores
+from .signals import reviews_created
+
+BULK_REVIEW_MAX_ROWS = 5000
+BULK_REVIEW_COLUMNS = ['submission_id', 'score', 'comments']
+
+
+class BulkReviewError(Exception):
+    def __init__(self, errors):
+        super().__init__("Bulk review rejected")
+        self.errors = errors
+
+
+def parse_review_csv(uploaded):
+    """Read rows from a CSV with a `submission_id,score,comments` header."""
+    text = io.TextIOWrapper(uploaded, encoding='utf-8-sig', newline='')
+    reader = csv.DictReader(text)
+    missing = [column for column in BULK_REVIEW_COLUMNS[:2] if column not in (reader.fieldnames or [])]
+    if missing:
+        raise BulkReviewError([{"row": 0, "error": f"CSV is missing column(s): {', '.join(missing)}"}])
+    return list(reader)
+
+
+def validate_reviews(rows, company, reviewer):
+    """Check every row against its submission's challenge in a single query.
+
+    Returns `(reviews, submissions)` where `reviews` are unsaved SubmissionReview objects.
+    Rejected submissions cannot be graded; a graded one takes the row as one more review,
+    as a single review would, and its final score is recomputed from all of them.
+    Raises BulkReviewError with one entry per bad row; nothing is written unless every row passes.
+    """
+    if not rows:
+        raise BulkReviewError([{"row": 0, "error": "No reviews supplied"}])
+    if len(rows) > BULK_REVIEW_MAX_ROWS:
+        raise BulkReviewError([{"row": 0, "error": f"At most {BULK_REVIEW_MAX_ROWS} reviews per request"}])
+
+    errors = []
+    parsed = []
+    for index, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append({"row": index, "error": "Each review must be an object"})
+            continue
+        try:
+            submission_id = int(row.get('submission_id'))
+        except (TypeError, ValueError):
+            errors.append({"row": index, "error": "submission_id must be an integer"})
+            continue
+        try:
+            score = float(row.get('score'))
+        except (TypeError, ValueError):
+            score = math.nan
+        if not math.isfinite(score):
+            errors.append({"row": index, "submission_id": submission_id, "error": "Score must be a number"})
+            continue
+        parsed.append((index, submission_id, score, (row.get('comments') or '').strip()))
+
+    submissions = Submission.objects.filter(
+        id__in={submission_id for _, submission_id, _, _ in parsed},
+        challenge__company=company
+    ).select_related('challenge').only(
+        'id', 'user_id', 'status', 'leased_by_id', 'lease_expires_at', 'challenge__id', 'challenge__max_score'
+    ).in_bulk()
+
+    reviews = []
+    seen = set()
+    for index, submission_id, score, comments in parsed:
+        submission = submissions.get(submission_id)
+        if submission is None:
+            errors.append({"row": index, "submission_id": submission_id, "error": "Submission not found or not owned by your company"})
+        elif submission.status == 'rejected':
+            errors.append({"row": index, "submission_id": submission_id, "error": "Submission was rejected and cannot be graded"})
+        elif submission.is_leased_by_other(reviewer):
+            errors.append({"row": index, "submission_id": submission_id, "error": "Submission is leased to another reviewer"})
+        elif submission_id in seen:
+            errors.append({"row": index, "submission_id": submission_id, "error": "Submission appears more than once"})
+        elif score < 0 or score > submission.challenge.max_score:
+            errors.append({"row": index, "submission_id": submission_id, "error": f"Score must be between 0 and {submission.challenge.max_score}"})
+        elif not comments:
+            errors.append({"row": index, "submission_id": submission_id, "error": "Comments are required"})
+        else:
+            seen.add(submission_id)
+            reviews.append(SubmissionReview(submission=submission, score=score, comments=comments))
+
+    if errors:
+        raise BulkReviewError(errors)
+    return reviews, submissions
+
+
+def apply_reviews(reviews, submissions, reviewer):
+    """Insert validated reviews, mark their submissions graded and refresh their scores in one batch.
+
+    bulk_create skips the per-review post_save signal, so scores are refreshed here once
+    for all submissions; the resulting `submission_scored` signal evaluates badges once
+    per affected user.
+    """
+    for review in reviews:
+        review.reviewer = reviewer
+    with transaction.atomic():
+        created = SubmissionReview.objects.bulk_create(reviews, batch_size=500)
+        Submission.objects.filter(id__in=[review.submission_id for review in reviews]).update(
+            status='graded', leased_by=None, lease_expires_at=None
+        )
+        reviews_created.send(sender=SubmissionReview, reviews=created)
+        refresh_scores([review.submission_id for review in reviews])
+    return created
@@ -0,0 +1,111 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+from .models import Submission, SubmissionFile, SubmissionIntake
+from blobstore.models import Blob
+import logging
+logger = logging.getLogger(__name__)
+
+SUBMISSION_SURGE_MODE = getattr(settings, 'SUBMISSION_SURGE_MODE', False)
+SUBMISSION_SURGE_WINDOW_MINUTES = getattr(settings, 'SUBMISSION_SURGE_WINDOW_MINUTES', 60)
+SUBMISSION_INTAKE_WORKERS = getattr(settings, 'SUBMISSION_INTAKE_WORKERS', 4)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class SubmissionClosedError(Exception):
+    """Raised when the user's existing submission has already been graded or rejected."""
+
+
+def in_surge(challenge):
+    """Whether submissions for this challenge should be queued instead of applied in the request."""
+    if SUBMISSION_SURGE_MODE:
+        return True
+    if not challenge.end_date:
+        return False
+    return challenge.end_date - timezone.now() <= timedelta(minutes=SUBMISSION_SURGE_WINDOW_MINUTES)
+
+
+def upsert_submission(user, challenge, repo_link, files):
+    """Create the user's submission for a challenge or replace their pending one, atomically.
+
+    `files` may hold uploaded files or Blobs already in the blob store. The unique
+    (user, challenge) constraint makes concurrent calls converge on a single row.
+    """
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                submission, created = Submission.objects.select_for_update().get_or_create(
+                    user=user,
+                    challenge=challenge,
+                    defaults={'repo_link': repo_link}
+                )
+        except IntegrityError:
+            # Lost the insert race to a concurrent submit; lock and replace the winner's row.
+            submission, created = Submission.objects.select_for_update().get(user=user, challenge=challenge), False
+
+        if not created:
+            if submission.status in ['graded', 'rejected']:
+                raise SubmissionClosedError("Cannot submit: Previous submission has been graded or rejected")
+            submission.repo_link = repo_link
+            submission.submitted_at = timezone.now()
+            submission.save(update_fields=['repo_link', 'submitted_at'])
+            submission.files.all().delete()
+
+        for f in files:
+            if isinstance(f, Blob):
+                SubmissionFile.objects.create(submission=submission, file=f.file.name, blob=f)
+            else:
+                SubmissionFile.objects.create(submission=submission, file=f)
+    return submission
+
+
+def process_intake(intake_id):
+    """Apply a queued intake. Safe to call from several workers: only one claims the row."""
+    claimed = SubmissionIntake.objects.filter(id=intake_id, status='queued').update(status='processing', claimed_at=timezone.now())
+    if not claimed:
+        return None
+
+    intake = SubmissionIntake.objects.select_related('user', 'challenge').get(id=intake_id)
+    try:
+        intake_files = list(intake.files.select_related('blob'))
+        submission = upsert_submission(intake.user, intake.challenge, intake.repo_link, [f.blob for f in intake_files])
+        # The submission now holds its own blob references; drop the intake's.
+        intake.files.all().delete()
+        intake.submission = submission
+        intake.status = 'completed'
+    except SubmissionClosedError as e:
+        intake.status = 'failed'
+        intake.error = str(e)
+    except Exception as e:
+        logger.error(f"Failed to process submission intake {intake_id}: {str(e)}")
+        intake.status = 'failed'
+        intake.error = "Submission could not be processed"
+    intake.processed_at = timezone.now()
+    intake.save(update_fields=['submission', 'status', 'error', 'processed_at'])
+    return intake
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=SUBMISSION_INTAKE_WORKERS, thread_name_prefix='submission-intake')
+    return _executor
+
+
+def _run_intake(intake_id):
+    close_old_connections()
+    try:
+        process_intake(intake_id)
+    finally:
+        close_old_connections()
+
+
+def enqueue_intake(intake):
+    """Hand an intake to the worker pool once the transaction that created it commits."""
+    transaction.on_commit(lambda: _get_executor().submit(_run_intake, intake.id))
@@ -0,0 +1,33 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+from submissions.models import SubmissionIntake
+from submissions.intake import process_intake
+
+class Command(BaseCommand):
+    help = 'Applies queued surge-mode submissions, e.g. those left behind by a restarted worker'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stale-minutes', type=int, default=15,
+                            help='Requeue intakes claimed for processing longer ago than this')
+
+    def handle(self, *args, **options):
+        stale_before = timezone.now() - timedelta(minutes=options['stale_minutes'])
+        # Keyed on the claim, not creation: in a backlog an old intake may have been claimed just now.
+        requeued = SubmissionIntake.objects.filter(
+            Q(claimed_at__lt=stale_before) | Q(claimed_at__isnull=True, created_at__lt=stale_before),
+            status='processing'
+        ).update(status='queued')
+
+        processed = failed = 0
+        for intake_id in SubmissionIntake.objects.filter(status='queued').order_by('created_at').values_list('id', flat=True).iterator():
+            intake = process_intake(intake_id)
+            if intake is None:
+                continue  # claimed by another worker
+            if intake.status == 'completed':
+                processed += 1
+            else:
+                failed += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Requeued {requeued} stale intakes, processed {processed}, failed {failed}'))
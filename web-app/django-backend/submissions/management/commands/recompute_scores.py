@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from submissions.models import Submission
+from submissions.scoring import refresh_scores
+
+class Command(BaseCommand):
+    help = "Recomputes submissions' consensus scores, e.g. after a challenge's consensus_method changes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--challenge', type=int, action='append', dest='challenges',
+                            help='Only this challenge (repeatable); default is every reviewed submission')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        submissions = Submission.objects.filter(review_count__gt=0)
+        if options['challenges']:
+            submissions = submissions.filter(challenge_id__in=options['challenges'])
+
+        batch = []
+        refreshed = changed = 0
+        for submission_id in submissions.order_by('id').values_list('id', flat=True).iterator(chunk_size=options['batch_size']):
+            batch.append(submission_id)
+            if len(batch) >= options['batch_size']:
+                changes = refresh_scores(batch)
+                refreshed, changed = refreshed + len(changes), changed + sum(c.old_score != c.new_score for c in changes)
+                batch = []
+        if batch:
+            changes = refresh_scores(batch)
+            refreshed, changed = refreshed + len(changes), changed + sum(c.old_score != c.new_score for c in changes)
+
+        self.stdout.write(self.style.SUCCESS(f'Refreshed {refreshed} submissions, {changed} final scores changed'))
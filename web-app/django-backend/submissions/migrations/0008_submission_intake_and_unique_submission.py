@@ -0,0 +1,91 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:17
+
+import logging
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+logger = logging.getLogger(__name__)
+
+
+def remove_duplicate_submissions(apps, schema_editor):
+    # One submission per (user, challenge) so the unique constraint can be added. Keep a graded
+    # one over an ungraded one, then one with reviews, then the most recent; the reviews of the
+    # others move onto it so no grading work is lost.
+    Submission = apps.get_model('submissions', 'Submission')
+    SubmissionReview = apps.get_model('submissions', 'SubmissionReview')
+    duplicates = Submission.objects.values('user_id', 'challenge_id').annotate(n=models.Count('id')).filter(n__gt=1)
+    for row in duplicates.iterator():
+        candidates = list(
+            Submission.objects.filter(user_id=row['user_id'], challenge_id=row['challenge_id'])
+            .annotate(review_total=models.Count('reviews')).values_list('id', 'status', 'review_total')
+        )
+        keep = max(candidates, key=lambda c: (c[1] == 'graded', c[2] > 0, c[0]))[0]
+        dropped = [c for c in candidates if c[0] != keep]
+        dropped_ids = [c[0] for c in dropped]
+        SubmissionReview.objects.filter(submission_id__in=dropped_ids).update(submission_id=keep)
+        Submission.objects.filter(id__in=dropped_ids).delete()
+        logger.warning(
+            f"Removed duplicate submissions of user {row['user_id']} for challenge {row['challenge_id']}: "
+            + ", ".join(f"{submission_id} ({status}, {reviews} reviews)" for submission_id, status, reviews in dropped)
+            + f"; kept {keep}" + (", which now holds their reviews" if any(c[2] for c in dropped) else "")
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0006_alter_challenge_challenge_type_and_more'),
+        ('submissions', '0007_challengeattempt'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionIntake',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('repo_link', models.URLField(blank=True)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed')], db_index=True, default='queued', max_length=20)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SubmissionIntakeFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(upload_to='submission_files/')),
+            ],
+        ),
+        migrations.RunPython(remove_duplicate_submissions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='submission',
+            constraint=models.UniqueConstraint(fields=('user', 'challenge'), name='unique_submission_per_user_challenge'),
+        ),
+        migrations.AddField(
+            model_name='submissionintake',
+            name='challenge',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='challenges.challenge'),
+        ),
+        migrations.AddField(
+            model_name='submissionintake',
+            name='submission',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='submissions.submission'),
+        ),
+        migrations.AddField(
+            model_name='submissionintake',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submission_intakes', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='submissionintakefile',
+            name='intake',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='files', to='submissions.submissionintake'),
+        ),
+        migrations.AddIndex(
+            model_name='submissionintake',
+            index=models.Index(fields=['status', 'created_at'], name='submissions_status_88f278_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blobstore', '0001_initial'),
+        ('submissions', '0009_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submissionfile',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='submission_files', to='blobstore.blob'),
+        ),
+        migrations.AddField(
+            model_name='submissionfile',
+            name='original_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='submissionintakefile',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='intake_files', to='blobstore.blob'),
+        ),
+        migrations.AddField(
+            model_name='submissionintakefile',
+            name='original_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='submissionfile',
+            name='file',
+            field=models.FileField(max_length=255, upload_to='submission_files/'),
+        ),
+        migrations.AlterField(
+            model_name='submissionintakefile',
+            name='file',
+            field=models.FileField(max_length=255, upload_to='submission_files/'),
+        ),
+    ]
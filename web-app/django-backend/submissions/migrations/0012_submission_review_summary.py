@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:30
+
+from django.db import migrations, models
+from django.db.models import Count, Exists, OuterRef, Subquery
+
+
+def backfill_review_summary(apps, schema_editor):
+    # final_score is the latest review's score, matching submissions.scoring.final_score.
+    Submission = apps.get_model('submissions', 'Submission')
+    SubmissionReview = apps.get_model('submissions', 'SubmissionReview')
+    latest = SubmissionReview.objects.filter(submission=OuterRef('pk')).order_by('-reviewed_at', '-id')
+    counts = SubmissionReview.objects.filter(submission=OuterRef('pk')).order_by().values('submission').annotate(n=Count('id')).values('n')
+    Submission.objects.filter(Exists(SubmissionReview.objects.filter(submission=OuterRef('pk')))).update(
+        final_score=Subquery(latest.values('score')[:1]),
+        review_count=Subquery(counts),
+        last_reviewed_at=Subquery(latest.values('reviewed_at')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submissions', '0011_submission_review_lease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submission',
+            name='final_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='last_reviewed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_review_summary, migrations.RunPython.noop),
+    ]
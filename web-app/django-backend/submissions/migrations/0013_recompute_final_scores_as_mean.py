@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-19 18:05
+
+from django.db import migrations
+from django.db.models import Avg, Exists, OuterRef, Subquery
+
+
+def recompute_final_scores(apps, schema_editor):
+    # Every challenge starts on the 'mean' consensus method, so final_score becomes the mean
+    # of the reviews instead of the latest one. analytics/0015 rebuilds what was derived from
+    # the old scores.
+    Submission = apps.get_model('submissions', 'Submission')
+    SubmissionReview = apps.get_model('submissions', 'SubmissionReview')
+    mean = SubmissionReview.objects.filter(submission=OuterRef('pk')).order_by().values('submission').annotate(score=Avg('score')).values('score')
+    Submission.objects.filter(Exists(SubmissionReview.objects.filter(submission=OuterRef('pk')))).update(
+        final_score=Subquery(mean)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submissions', '0012_submission_review_summary'),
+        ('challenges', '0008_challenge_consensus_method'),
+    ]
+
+    operations = [
+        migrations.RunPython(recompute_final_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 18:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submissions', '0013_recompute_final_scores_as_mean'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submissionintake',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,6 +1,9 @@
+import uuid
 from django.db import models
+from django.utils import timezone
 from users.models import CustomUser
 from challenges.models import Challenge
+from blobstore.utils import attach_blob
 
 class Submission(models.Model):
     STATUS_CHOICES = (
@@ -13,23 +16,47 @@ class Submission(models.Model):
     repo_link = models.URLField(blank=True)
     submitted_at = models.DateTimeField(auto_now_add=True, db_index=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', db_index=True)
+    leased_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='review_leases')
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    # Review summary, maintained by submissions.scoring whenever reviews change
+    final_score = models.FloatField(null=True, blank=True)
+    review_count = models.PositiveIntegerField(default=0)
+    last_reviewed_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return f"Submission by {self.user.email} for {self.challenge.title}"
 
+    def is_leased_by_other(self, reviewer):
+        return (
+            self.leased_by_id is not None
+            and self.leased_by_id != reviewer.id
+            and self.lease_expires_at is not None
+            and self.lease_expires_at > timezone.now()
+        )
+
     class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'challenge'], name='unique_submission_per_user_challenge'),
+        ]
         indexes = [
             models.Index(fields=['user', 'challenge']),
             models.Index(fields=['status', 'submitted_at']),
+            models.Index(fields=['status', 'lease_expires_at']),
         ]
 
 class SubmissionFile(models.Model):
     submission = models.ForeignKey(Submission, on_delete=models.CASCADE, related_name='files', db_index=True)
-    file = models.FileField(upload_to='submission_files/')
+    file = models.FileField(upload_to='submission_files/', max_length=255)
+    blob = models.ForeignKey('blobstore.Blob', on_delete=models.PROTECT, null=True, blank=True, related_name='submission_files')
+    original_name = models.CharField(max_length=255, blank=True)
 
     def __str__(self):
         return f"File for submission {self.submission.id}"
 
+    def save(self, *args, **kwargs):
+        attach_blob(self)  # store content once per sha256
+        super().save(*args, **kwargs)
+
     class Meta:
         indexes = [
             models.Index(fields=['submission']),
@@ -49,4 +76,90 @@ class SubmissionReview(models.Model):
         indexes = [
             models.Index(fields=['submission', 'reviewer']),
             models.Index(fields=['reviewed_at']),
-        ]
\ No newline at end of file
+        ]
+
+class ChallengeAttempt(models.Model):
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='challenge_attempts', db_index=True)
+    challenge = models.ForeignKey(Challenge, on_delete=models.CASCADE, related_name='attempts', db_index=True)
+    started_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+    last_heartbeat_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"Attempt by {self.user.email} on {self.challenge.title}"
+
+    @property
+    def is_expired(self):
+        return timezone.now() > self.expires_at
+
+    class Meta:
+        unique_together = ('user', 'challenge')
+        indexes = [
+            models.Index(fields=['challenge', 'expires_at']),
+        ]
+
+class SubmissionIntake(models.Model):
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('processing', 'Processing'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    )
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='submission_intakes', db_index=True)
+    challenge = models.ForeignKey(Challenge, on_delete=models.CASCADE, db_index=True)
+    repo_link = models.URLField(blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued', db_index=True)
+    error = models.TextField(blank=True)
+    submission = models.ForeignKey(Submission, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)  # when a worker took it for processing
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Intake {self.id} by {self.user.email} for {self.challenge.title} ({self.status})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+class SubmissionIntakeFile(models.Model):
+    intake = models.ForeignKey(SubmissionIntake, on_delete=models.CASCADE, related_name='files', db_index=True)
+    file = models.FileField(upload_to='submission_files/', max_length=255)
+    blob = models.ForeignKey('blobstore.Blob', on_delete=models.PROTECT, null=True, blank=True, related_name='intake_files')
+    original_name = models.CharField(max_length=255, blank=True)
+
+    def __str__(self):
+        return f"File for intake {self.intake.id}"
+
+    def save(self, *args, **kwargs):
+        attach_blob(self)
+        super().save(*args, **kwargs)
+
+class ChunkedUpload(models.Model):
+    STATUS_CHOICES = (
+        ('uploading', 'Uploading'),
+        ('complete', 'Complete'),
+        ('failed', 'Failed'),
+    )
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='chunked_uploads', db_index=True)
+    submission = models.ForeignKey(Submission, on_delete=models.CASCADE, related_name='chunked_uploads', db_index=True)
+    filename = models.CharField(max_length=255)
+    total_size = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)
+    checksum = models.CharField(max_length=64, blank=True)  # expected sha256 hex digest of the whole file
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading', db_index=True)
+    submission_file = models.ForeignKey(SubmissionFile, on_delete=models.SET_NULL, null=True, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)  # set while a request is writing a chunk
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"Upload {self.filename} for submission {self.submission_id} ({self.offset}/{self.total_size})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
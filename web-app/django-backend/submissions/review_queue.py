@@ -0,0 +1,50 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import Submission
+
+REVIEW_LEASE_MINUTES = getattr(settings, 'REVIEW_LEASE_MINUTES', 30)
+REVIEW_QUEUE_MAX_BATCH = getattr(settings, 'REVIEW_QUEUE_MAX_BATCH', 50)
+
+
+def available_for(reviewer, company, now=None):
+    """Pending submissions of `company` that are unleased, lease-expired, or already leased to `reviewer`."""
+    now = now or timezone.now()
+    return Submission.objects.filter(challenge__company=company, status='pending').filter(
+        Q(leased_by__isnull=True) | Q(lease_expires_at__lte=now) | Q(leased_by=reviewer)
+    )
+
+
+def claim_submissions(reviewer, company, batch_size, challenge_id=None):
+    """Lease up to `batch_size` pending submissions to `reviewer` and return their ids.
+
+    Rows are picked most urgent first (earliest challenge deadline, then oldest submission)
+    with FOR UPDATE SKIP LOCKED, so reviewers claiming at the same moment each get a
+    disjoint batch without waiting on one another. Claiming again renews the reviewer's
+    own unexpired leases. Expired leases need no cleanup: they simply become claimable.
+    """
+    now = timezone.now()
+    candidates = available_for(reviewer, company, now)
+    if challenge_id is not None:
+        candidates = candidates.filter(challenge_id=challenge_id)
+    with transaction.atomic():
+        ids = list(
+            candidates.select_for_update(skip_locked=True, of=('self',))
+            .order_by(F('challenge__end_date').asc(nulls_last=True), 'submitted_at', 'id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        Submission.objects.filter(id__in=ids).update(
+            leased_by=reviewer,
+            lease_expires_at=now + timedelta(minutes=REVIEW_LEASE_MINUTES)
+        )
+    return ids
+
+
+def release_submissions(reviewer, submission_ids=None):
+    """Hand `reviewer`'s leases (all of them, or just `submission_ids`) back to the queue."""
+    leases = Submission.objects.filter(leased_by=reviewer)
+    if submission_ids is not None:
+        leases = leases.filter(id__in=submission_ids)
+    return leases.update(leased_by=None, lease_expires_at=None)
@@ -0,0 +1,103 @@
+from collections import defaultdict, namedtuple
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from .models import Submission, SubmissionReview
+from .signals import submission_scored
+from challenges.models import Challenge
+from analytics.maintenance import record_score_changes
+
+CONSENSUS_TRIM_PROPORTION = getattr(settings, 'CONSENSUS_TRIM_PROPORTION', 0.2)
+
+ScoreChange = namedtuple('ScoreChange', 'submission_id user_id challenge_id old_score new_score')
+
+
+def consensus_score(scores, method='mean'):
+    """Combine one submission's review scores into its final score (None when unreviewed).
+
+    trimmed_mean drops CONSENSUS_TRIM_PROPORTION of the scores from each end, and at least
+    the single highest and lowest once there are three or more reviews.
+    """
+    if len(scores) == 0:
+        return None
+    scores = np.sort(np.asarray(scores, dtype=float))
+    if method == 'median':
+        return float(np.median(scores))
+    if method == 'trimmed_mean' and len(scores) >= 3:
+        k = max(1, int(len(scores) * CONSENSUS_TRIM_PROPORTION))
+        scores = scores[k:len(scores) - k]
+    return float(scores.mean())
+
+
+def consensus_scores(index, scores, method='mean'):
+    """consensus_score for many submissions at once, with NumPy group operations.
+
+    `index` numbers each score's submission 0..n-1 (as np.unique's return_inverse does),
+    and every submission has at least one score. Returns one consensus per submission.
+    """
+    scores = np.asarray(scores, dtype=float)
+    order = np.lexsort((scores, index))  # grouped by submission, ascending within each
+    scores = scores[order]
+    counts = np.bincount(index)
+    starts = np.cumsum(counts) - counts
+    if method == 'median':
+        return (scores[starts + (counts - 1) // 2] + scores[starts + counts // 2]) / 2
+    trim = np.zeros_like(counts)
+    if method == 'trimmed_mean':
+        trim = np.where(counts >= 3, np.maximum(1, (counts * CONSENSUS_TRIM_PROPORTION).astype(int)), 0)
+    totals = np.concatenate(([0.0], np.cumsum(scores)))
+    return (totals[starts + counts - trim] - totals[starts + trim]) / (counts - 2 * trim)
+
+
+def refresh_scores(submission_ids):
+    """Recompute final_score, review_count and last_reviewed_at for `submission_ids`.
+
+    Call this in the same transaction as the review write. The submission rows are locked
+    first, so concurrent reviews of one submission are applied one after another, and
+    the user and challenge analytics move by the change in final score instead of being
+    re-aggregated. Sends `submission_scored` with the changes. Returns them too.
+    """
+    submission_ids = sorted(set(submission_ids))
+    if not submission_ids:
+        return []
+    with transaction.atomic():
+        locked = list(
+            Submission.objects.select_for_update().filter(id__in=submission_ids).order_by('id')
+            .values_list('id', 'user_id', 'challenge_id', 'final_score')
+        )
+        methods = dict(Challenge.objects.filter(id__in={row[2] for row in locked}).values_list('id', 'consensus_method'))
+        reviews = defaultdict(list)
+        last_reviewed = {}
+        for submission_id, score, reviewed_at in SubmissionReview.objects.filter(
+            submission_id__in=submission_ids
+        ).order_by('reviewed_at', 'id').values_list('submission_id', 'score', 'reviewed_at'):
+            reviews[submission_id].append(score)
+            last_reviewed[submission_id] = reviewed_at
+
+        updated = []
+        changes = []
+        for submission_id, user_id, challenge_id, old_score in locked:
+            scores = reviews.get(submission_id, [])
+            new_score = consensus_score(scores, methods.get(challenge_id, 'mean'))
+            updated.append(Submission(
+                id=submission_id,
+                final_score=new_score,
+                review_count=len(scores),
+                last_reviewed_at=last_reviewed.get(submission_id)
+            ))
+            changes.append(ScoreChange(submission_id, user_id, challenge_id, old_score, new_score))
+        Submission.objects.bulk_update(updated, ['final_score', 'review_count', 'last_reviewed_at'], batch_size=500)
+
+        record_score_changes(changes)
+
+        submission_scored.send(sender=Submission, changes=changes)
+    return changes
+
+
+def refresh_review_submission(sender, instance, **kwargs):
+    refresh_scores([instance.submission_id])
+
+
+post_save.connect(refresh_review_submission, sender=SubmissionReview, dispatch_uid='refresh_review_submission_on_save')
+post_delete.connect(refresh_review_submission, sender=SubmissionReview, dispatch_uid='refresh_review_submission_on_delete')
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Submission, SubmissionFile, SubmissionReview
+from .intake import upsert_submission
 from challenges.serializers import ChallengeSerializer, StudentChallengeSerializer
 from users.models import CustomUser
 import logging
@@ -10,7 +11,7 @@ logger = logging.getLogger(__name__)
 class SubmissionFileSerializer(serializers.ModelSerializer):
     class Meta:
         model = SubmissionFile
-        fields = ['id', 'file', 'submission']
+        fields = ['id', 'file', 'original_name', 'submission']
 
 class SubmissionReviewSerializer(serializers.ModelSerializer):
     reviewer = serializers.PrimaryKeyRelatedField(read_only=True)
@@ -49,11 +50,9 @@ class SubmissionSerializer(serializers.ModelSerializer):
         return data
 
     def create(self, validated_data):
-        files_data = self.context['request'].FILES.getlist('files', [])
-        submission = Submission.objects.create(**validated_data)
-        for file_data in files_data:
-            SubmissionFile.objects.create(submission=submission, file=file_data)
-        return submission
+        # save(user=..., challenge=...) goes through the same upsert as the submit view.
+        files = self.context['request'].FILES.getlist('files', [])
+        return upsert_submission(validated_data['user'], validated_data['challenge'], validated_data['repo_link'], files)
 
 class StudentSubmissionSerializer(serializers.ModelSerializer):
     challenge = StudentChallengeSerializer(read_only=True)
@@ -67,8 +66,7 @@ class StudentSubmissionSerializer(serializers.ModelSerializer):
         fields = ['id', 'challenge', 'challenge_title', 'repo_link', 'submitted_at', 'status', 'files', 'reviews', 'score']
 
     def get_score(self, obj):
-        review = obj.reviews.first()
-        return review.score if review else None
+        return obj.final_score
 
 class ParticipantSerializer(serializers.ModelSerializer):
     class Meta:
@@ -78,14 +76,22 @@ class ParticipantSerializer(serializers.ModelSerializer):
 class StudentChallengeResultsSerializer(serializers.ModelSerializer):
     challenge_title = serializers.CharField(source='challenge.title', read_only=True)
     score = serializers.SerializerMethodField()
+    better_than_pct = serializers.SerializerMethodField()
 
     class Meta:
         model = Submission
-        fields = ['challenge_title', 'score']
+        fields = ['challenge_title', 'score', 'better_than_pct']
 
     def get_score(self, obj):
-        review = obj.reviews.first()
-        return review.score if review else None
+        return obj.final_score
+
+    def get_better_than_pct(self, obj):
+        # Share of the challenge's scored submissions below this one, from the challenge's score sketch
+        digest = self.context.get('score_sketches', {}).get(obj.challenge_id)
+        if digest is None or obj.final_score is None or not obj.challenge.max_score:
+            return None
+        below = digest.cdf(100 * obj.final_score / obj.challenge.max_score)
+        return round(below * 100, 1) if below is not None else None
 
 class StudentPendingAndRejectedSerializer(serializers.ModelSerializer):
     challenge_title = serializers.CharField(source='challenge.title', read_only=True)
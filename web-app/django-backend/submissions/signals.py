@@ -0,0 +1,8 @@
+from django.dispatch import Signal
+
+# Sent inside the scoring transaction after final scores change.
+# `changes` is a list of ScoreChange(submission_id, user_id, challenge_id, old_score, new_score).
+submission_scored = Signal()
+
+# Sent after reviews are inserted without per-row post_save (bulk grading). `reviews` are the new rows.
+reviews_created = Signal()
@@ -0,0 +1,178 @@
+import base64
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Q
+from django.utils import timezone
+from .models import ChunkedUpload, SubmissionFile
+import logging
+logger = logging.getLogger(__name__)
+
+CHUNKED_UPLOAD_DIR = getattr(settings, 'CHUNKED_UPLOAD_DIR', os.path.join(settings.BASE_DIR, 'upload_chunks'))
+CHUNKED_UPLOAD_MAX_SIZE = getattr(settings, 'CHUNKED_UPLOAD_MAX_SIZE', 2 * 1024 ** 3)
+# Running hashes kept per process; uploads beyond this are rebuilt from their partial file when resumed.
+CHUNKED_UPLOAD_HASH_CACHE_SIZE = getattr(settings, 'CHUNKED_UPLOAD_HASH_CACHE_SIZE', 256)
+# How long one PATCH may hold an upload while streaming its chunk before another may take over.
+CHUNKED_UPLOAD_CLAIM_SECONDS = getattr(settings, 'CHUNKED_UPLOAD_CLAIM_SECONDS', 15 * 60)
+READ_SIZE = 64 * 1024
+
+# Running sha256 state per upload, so each chunk only hashes its own bytes. hashlib objects
+# cannot be persisted, so after a restart (or on another worker) the state is rebuilt by
+# streaming the partial file once. Least recently used first, so abandoned uploads age out.
+_running_hashes = OrderedDict()
+_running_hashes_lock = threading.Lock()
+
+
+class ChunkError(Exception):
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def partial_path(upload):
+    return os.path.join(CHUNKED_UPLOAD_DIR, f"{upload.id}.part")
+
+
+def normalize_checksum(value):
+    """Lowercase a whole-file sha256 hex digest; '' when none is given."""
+    checksum = str(value or '').strip().lower()
+    if checksum and not re.fullmatch(r'[0-9a-f]{64}', checksum):
+        raise ChunkError("checksum must be a sha256 digest of 64 hex characters", 400)
+    return checksum
+
+
+def parse_checksum_header(value):
+    """Parse a tus `Upload-Checksum` header ("<algorithm> <base64 digest>")."""
+    try:
+        algorithm, encoded = value.split(' ', 1)
+        algorithm = algorithm.lower()
+        if algorithm not in hashlib.algorithms_guaranteed:
+            raise ValueError(algorithm)
+        return algorithm, base64.b64decode(encoded.strip(), validate=True)
+    except ValueError:
+        raise ChunkError("Upload-Checksum must be '<algorithm> <base64 digest>'", 400)
+
+
+def _running_hash(upload):
+    with _running_hashes_lock:
+        cached = _running_hashes.get(upload.id)
+    if cached and cached[0] == upload.offset:
+        return cached[1].copy()
+
+    hasher = hashlib.sha256()
+    remaining = upload.offset
+    with open(partial_path(upload), 'rb') as partial:
+        while remaining:
+            block = partial.read(min(READ_SIZE, remaining))
+            if not block:
+                break
+            hasher.update(block)
+            remaining -= len(block)
+    return hasher
+
+
+def _forget(upload):
+    with _running_hashes_lock:
+        _running_hashes.pop(upload.id, None)
+
+
+def claim_chunk(upload_id, user, offset):
+    """Claim an uploading upload for writing a chunk at `offset`; returns the claim time, or None.
+
+    A single compare-and-set UPDATE, so no transaction stays open while the chunk streams in.
+    It fails when the upload has moved past `offset`, is no longer uploading, or another
+    request holds a claim younger than CHUNKED_UPLOAD_CLAIM_SECONDS.
+    """
+    now = timezone.now()
+    claimed = ChunkedUpload.objects.filter(id=upload_id, user=user, status='uploading', offset=offset).filter(
+        Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - timedelta(seconds=CHUNKED_UPLOAD_CLAIM_SECONDS))
+    ).update(claimed_at=now)
+    return now if claimed else None
+
+
+def release_claim(upload_id, claimed_at):
+    ChunkedUpload.objects.filter(id=upload_id, claimed_at=claimed_at).update(claimed_at=None)
+
+
+def create_partial(upload):
+    os.makedirs(CHUNKED_UPLOAD_DIR, exist_ok=True)
+    open(partial_path(upload), 'wb').close()
+
+
+def append_chunk(upload, stream, chunk_checksum=None):
+    """Stream one chunk from `stream` onto the partial file at `upload.offset`.
+
+    Memory use is bounded by READ_SIZE regardless of chunk size. If the chunk overruns
+    the declared length or fails its checksum, the partial file is truncated back so the
+    client can retry from the same offset. Returns the new offset (the caller saves it)
+    and the running hash of everything received so far.
+    """
+    hasher = _running_hash(upload)
+    chunk_hasher = hashlib.new(chunk_checksum[0]) if chunk_checksum else None
+    written = 0
+    error = None
+
+    with open(partial_path(upload), 'r+b') as partial:
+        partial.seek(upload.offset)
+        partial.truncate()
+        while True:
+            block = stream.read(READ_SIZE)
+            if not block:
+                break
+            written += len(block)
+            if upload.offset + written > upload.total_size:
+                error = ChunkError("Chunk exceeds the declared Upload-Length", 413)
+                break
+            partial.write(block)
+            hasher.update(block)
+            if chunk_hasher:
+                chunk_hasher.update(block)
+
+        if error is None and chunk_hasher and chunk_hasher.digest() != chunk_checksum[1]:
+            error = ChunkError("Chunk checksum mismatch", 460)
+        if error is not None:
+            partial.seek(upload.offset)
+            partial.truncate()
+            raise error
+
+    new_offset = upload.offset + written
+    with _running_hashes_lock:
+        _running_hashes[upload.id] = (new_offset, hasher)
+        _running_hashes.move_to_end(upload.id)
+        while len(_running_hashes) > CHUNKED_UPLOAD_HASH_CACHE_SIZE:
+            _running_hashes.popitem(last=False)
+    return new_offset, hasher
+
+
+def finalize_upload(upload, hasher):
+    """Verify the whole-file checksum and move the assembled file into a SubmissionFile."""
+    path = partial_path(upload)
+    try:
+        if upload.checksum and hasher.hexdigest() != upload.checksum.lower():
+            raise ChunkError("File checksum mismatch", 460)
+        with open(path, 'rb') as assembled:
+            content = File(assembled, name=os.path.basename(upload.filename))
+            content.sha256 = hasher.hexdigest()  # lets the blob store skip re-hashing
+            # Storage backends copy File content chunk by chunk, so this stays constant-memory too.
+            submission_file = SubmissionFile(submission=upload.submission, file=content)
+            submission_file.save()
+        return submission_file
+    finally:
+        _forget(upload)
+        try:
+            os.remove(path)
+        except OSError:
+            logger.warning(f"Could not remove partial upload {path}")
+
+
+def discard_partial(upload):
+    _forget(upload)
+    try:
+        os.remove(partial_path(upload))
+    except OSError:
+        pass
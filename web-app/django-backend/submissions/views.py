@@ -1,12 +1,27 @@
+import csv
+from io import BytesIO
+from django.db import transaction
+from django.urls import reverse
 from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from .models import Submission, SubmissionReview
-from .serializers import SubmissionSerializer, StudentSubmissionSerializer, SubmissionReviewSerializer, StudentChallengeResultsSerializer, StudentPendingAndRejectedSerializer
+from .models import Submission, SubmissionFile, SubmissionReview, SubmissionIntake, SubmissionIntakeFile, ChunkedUpload
+from .serializers import SubmissionSerializer, SubmissionFileSerializer, StudentSubmissionSerializer, SubmissionReviewSerializer, StudentChallengeResultsSerializer, StudentPendingAndRejectedSerializer
 from challenges.models import Challenge
+from blobstore.models import Blob
+from blobstore.utils import blobs_owned_by
+from blobstore.presigned import create_presigned_upload, finalize_presigned_upload, PresignedUploadError
 from companies.models import CompanyUser
+from analytics.models import ChallengeAnalytics
+from analytics.sketches import TDigest
+from analytics import funnel
+from .intake import in_surge, upsert_submission, enqueue_intake, SubmissionClosedError
+from .uploads import CHUNKED_UPLOAD_MAX_SIZE, ChunkError, normalize_checksum, parse_checksum_header, create_partial, claim_chunk, release_claim, append_chunk, finalize_upload, discard_partial
+from .review_queue import REVIEW_LEASE_MINUTES, REVIEW_QUEUE_MAX_BATCH, claim_submissions, release_submissions
+from .grading import BulkReviewError, parse_review_csv, validate_reviews, apply_reviews
+from .attempts import get_time_limit_minutes, start_attempt, get_cached_attempt, check_submission_window, heartbeat_buffer
 import logging
 logger = logging.getLogger(__name__)
 
@@ -21,24 +36,316 @@ class SubmitChallengeView(APIView):
             challenge = Challenge.objects.get(id=challenge_id, is_published=True)
             if challenge.end_date and challenge.end_date < timezone.now():
                 return Response({"error": "Challenge submission deadline has passed"}, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Check if user already has a submission for this challenge
-            existing_submission = Submission.objects.filter(challenge=challenge, user=request.user).first()
-            if existing_submission:
-                # Block submission if existing submission is graded or rejected
-                if existing_submission.status in ['graded', 'rejected']:
-                    return Response({"error": "Cannot submit: Previous submission has been graded or rejected"}, status=status.HTTP_400_BAD_REQUEST)
-                # Delete existing pending submission to allow replacement
-                existing_submission.delete()
+
+            attempt_error = check_submission_window(request.user, challenge)
+            if attempt_error:
+                return Response({"error": attempt_error}, status=status.HTTP_400_BAD_REQUEST)
             
             serializer = SubmissionSerializer(data=request.data, context={'request': request})
-            if serializer.is_valid():
-                serializer.save(user=request.user, challenge=challenge)
-                return Response({"message": "Submission successful"}, status=status.HTTP_201_CREATED)
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            repo_link = serializer.validated_data['repo_link']
+            files = request.FILES.getlist('files', [])
+
+            # Files the caller uploaded before (see api/blobs/<sha256>/) are referenced, not re-uploaded.
+            blob_hashes = request.data.getlist('blob_hashes') if hasattr(request.data, 'getlist') else request.data.get('blob_hashes', [])
+            if blob_hashes:
+                blobs = list(blobs_owned_by(request.user).filter(sha256__in=[str(h).lower() for h in blob_hashes]))
+                if len(blobs) != len(set(str(h).lower() for h in blob_hashes)):
+                    return Response({"blob_hashes": "One or more files have not been uploaded"}, status=status.HTTP_400_BAD_REQUEST)
+                files = files + blobs
+
+            existing_status = Submission.objects.filter(challenge=challenge, user=request.user).values_list('status', flat=True).first()
+            if existing_status in ['graded', 'rejected']:
+                return Response({"error": "Cannot submit: Previous submission has been graded or rejected"}, status=status.HTTP_400_BAD_REQUEST)
+
+            if in_surge(challenge):
+                # Store the upload and let the worker pool apply it, so deadline traffic doesn't hold request workers.
+                with transaction.atomic():
+                    intake = SubmissionIntake.objects.create(user=request.user, challenge=challenge, repo_link=repo_link)
+                    for file_data in files:
+                        if isinstance(file_data, Blob):
+                            SubmissionIntakeFile.objects.create(intake=intake, file=file_data.file.name, blob=file_data)
+                        else:
+                            SubmissionIntakeFile.objects.create(intake=intake, file=file_data)
+                    enqueue_intake(intake)
+                status_url = request.build_absolute_uri(reverse('submission-intake-status', args=[intake.id]))
+                return Response({
+                    "message": "Submission accepted for processing",
+                    "intake_id": intake.id,
+                    "status_url": status_url
+                }, status=status.HTTP_202_ACCEPTED)
+
+            try:
+                upsert_submission(request.user, challenge, repo_link, files)
+            except SubmissionClosedError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            return Response({"message": "Submission successful"}, status=status.HTTP_201_CREATED)
         except Challenge.DoesNotExist:
             return Response({"error": "Challenge not found"}, status=status.HTTP_404_NOT_FOUND)
 
+class StartChallengeAttemptView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, challenge_id):
+        """Start the clock on a timed challenge. Repeated calls return the running attempt."""
+        if request.user.role not in ['student', 'graduate']:
+            return Response({"error": "Only students or graduates can start challenges"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            challenge = Challenge.objects.get(id=challenge_id, is_published=True)
+        except Challenge.DoesNotExist:
+            return Response({"error": "Challenge not found"}, status=status.HTTP_404_NOT_FOUND)
+        if challenge.end_date and challenge.end_date < timezone.now():
+            return Response({"error": "Challenge submission deadline has passed"}, status=status.HTTP_400_BAD_REQUEST)
+
+        time_limit = get_time_limit_minutes(challenge)
+        if not time_limit:
+            return Response({"error": "Challenge is not timed"}, status=status.HTTP_400_BAD_REQUEST)
+
+        attempt, created = start_attempt(request.user, challenge, time_limit)
+        funnel.record('started', [challenge.id], request.user.id)
+        remaining = max(0, int((attempt.expires_at - timezone.now()).total_seconds()))
+        return Response({
+            "attempt_id": attempt.id,
+            "started_at": attempt.started_at,
+            "expires_at": attempt.expires_at,
+            "remaining_seconds": remaining
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+class ChallengeHeartbeatView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, challenge_id):
+        """Record a client heartbeat for a running attempt. Heartbeats are buffered, not written per call."""
+        if request.user.role not in ['student', 'graduate']:
+            return Response({"error": "Only students or graduates can send heartbeats"}, status=status.HTTP_403_FORBIDDEN)
+        cached = get_cached_attempt(request.user.id, challenge_id)
+        if cached is None:
+            return Response({"error": "No attempt started for this challenge"}, status=status.HTTP_404_NOT_FOUND)
+
+        attempt_id, expires_at = cached
+        remaining = int((expires_at - timezone.now()).total_seconds())
+        if remaining > 0:
+            heartbeat_buffer.record(attempt_id)
+        return Response({
+            "attempt_id": attempt_id,
+            "expires_at": expires_at,
+            "remaining_seconds": max(0, remaining),
+            "expired": remaining <= 0
+        }, status=status.HTTP_200_OK)
+
+class SubmissionIntakeStatusView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, intake_id):
+        """Report the processing status of a submission accepted during a deadline surge."""
+        try:
+            intake = SubmissionIntake.objects.get(id=intake_id, user=request.user)
+        except SubmissionIntake.DoesNotExist:
+            return Response({"error": "Submission intake not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            "intake_id": intake.id,
+            "challenge": intake.challenge_id,
+            "status": intake.status,
+            "error": intake.error or None,
+            "submission": intake.submission_id,
+            "created_at": intake.created_at,
+            "processed_at": intake.processed_at
+        }, status=status.HTTP_200_OK)
+
+def _chunked_upload_response(upload, status_code):
+    response = Response({
+        "upload_id": str(upload.id),
+        "filename": upload.filename,
+        "offset": upload.offset,
+        "total_size": upload.total_size,
+        "status": upload.status,
+        "submission_file": upload.submission_file_id
+    }, status=status_code)
+    response['Upload-Offset'] = str(upload.offset)
+    response['Upload-Length'] = str(upload.total_size)
+    return response
+
+class CreateChunkedUploadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, submission_id):
+        """Open a resumable upload for a file on the student's pending submission."""
+        if request.user.role not in ['student', 'graduate']:
+            return Response({"error": "Only students or graduates can upload submission files"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            submission = Submission.objects.get(id=submission_id, user=request.user)
+        except Submission.DoesNotExist:
+            return Response({"error": "Submission not found"}, status=status.HTTP_404_NOT_FOUND)
+        if submission.status != 'pending':
+            return Response({"error": "Files can only be added to pending submissions"}, status=status.HTTP_400_BAD_REQUEST)
+
+        filename = request.data.get('filename')
+        total_size = request.data.get('size') or request.headers.get('Upload-Length')
+        try:
+            total_size = int(total_size)
+        except (TypeError, ValueError):
+            return Response({"error": "size (or Upload-Length) must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        if not filename:
+            return Response({"filename": "This field is required."}, status=status.HTTP_400_BAD_REQUEST)
+        if total_size <= 0 or total_size > CHUNKED_UPLOAD_MAX_SIZE:
+            return Response({"error": f"size must be between 1 and {CHUNKED_UPLOAD_MAX_SIZE} bytes"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            checksum = normalize_checksum(request.data.get('checksum'))
+        except ChunkError as e:
+            return Response({"checksum": str(e)}, status=e.status_code)
+
+        upload = ChunkedUpload.objects.create(
+            user=request.user,
+            submission=submission,
+            filename=filename[:255],
+            total_size=total_size,
+            checksum=checksum
+        )
+        create_partial(upload)
+        response = _chunked_upload_response(upload, status.HTTP_201_CREATED)
+        response['Location'] = request.build_absolute_uri(reverse('chunked-upload', args=[upload.id]))
+        return response
+
+class ChunkedUploadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def head(self, request, upload_id):
+        """Report how many bytes the server holds, so an interrupted client knows where to resume."""
+        try:
+            upload = ChunkedUpload.objects.get(id=upload_id, user=request.user)
+        except ChunkedUpload.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        response = Response(status=status.HTTP_200_OK)
+        response['Upload-Offset'] = str(upload.offset)
+        response['Upload-Length'] = str(upload.total_size)
+        response['Cache-Control'] = 'no-store'
+        return response
+
+    def patch(self, request, upload_id):
+        """Append a chunk at Upload-Offset. The body is streamed to disk, never buffered whole.
+
+        The upload is claimed at the client's offset first, the chunk is streamed with no
+        transaction open, and the new offset is committed in a short transaction only if
+        the claim still holds.
+        """
+        try:
+            client_offset = int(request.headers.get('Upload-Offset', ''))
+        except ValueError:
+            return Response({"error": "Upload-Offset header is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            checksum_header = request.headers.get('Upload-Checksum')
+            chunk_checksum = parse_checksum_header(checksum_header) if checksum_header else None
+            claimed_at = claim_chunk(upload_id, request.user, client_offset)
+            upload = ChunkedUpload.objects.select_related('submission').get(id=upload_id, user=request.user)
+        except ChunkedUpload.DoesNotExist:
+            return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+        except ChunkError as e:
+            return Response({"error": str(e)}, status=e.status_code)
+        if claimed_at is None:
+            # Finished, failed, past this offset, or another request is writing to it right now.
+            return _chunked_upload_response(upload, status.HTTP_409_CONFLICT)
+
+        try:
+            new_offset, hasher = append_chunk(upload, request.stream or BytesIO(), chunk_checksum)
+        except ChunkError as e:
+            release_claim(upload.id, claimed_at)
+            return Response({"error": str(e)}, status=e.status_code)
+
+        with transaction.atomic():
+            upload = ChunkedUpload.objects.select_for_update().select_related('submission').filter(
+                id=upload.id, status='uploading', offset=client_offset, claimed_at=claimed_at
+            ).first()
+            if upload is None:
+                # Our claim outlived CHUNKED_UPLOAD_CLAIM_SECONDS and another request took over.
+                upload = ChunkedUpload.objects.get(id=upload_id)
+                return _chunked_upload_response(upload, status.HTTP_409_CONFLICT)
+            upload.offset = new_offset
+            upload.claimed_at = None
+            if upload.offset == upload.total_size:
+                if Submission.objects.select_for_update().filter(id=upload.submission_id).values_list('status', flat=True).first() != 'pending':
+                    # Graded or rejected while the file was uploading; it can no longer be attached.
+                    discard_partial(upload)
+                    upload.status = 'failed'
+                    upload.save(update_fields=['offset', 'status', 'claimed_at', 'updated_at'])
+                    return Response({"error": "Files can only be added to pending submissions"}, status=status.HTTP_409_CONFLICT)
+                try:
+                    upload.submission_file = finalize_upload(upload, hasher)
+                    upload.status = 'complete'
+                except ChunkError as e:
+                    upload.status = 'failed'
+                    upload.save(update_fields=['offset', 'status', 'claimed_at', 'updated_at'])
+                    return Response({"error": str(e)}, status=e.status_code)
+            upload.save(update_fields=['offset', 'status', 'submission_file', 'claimed_at', 'updated_at'])
+        return _chunked_upload_response(upload, status.HTTP_200_OK)
+
+    def delete(self, request, upload_id):
+        """Abandon an unfinished upload and free its partial file."""
+        try:
+            upload = ChunkedUpload.objects.get(id=upload_id, user=request.user, status='uploading')
+        except ChunkedUpload.DoesNotExist:
+            return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+        discard_partial(upload)
+        upload.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class PresignSubmissionUploadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, submission_id):
+        """Issue a presigned URL so the client uploads a submission file straight to object storage."""
+        if request.user.role not in ['student', 'graduate']:
+            return Response({"error": "Only students or graduates can upload submission files"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            submission = Submission.objects.get(id=submission_id, user=request.user, status='pending')
+        except Submission.DoesNotExist:
+            return Response({"error": "Pending submission not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        filename = request.data.get('filename')
+        if not filename:
+            return Response({"filename": "This field is required."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            size = int(request.data.get('size'))
+        except (TypeError, ValueError):
+            return Response({"size": "A valid integer is required."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            upload = create_presigned_upload(
+                f"submission_files/{submission.id}", filename, size,
+                scope=f"submission:{submission.id}",
+                content_type=request.data.get('content_type')
+            )
+        except PresignedUploadError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(upload, status=status.HTTP_201_CREATED)
+
+class FinalizeSubmissionUploadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, submission_id):
+        """Attach a directly uploaded object to the submission once it is in the bucket."""
+        if request.user.role not in ['student', 'graduate']:
+            return Response({"error": "Only students or graduates can upload submission files"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            submission = Submission.objects.get(id=submission_id, user=request.user, status='pending')
+        except Submission.DoesNotExist:
+            return Response({"error": "Pending submission not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        upload_token = request.data.get('upload_token')
+        if not upload_token:
+            return Response({"upload_token": "This field is required."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            key, original_name = finalize_presigned_upload(upload_token, scope=f"submission:{submission.id}")
+        except PresignedUploadError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        submission_file, _ = SubmissionFile.objects.get_or_create(
+            submission=submission,
+            file=key,
+            defaults={'original_name': original_name}
+        )
+        return Response(SubmissionFileSerializer(submission_file).data, status=status.HTTP_201_CREATED)
+
 class StudentSubmissionListView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -60,9 +367,15 @@ class StudentChallengeResultsView(APIView):
         submissions = Submission.objects.filter(
             user=request.user,
             status='graded',
-            reviews__isnull=False
-        ).prefetch_related('reviews').distinct()
-        serializer = StudentChallengeResultsSerializer(submissions, many=True)
+            review_count__gt=0
+        ).select_related('challenge')
+        sketches = {
+            challenge_id: TDigest.from_dict(sketch)
+            for challenge_id, sketch in ChallengeAnalytics.objects.filter(
+                challenge_id__in=submissions.values('challenge_id')
+            ).values_list('challenge_id', 'score_sketch')
+        }
+        serializer = StudentChallengeResultsSerializer(submissions, many=True, context={'score_sketches': sketches})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 class StudentPendingSubmissionsView(APIView):
@@ -93,6 +406,86 @@ class StudentRejectedSubmissionsView(APIView):
         serializer = StudentPendingAndRejectedSerializer(submissions, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+class CompanyBulkReviewView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """Grade many submissions at once from a JSON list or an uploaded CSV (submission_id, score, comments)."""
+        if request.user.role != 'company_user':
+            return Response({"error": "Only company users can review submissions"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            company_user = CompanyUser.objects.get(user=request.user)
+        except CompanyUser.DoesNotExist:
+            return Response({"error": "User is not associated with any company"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            if 'file' in request.FILES:
+                rows = parse_review_csv(request.FILES['file'])
+            else:
+                rows = request.data if isinstance(request.data, list) else request.data.get('reviews')
+                if not isinstance(rows, list):
+                    return Response({"error": "Send a list of reviews or a CSV file"}, status=status.HTTP_400_BAD_REQUEST)
+            reviews, submissions = validate_reviews(rows, company_user.company, request.user)
+        except BulkReviewError as e:
+            return Response({"errors": e.errors}, status=status.HTTP_400_BAD_REQUEST)
+        except (UnicodeDecodeError, csv.Error):
+            return Response({"error": "CSV file could not be read"}, status=status.HTTP_400_BAD_REQUEST)
+
+        created = apply_reviews(reviews, submissions, request.user)
+        logger.info(f"Bulk review by {request.user.email}: {len(created)} submissions graded")
+        return Response({"message": "Reviews submitted successfully", "graded": len(created)}, status=status.HTTP_201_CREATED)
+
+class ReviewQueueView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """List the submissions currently leased to the authenticated reviewer."""
+        if request.user.role != 'company_user':
+            return Response({"error": "Only company users can use the review queue"}, status=status.HTTP_403_FORBIDDEN)
+        submissions = Submission.objects.filter(
+            leased_by=request.user, status='pending', lease_expires_at__gt=timezone.now()
+        ).select_related('challenge').prefetch_related('files', 'reviews').order_by('lease_expires_at')
+        serializer = SubmissionSerializer(submissions, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    def post(self, request):
+        """Lease the next batch of pending submissions to the authenticated reviewer."""
+        if request.user.role != 'company_user':
+            return Response({"error": "Only company users can use the review queue"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            company_user = CompanyUser.objects.get(user=request.user)
+        except CompanyUser.DoesNotExist:
+            return Response({"error": "User is not associated with any company"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            batch_size = int(request.data.get('batch_size', 10))
+            challenge_id = request.data.get('challenge_id')
+            challenge_id = int(challenge_id) if challenge_id is not None else None
+        except (TypeError, ValueError):
+            return Response({"error": "batch_size and challenge_id must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+        if batch_size < 1 or batch_size > REVIEW_QUEUE_MAX_BATCH:
+            return Response({"error": f"batch_size must be between 1 and {REVIEW_QUEUE_MAX_BATCH}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        ids = claim_submissions(request.user, company_user.company, batch_size, challenge_id)
+        submissions = Submission.objects.filter(id__in=ids).select_related('challenge').prefetch_related('files', 'reviews')
+        serializer = SubmissionSerializer(submissions, many=True)
+        return Response({
+            "lease_minutes": REVIEW_LEASE_MINUTES,
+            "submissions": serializer.data
+        }, status=status.HTTP_200_OK)
+
+class ReviewQueueReleaseView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """Return leased submissions to the queue; all of the reviewer's leases unless submission_ids is given."""
+        if request.user.role != 'company_user':
+            return Response({"error": "Only company users can use the review queue"}, status=status.HTTP_403_FORBIDDEN)
+        submission_ids = request.data.get('submission_ids')
+        if submission_ids is not None and not isinstance(submission_ids, list):
+            return Response({"error": "submission_ids must be a list"}, status=status.HTTP_400_BAD_REQUEST)
+        released = release_submissions(request.user, submission_ids)
+        return Response({"released": released}, status=status.HTTP_200_OK)
+
 class CompanyReviewSubmissionView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -105,11 +498,16 @@ class CompanyReviewSubmissionView(APIView):
             company_user = CompanyUser.objects.get(user=request.user)
             submission = Submission.objects.get(id=submission_id, challenge__company=company_user.company)
             logger.debug(f"Submission found: {submission.id}, status: {submission.status}")
+            if submission.is_leased_by_other(request.user):
+                return Response({"error": "Submission is leased to another reviewer"}, status=status.HTTP_409_CONFLICT)
             serializer = SubmissionReviewSerializer(data=request.data, context={'submission': submission})
             if serializer.is_valid():
-                serializer.save(submission=submission, reviewer=request.user)
-                submission.status = 'graded'
-                submission.save()
+                with transaction.atomic():
+                    serializer.save(submission=submission, reviewer=request.user)
+                    submission.status = 'graded'
+                    submission.leased_by = None
+                    submission.lease_expires_at = None
+                    submission.save(update_fields=['status', 'leased_by', 'lease_expires_at'])
                 logger.debug(f"Review saved, updated submission status to 'graded' for submission_id: {submission_id}")
                 return Response({"message": "Review submitted successfully"}, status=status.HTTP_201_CREATED)
             logger.error(f"Serializer errors: {serializer.errors}")
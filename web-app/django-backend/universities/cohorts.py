@@ -0,0 +1,120 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, ExpressionWrapper, F, FloatField, Q, Sum
+from django.db.models.functions import ExtractYear
+from django.utils import timezone
+from badges.models import UserBadge
+from submissions.models import Submission
+from .models import StudentEnrollment, University, UniversityCohortStats
+
+COHORT_ACTIVE_DAYS = getattr(settings, 'COHORT_ACTIVE_DAYS', 90)
+COHORT_CACHE_TIMEOUT = getattr(settings, 'COHORT_CACHE_TIMEOUT', 60 * 60 * 24)
+COHORT_TOP_CATEGORIES = 5
+
+COUNTERS = ['students', 'active_students', 'submissions', 'scored_submissions', 'normalized_score_sum', 'badges']
+
+
+def cache_key(university_id):
+    return f"university-cohorts:{university_id}"
+
+
+def _cohort_rows(queryset, university_path, date_path):
+    """Group `queryset` by (university, graduation year), with the year taken from `date_path`."""
+    return queryset.order_by().annotate(
+        cohort_university=F(university_path), cohort_year=ExtractYear(date_path)
+    ).values('cohort_university', 'cohort_year')
+
+
+def compute(university_ids):
+    """Recompute UniversityCohortStats for the given verified universities with grouped queries.
+
+    Every metric is one GROUP BY over the enrollment join, whatever the number of
+    universities, and the rows for each university are replaced in one transaction.
+    Returns the number of cohort rows written.
+    """
+    university_ids = list(University.objects.filter(id__in=university_ids, is_verified=True).values_list('id', flat=True))
+    if not university_ids:
+        return 0
+    cohorts = defaultdict(lambda: dict.fromkeys(COUNTERS, 0) | {'category_submissions': {}})
+    since = timezone.now() - timedelta(days=COHORT_ACTIVE_DAYS)
+
+    enrollments = StudentEnrollment.objects.filter(university_id__in=university_ids)
+    for row in _cohort_rows(enrollments, 'university_id', 'graduation_date').annotate(
+        n=Count('student_id', distinct=True),
+        active=Count('student_id', distinct=True, filter=Q(student__submission__submitted_at__gte=since))
+    ):
+        cohort = cohorts[(row['cohort_university'], row['cohort_year'])]
+        cohort['students'] = row['n']
+        cohort['active_students'] = row['active']
+
+    submissions = Submission.objects.filter(user__studentenrollment__university_id__in=university_ids)
+    enrolled_submissions = _cohort_rows(
+        submissions, 'user__studentenrollment__university_id', 'user__studentenrollment__graduation_date'
+    )
+    scored = Q(final_score__isnull=False, challenge__max_score__gt=0)
+    for row in enrolled_submissions.annotate(
+        n=Count('id'),
+        scored=Count('id', filter=scored),
+        score_pct=Sum(ExpressionWrapper(F('final_score') * 100.0 / F('challenge__max_score'), output_field=FloatField()), filter=scored)
+    ):
+        cohort = cohorts[(row['cohort_university'], row['cohort_year'])]
+        cohort['submissions'] = row['n']
+        cohort['scored_submissions'] = row['scored']
+        cohort['normalized_score_sum'] = row['score_pct'] or 0.0
+
+    for row in enrolled_submissions.filter(challenge__categories__isnull=False).annotate(
+        category=F('challenge__categories__name')
+    ).values('cohort_university', 'cohort_year', 'category').annotate(n=Count('id')):
+        cohorts[(row['cohort_university'], row['cohort_year'])]['category_submissions'][row['category']] = row['n']
+
+    badges = UserBadge.objects.filter(user__studentenrollment__university_id__in=university_ids)
+    for row in _cohort_rows(badges, 'user__studentenrollment__university_id', 'user__studentenrollment__graduation_date').annotate(n=Count('id')):
+        cohorts[(row['cohort_university'], row['cohort_year'])]['badges'] = row['n']
+
+    with transaction.atomic():
+        UniversityCohortStats.objects.filter(university_id__in=university_ids).delete()
+        UniversityCohortStats.objects.bulk_create([
+            UniversityCohortStats(university_id=university_id, graduation_year=year, **values)
+            for (university_id, year), values in cohorts.items()
+        ], batch_size=500)
+    cache.delete_many([cache_key(university_id) for university_id in university_ids])
+    return len(cohorts)
+
+
+def _summary(rows):
+    totals = {counter: sum(getattr(row, counter) for row in rows) for counter in COUNTERS}
+    categories = Counter()
+    for row in rows:
+        categories.update(row.category_submissions)
+    scored = totals.pop('scored_submissions')
+    score_sum = totals.pop('normalized_score_sum')
+    return {
+        **totals,
+        "average_normalized_score": round(score_sum / scored, 2) if scored else None,
+        "top_categories": [
+            {"category": category, "submissions": count} for category, count in categories.most_common(COHORT_TOP_CATEGORIES)
+        ],
+    }
+
+
+def build_report(university):
+    rows = list(UniversityCohortStats.objects.filter(university=university).order_by(F('graduation_year').asc(nulls_last=True)))
+    return {
+        "university_id": university.id,
+        "university": university.name,
+        "computed_at": max((row.computed_at for row in rows), default=None),
+        "overall": _summary(rows),
+        "cohorts": [{"graduation_year": row.graduation_year, **_summary([row])} for row in rows],
+    }
+
+
+def get_report(university):
+    key = cache_key(university.id)
+    report = cache.get(key)
+    if report is None:
+        report = build_report(university)
+        cache.set(key, report, COHORT_CACHE_TIMEOUT)
+    return report
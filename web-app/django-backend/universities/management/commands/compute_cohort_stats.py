@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from universities.cohorts import compute
+from universities.models import University
+
+class Command(BaseCommand):
+    help = "Recomputes per-university, per-graduation-year cohort analytics; schedule it nightly"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--university', type=int, action='append', dest='universities',
+                            help='Only this university id (repeatable); default is every verified university')
+        parser.add_argument('--batch-size', type=int, default=50, help='Universities per batch of grouped queries')
+
+    def handle(self, *args, **options):
+        university_ids = options['universities'] or list(
+            University.objects.filter(is_verified=True).order_by('id').values_list('id', flat=True)
+        )
+        written = 0
+        for i in range(0, len(university_ids), options['batch_size']):
+            written += compute(university_ids[i:i + options['batch_size']])
+        self.stdout.write(self.style.SUCCESS(f'Computed {written} cohorts for {len(university_ids)} universities'))
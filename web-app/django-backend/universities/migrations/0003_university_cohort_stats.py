@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('universities', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UniversityCohortStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('graduation_year', models.IntegerField(blank=True, null=True)),
+                ('students', models.IntegerField(default=0)),
+                ('active_students', models.IntegerField(default=0)),
+                ('submissions', models.IntegerField(default=0)),
+                ('scored_submissions', models.IntegerField(default=0)),
+                ('normalized_score_sum', models.FloatField(default=0.0)),
+                ('badges', models.IntegerField(default=0)),
+                ('category_submissions', models.JSONField(blank=True, default=dict)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('university', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cohort_stats', to='universities.university')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['university', 'graduation_year'], name='universitie_univers_d13b01_idx')],
+            },
+        ),
+    ]
@@ -31,4 +31,26 @@ class StudentEnrollment(models.Model):
         unique_together = ('student', 'university')
 
     def __str__(self):
-        return f"{self.student.email} enrolled at {self.university.name}"
\ No newline at end of file
+        return f"{self.student.email} enrolled at {self.university.name}"
+
+class UniversityCohortStats(models.Model):
+    # Precomputed by universities.cohorts (compute_cohort_stats command); graduation_year is
+    # null for students enrolled without a graduation date.
+    university = models.ForeignKey(University, on_delete=models.CASCADE, related_name='cohort_stats')
+    graduation_year = models.IntegerField(null=True, blank=True)
+    students = models.IntegerField(default=0)
+    active_students = models.IntegerField(default=0)  # submitted within COHORT_ACTIVE_DAYS
+    submissions = models.IntegerField(default=0)
+    scored_submissions = models.IntegerField(default=0)
+    normalized_score_sum = models.FloatField(default=0.0)  # final scores as a percentage of max_score
+    badges = models.IntegerField(default=0)
+    category_submissions = models.JSONField(default=dict, blank=True)  # category name -> submissions
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['university', 'graduation_year']),
+        ]
+
+    def __str__(self):
+        return f"{self.university.name} class of {self.graduation_year or 'unknown'}"
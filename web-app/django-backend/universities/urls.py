@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import UniversityCohortStatsView
+
+urlpatterns = [
+    path('<int:university_id>/cohorts/', UniversityCohortStatsView.as_view(), name='university-cohort-stats'),
+]
@@ -1,3 +1,19 @@
-from django.shortcuts import render
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from .models import University, UniversityUser
+from .cohorts import get_report
 
-# Create your views here.
+class UniversityCohortStatsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, university_id):
+        """Cohort analytics (per graduation year and overall) for a university, from the nightly batch."""
+        try:
+            university = University.objects.get(id=university_id, is_verified=True)
+        except University.DoesNotExist:
+            return Response({"error": "University not found"}, status=status.HTTP_404_NOT_FOUND)
+        if request.user.role != 'admin' and not UniversityUser.objects.filter(university=university, user=request.user).exists():
+            return Response({"error": "Only this university's staff can view its cohort analytics"}, status=status.HTTP_403_FORBIDDEN)
+        return Response(get_report(university), status=status.HTTP_200_OK)